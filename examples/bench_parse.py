@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 17:30
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 开奖历史解析基准
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from hysterical_ticket.component.parser import BACKENDS
+
+this_dir = Path(__file__).parent
+fixture_path = this_dir.joinpath("fixtures", "ssq_history.html")
+
+
+def parse_legacy(text: str, n_cols: int = 8):
+    """重构前 Collector._parse_ssq_data 的写法，每列调用一次 find_all"""
+    soup = BeautifulSoup(text, "html.parser")
+    trs = soup.find("tbody", attrs={"id": "tdata"}).find_all("tr")
+    container = []
+    for tr in trs:
+        temp_ = [tr.find_all("td")[0].get_text().strip()]
+        temp_.extend([tr.find_all("td")[i].get_text().strip() for i in range(1, 7)])
+        temp_.append(tr.find_all("td")[7].get_text().strip())
+        container.append(temp_)
+    return container
+
+
+def bench(name: str, parser, text: str, rounds: int):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        rows = parser(text, 8)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:>8} - {len(rows) * rounds / elapsed:>10.0f} rows/s  {elapsed / rounds * 1000:.2f} ms/page"
+    )
+    return rows
+
+
+def main(rounds: int = 20):
+    text = fixture_path.read_text(encoding="utf8")
+    expected = bench("legacy", parse_legacy, text, rounds)
+    for name, parser in BACKENDS.items():
+        assert bench(name, parser, text, rounds) == expected, f"Output mismatch - backend={name}"
+
+
+if __name__ == "__main__":
+    main()
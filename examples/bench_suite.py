@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 20:40
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 离线端到端基准，与保存的基线对比，出现性能回退时以非零状态退出
+"""
+python examples/bench_suite.py                 # 与基线对比
+python examples/bench_suite.py --update        # 在当前机器上重新生成基线
+python examples/bench_suite.py --terms 20000   # 更长的模拟历史
+"""
+
+import argparse
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from hysterical_ticket.component.bingo_ssq import SSQNumsChecker, compare_nums
+from hysterical_ticket.component.checker import read_draws
+from hysterical_ticket.component.collector import Collector, trace_history
+from hysterical_ticket.component.fns import get_fns_container
+from hysterical_ticket.component.parser import parse_tdata
+from hysterical_ticket.component.replay import RecordTransport, ReplayTransport
+from hysterical_ticket.component.session import Session
+from hysterical_ticket.component.store import open_store
+from hysterical_ticket.component.synthetic import SyntheticTransport, history_page, synthetic_rows
+
+this_dir = Path(__file__).parent
+baseline_path = this_dir.joinpath("fixtures", "bench_baseline.json")
+
+
+def measure(fn, rounds: int) -> float:
+    """多次运行取最短耗时"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def record(work_dir: Path, rows) -> Path:
+    """用模拟服务端录制一次 cassette，之后的网络部分全部回放"""
+    cassette = work_dir.joinpath("cassette.json")
+    transport = RecordTransport(cassette, SyntheticTransport({"ssq": rows}))
+
+    async def main():
+        # 离线回放不访问真实 host，关闭限速以免计入等待时间
+        async with Session(transport=transport, host_rate=0) as session:
+            output = work_dir.joinpath("双色球.csv")
+            await trace_history(output, ".ssq", session)
+            fns_sp = work_dir.joinpath(f"{int(rows[-1][0]) + 1}.ssq")
+            await get_fns_container(fns_sp, session=session)
+
+    asyncio.run(main())
+    return cassette
+
+
+def run(work_dir: Path, n_terms: int, n_tickets: int, rounds: int):
+    rows = synthetic_rows("ssq", n_terms)
+    tickets = [row[1:] for row in synthetic_rows("ssq", n_tickets, seed=1)]
+    page = history_page(rows, "ssq")
+    cassette = record(work_dir, rows)
+
+    async def replay(task):
+        async with Session(transport=ReplayTransport(cassette), host_rate=0) as session:
+            return await task(session)
+
+    def collect():
+        history_dir = work_dir.joinpath("history")
+        shutil.rmtree(history_dir, ignore_errors=True)
+        history_dir.mkdir(parents=True)
+        output = history_dir.joinpath("双色球.csv")
+        asyncio.run(replay(lambda session: trace_history(output, ".ssq", session)))
+        return output
+
+    next_term = str(int(rows[-1][0]) + 1)
+    fns_sp = work_dir.joinpath(f"{next_term}.ssq")
+
+    def fns():
+        # 每次清空已保存的杀号，避免命中 store 缓存；期号与杀号页面标注的一致
+        open_store(work_dir).put_fns("ssq", next_term, {"red": [], "blue": []})
+        container = asyncio.run(replay(lambda session: get_fns_container(fns_sp, session)))
+        assert container.is_ready(), "fns replay returned an empty container"
+
+    output = collect()
+    collector = Collector.from_branch("ssq")
+    collector._container = rows
+    collector._latest_term = rows[-1][0]
+    checker = SSQNumsChecker(tickets)
+    draws = read_draws(output)
+    pairs = [(ticket, row[1:]) for ticket in tickets[:20] for row in rows[:500]]
+
+    cases = {
+        "parse": lambda: parse_tdata(page, n_cols=8),
+        "collect": collect,
+        "save": lambda: collector.save_history(output),
+        "load": lambda: (collector.load_history(output), read_draws(output)),
+        "compare_nums": lambda: [compare_nums(mc, bingo) for mc, bingo in pairs],
+        "trace_results": lambda: sum(1 for _ in checker.trace_results(output, engine="numpy")),
+        "summarize": lambda: checker._summarize_draws(draws, top_k=3, workers=1),
+        "fns": fns,
+    }
+    return {name: measure(fn, rounds) for name, fn in cases.items()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, floor: float) -> list:
+    """:return: 超出 基线 * tolerance 且差值大于 floor 秒的用例"""
+    regressions = []
+    for name, elapsed in results.items():
+        expected = baseline.get(name)
+        status = "new"
+        if expected is not None:
+            ratio = elapsed / expected if expected else float("inf")
+            status = f"{ratio:.2f}x"
+            if elapsed > expected * tolerance and elapsed - expected > floor:
+                status += " REGRESSION"
+                regressions.append(name)
+        print(f"{name:>14} - {elapsed * 1000:>9.2f} ms  {status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--terms", type=int, default=3000)
+    parser.add_argument("--tickets", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--floor", type=float, default=0.005, help="忽略小于该秒数的波动")
+    parser.add_argument("--update", action="store_true", help="将本次结果写为基线")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(Path(tmp), args.terms, args.tickets, args.rounds)
+
+    key = f"terms={args.terms},tickets={args.tickets}"
+    baselines = (
+        json.loads(baseline_path.read_text(encoding="utf8")) if baseline_path.exists() else {}
+    )
+    if args.update:
+        baselines[key] = {name: round(elapsed, 6) for name, elapsed in results.items()}
+        baseline_path.write_text(json.dumps(baselines, indent=4), encoding="utf8")
+        compare(results, {}, args.tolerance, args.floor)
+        print(f"baseline updated - key={key} path={baseline_path}")
+        return
+
+    regressions = compare(results, baselines.get(key, {}), args.tolerance, args.floor)
+    if regressions:
+        print(f"performance regression - cases={regressions}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
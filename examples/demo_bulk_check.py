@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 02:10
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 双色球大文件批量兑奖，中断后重新运行即从断点继续
+import asyncio
+import csv
+from pathlib import Path
+
+from hysterical_ticket.component.bingo_ssq import Level
+from hysterical_ticket.component.bulk import BulkChecker
+from hysterical_ticket.component.collector import trace_history
+from hysterical_ticket.component.generator import TicketGenerator
+from hysterical_ticket.component.history import load_table
+
+this_dir = Path(__file__).parent
+tmp_dir = this_dir.joinpath("tmp_dir")
+cache_path = tmp_dir.joinpath("双色球.csv")
+tickets_path = tmp_dir.joinpath("tickets.csv")
+winners_path = tmp_dir.joinpath("winners.csv")
+ext = ".ssq"
+
+
+def make_tickets(n: int):
+    """生成 n 注随机号码作为演示输入，每行 [id, red_1, ..., blue_1]"""
+    generator = TicketGenerator.uniform("ssq", seed=0)
+    with open(tickets_path, "w", encoding="utf8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "red_1", "red_2", "red_3", "red_4", "red_5", "red_6", "blue_1"])
+        for i, nums in enumerate(generator.nums(n)):
+            writer.writerow([f"user-{i}"] + nums)
+
+
+async def main():
+    tmp_dir.mkdir(exist_ok=True)
+
+    await trace_history(cache_path, ext)
+    if not tickets_path.exists():
+        make_tickets(n_tickets)
+
+    # 最近 n_terms 期开奖
+    draws = sorted(load_table(cache_path).draws(), key=lambda d: int(d.term))[-n_terms:]
+    report = BulkChecker(draws, branch="ssq").run(tickets_path, winners_path)
+
+    print(
+        f"📦 {report.rows} 注 × {len(report.terms)} 期 - 无效：{report.invalid} "
+        f"中奖记录：{report.winners} 速度：{report.throughput:.0f} 注/秒 续跑：{report.resumed}"
+    )
+    for term in report.terms:
+        tiers = " ".join(
+            f"{Level.get_zh_level(level)}×{count}"
+            for level, count in sorted(report.levels[term].items())
+        )
+        print(f"📊 {term} - 固定奖金：{report.bonus[term]}￥ {tiers}")
+
+
+if __name__ == "__main__":
+    n_tickets = 2_000_000
+    n_terms = 10
+
+    asyncio.run(main())
@@ -4,6 +4,7 @@
 # Github     : https://github.com/QIN2DIM
 # Description: 双色球本期计算器
 from hysterical_ticket.component.bingo_ssq import SSQNumsChecker
+from hysterical_ticket.component.ticket import Ticket
 
 
 def main():
@@ -28,6 +29,6 @@ if __name__ == "__main__":
         ["06", "14", "17", "28", "31", "32", "13"],
     ]
 
-    bingo_nums = ["07", "09", "15", "16", "17", "26", "09"]
+    bingo_nums = Ticket.from_nums(["07", "09", "15", "16", "17", "26", "09"])
 
     main()
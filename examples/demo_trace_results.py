@@ -28,6 +28,15 @@ async def main():
                 f"- 中奖等级：{result.zh_level} 奖金：{result.bonus}￥ - {result.term}"
             )
 
+    # 只保留聚合结果，不为每一期创建 SSQResult
+    summary = nc.summarize(cache_path, top_k=3)
+    for record in summary.as_records(my_nums):
+        print(
+            f"📊 {record['nums']} - 奖金：{record['bonus']}￥ 成本：{record['cost']}￥ "
+            f"ROI：{record['roi']:.2%} 最长未中奖：{record['drought']} 期 "
+            f"首次中奖：{record['first_hit']} 最近中奖：{record['last_hit']} 最佳：{record['best']}"
+        )
+
 
 if __name__ == "__main__":
     # [["06", "10", "17", "22", "25", "26", "09"]]
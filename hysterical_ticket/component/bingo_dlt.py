@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 13:45
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 大乐透兑奖与历史回测
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from hysterical_ticket.component.checker import NumsChecker
+from hysterical_ticket.component.engine import build_lookup
+from hysterical_ticket.component.ticket import Ticket, as_ticket
+
+
+class Level:
+    first = 1
+    second = 2
+    third = 3
+    fourth = 4
+    fifth = 5
+    sixth = 6
+    seventh = 7
+    eighth = 8
+    ninth = 9
+    none = 0
+
+    @staticmethod
+    def get_bonus(level: int):
+        level2bonus = {0: 0, 9: 5, 8: 15, 7: 100, 6: 200, 5: 300, 4: 3000, 3: 10000, 2: -1, 1: -1}
+        return level2bonus[level]
+
+    @staticmethod
+    def get_zh_level(level: int):
+        level2zh = {
+            0: "无",
+            9: "九等奖",
+            8: "八等奖",
+            7: "七等奖",
+            6: "六等奖",
+            5: "五等奖",
+            4: "四等奖",
+            3: "三等奖",
+            2: "二等奖",
+            1: "一等奖",
+        }
+        return level2zh[level]
+
+
+# (前区命中数, 后区命中数) -> 奖级
+LEVEL_TABLE = np.array(
+    [
+        # 后区 0, 1, 2
+        [0, 0, 9],  # 前区 0
+        [0, 0, 9],  # 前区 1
+        [0, 9, 8],  # 前区 2
+        [9, 8, 6],  # 前区 3
+        [7, 5, 4],  # 前区 4
+        [3, 2, 1],  # 前区 5
+    ],
+    dtype=np.uint8,
+)
+
+
+def is_bingo(red: int, blue: int):
+    assert 0 <= red <= 5
+    assert 0 <= blue <= 2
+
+    return int(LEVEL_TABLE[red, blue])
+
+
+def compare_nums(mc: List[str] | Ticket, bingo_nums: List[str] | Ticket):
+    """:return: 命中前区数, 命中后区数"""
+    return as_ticket(mc, branch="dlt").compare(as_ticket(bingo_nums, branch="dlt"))
+
+
+@dataclass
+class DLTResult:
+    red: int = field(default=int)
+    blue: int = field(default=int)
+    level: int = field(default=int)
+    bonus: int = field(default=int)
+    zh_level: str = field(default=str)
+    term: str = field(default=str)
+
+
+class DLTNumsChecker(NumsChecker):
+    branch = "dlt"
+    judge = staticmethod(is_bingo)
+    get_bonus = staticmethod(Level.get_bonus)
+    get_zh_level = staticmethod(Level.get_zh_level)
+    result_cls = DLTResult
+    level_table = LEVEL_TABLE
+    bonus_table = build_lookup(Level.get_bonus, levels=10)
@@ -3,11 +3,15 @@
 # Author     : QIN2DIM
 # GitHub     : https://github.com/QIN2DIM
 # Description:
-import csv
+from __future__ import annotations
+
 from dataclasses import dataclass, field
-from pathlib import Path
 from typing import List
 
+from hysterical_ticket.component.checker import NumsChecker
+from hysterical_ticket.component.engine import build_level_table, build_lookup
+from hysterical_ticket.component.ticket import Ticket, as_ticket
+
 
 class Level:
     first = 1
@@ -55,16 +59,9 @@ def is_bingo(red: int, blue: int):
             return Level.first
 
 
-def compare_nums(mc: List[str], bingo_nums: List[str]):
-    red = 0
-    blue = 0
-    for num_red in mc[:-1]:
-        if num_red in bingo_nums[:-1]:
-            red += 1
-    if mc[-1] == bingo_nums[-1]:
-        blue += 1
-
-    return red, blue
+def compare_nums(mc: List[str] | Ticket, bingo_nums: List[str] | Ticket):
+    """:return: 命中红球数, 命中蓝球数"""
+    return as_ticket(mc).compare(as_ticket(bingo_nums))
 
 
 @dataclass
@@ -77,37 +74,11 @@ class SSQResult:
     term: str = field(default=str)
 
 
-class SSQNumsChecker:
-    def __init__(self, my_nums: List[List[str]]):
-        self.my_nums = my_nums
-
-    def get_results(self, bingo_nums: List[str]):
-        for i, mc in enumerate(self.my_nums):
-            red, blue = compare_nums(mc, bingo_nums)
-            level = is_bingo(red, blue)
-            yield mc, SSQResult(
-                red=red,
-                blue=blue,
-                level=level,
-                bonus=Level.get_bonus(level),
-                zh_level=Level.get_zh_level(level),
-            )
-
-    def trace_results(self, cache_path: Path):
-        text = cache_path.read_text(encoding="utf8")
-        reader = csv.reader([k for k in text.split("\n")[1:] if k])
-
-        for j, tn in enumerate(reader):
-            term = tn[0]
-            bingo_nums = tn[1:]
-            for i, mc in enumerate(self.my_nums):
-                red, blue = compare_nums(mc, bingo_nums)
-                level = is_bingo(red, blue)
-                yield mc, SSQResult(
-                    red=red,
-                    blue=blue,
-                    level=level,
-                    bonus=Level.get_bonus(level),
-                    zh_level=Level.get_zh_level(level),
-                    term=term,
-                )
+class SSQNumsChecker(NumsChecker):
+    branch = "ssq"
+    judge = staticmethod(is_bingo)
+    get_bonus = staticmethod(Level.get_bonus)
+    get_zh_level = staticmethod(Level.get_zh_level)
+    result_cls = SSQResult
+    level_table = build_level_table(is_bingo, max_red=6, max_blue=1)
+    bonus_table = build_lookup(Level.get_bonus, levels=7)
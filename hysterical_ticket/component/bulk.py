@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 01:50
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 大文件批量兑奖：分块读取 CSV/JSONL 号码，增量写出中奖记录与奖级合计，支持断点续跑
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.engine import Engine, encode_masks, popcount_masks
+from hysterical_ticket.component.generator import to_masks
+from hysterical_ticket.component.ticket import SPECS, Draw, Spec
+from hysterical_ticket.component.verifier import CHECKERS
+
+# 每块读取的号码行数，决定峰值内存：chunk × draws 的命中矩阵
+CHUNK_SIZE = 100_000
+
+WINNERS_HEAD = ["line", "ref", "term", "nums", "red", "blue", "level", "zh_level", "bonus"]
+
+
+@dataclass
+class Chunk:
+    """一块已解析的号码，无效行已剔除"""
+
+    lines: np.ndarray
+    refs: List[str]
+    nums: np.ndarray
+    red_masks: np.ndarray
+    blue_masks: np.ndarray
+    invalid: int = 0
+
+
+def _read_lines(file: BinaryIO, limit: int) -> Tuple[List[bytes], int]:
+    """:return: 至多 limit 行与读完这些行之后的字节偏移"""
+    lines = []
+    for _ in range(limit):
+        line = file.readline()
+        if not line:
+            break
+        lines.append(line)
+    return lines, file.tell()
+
+
+def _parse_records(lines: List[str], jsonl: bool, width: int) -> List[Tuple[int, str, list]]:
+    """:return: [(行内序号, ref, nums)]，nums 为 None 表示无法解析"""
+    records = []
+    if jsonl:
+        for i, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                records.append((i, "", None))
+                continue
+            if isinstance(obj, dict):
+                nums, ref = obj.get("nums"), str(obj.get("id", ""))
+            else:
+                nums, ref = obj, ""
+            ok = isinstance(nums, list) and len(nums) == width
+            records.append((i, ref, [str(n) for n in nums] if ok else None))
+        return records
+
+    for i, row in enumerate(csv.reader(lines)):
+        if not row:
+            continue
+        if len(row) < width:
+            records.append((i, "", None))
+            continue
+        records.append((i, ",".join(row[:-width]), [n.strip() for n in row[-width:]]))
+    return records
+
+
+def parse_chunk(lines: List[str], first_line: int, spec: Spec, jsonl: bool) -> Chunk:
+    """
+    CSV 每行末尾 red_size + blue_size 列为号码，之前的列原样作为 ref；
+    JSONL 每行为号码列表，或 {"id": ..., "nums": [...]}
+
+    号码范围与注内重复用位掩码向量化校验
+    """
+    width = spec.red_size + spec.blue_size
+    records = _parse_records(lines, jsonl, width)
+    # 号码有效数字至多两位，超长的数字在转换为 int64 之前剔除，避免溢出中断整个文件
+    parsed = [
+        r
+        for r in records
+        if r[2] is not None
+        and all(n.isascii() and n.isdigit() and len(n.lstrip("0")) <= 2 for n in r[2])
+    ]
+    invalid = len(records) - len(parsed)
+    # 第一行不是号码时视为表头
+    if first_line == 1 and records and records[0][0] == 0 and records[0] not in parsed:
+        invalid -= 1
+
+    if not parsed:
+        empty = np.empty(0, dtype=np.uint64)
+        return Chunk(
+            np.empty(0, dtype=np.int64), [], np.empty((0, width), np.uint8), empty, empty, invalid
+        )
+
+    nums = np.array([r[2] for r in parsed], dtype=np.int64)
+    reds, blues = nums[:, : spec.red_size], nums[:, spec.red_size :]
+    ok = ((reds >= 1) & (reds <= spec.red_width)).all(axis=1)
+    ok &= ((blues >= 1) & (blues <= spec.blue_width)).all(axis=1)
+    reds, blues = np.where(ok[:, None], reds, 1), np.where(ok[:, None], blues, 1)
+    red_masks, blue_masks = to_masks(reds), to_masks(blues)
+    ok &= popcount_masks(red_masks) == spec.red_size
+    ok &= popcount_masks(blue_masks) == spec.blue_size
+
+    keep = np.flatnonzero(ok)
+    lines_no = np.array([first_line + r[0] for r in parsed], dtype=np.int64)
+    nums = np.hstack([np.sort(reds, axis=1), np.sort(blues, axis=1)]).astype(np.uint8)
+    return Chunk(
+        lines=lines_no[keep],
+        refs=[parsed[i][1] for i in keep.tolist()],
+        nums=nums[keep],
+        red_masks=red_masks[keep],
+        blue_masks=blue_masks[keep],
+        invalid=invalid + len(parsed) - len(keep),
+    )
+
+
+@dataclass
+class BulkReport:
+    source: str
+    terms: List[str]
+    rows: int = 0
+    invalid: int = 0
+    winners: int = 0
+    # {term: {level: 中奖注数}}
+    levels: Dict[str, Dict[int, int]] = field(default_factory=dict)
+    # {term: 固定奖金合计}，浮动奖不计入
+    bonus: Dict[str, int] = field(default_factory=dict)
+    # 续跑时已处理的字节偏移与行数
+    offset: int = 0
+    lines: int = 0
+    resumed: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        data = dict(self.__dict__)
+        data["levels"] = {t: {str(k): v for k, v in lv.items()} for t, lv in self.levels.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        data = dict(data)
+        data["levels"] = {
+            t: {int(k): v for k, v in lv.items()} for t, lv in data.get("levels", {}).items()
+        }
+        return cls(**data)
+
+
+def _atomic_json(path: Path, data: dict):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf8") as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _fingerprint(source: Path, terms: Sequence[str], branch: str) -> dict:
+    stat = source.stat()
+    return {
+        "source": str(source.absolute()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "terms": list(terms),
+        "branch": branch,
+    }
+
+
+class BulkChecker:
+    """
+    >>> checker = BulkChecker(draws=[Draw.from_row(row) for row in rows], branch="ssq")
+    >>> report = checker.run(Path("tickets.csv"), Path("winners.csv"))
+
+    output: 中奖记录 CSV，每一块处理完后追加写入
+    output.checkpoint.json: 每块写完后原子更新，记录输入偏移、中奖文件长度与累计结果
+    output.totals.json: 全部完成后的奖级合计，完成时删除 checkpoint
+    """
+
+    def __init__(self, draws: Sequence[Draw], branch: str = "ssq", chunk_size: int = CHUNK_SIZE):
+        if not draws:
+            raise ValueError("No draws to check against")
+        self.spec = SPECS[branch]
+        self.checker = CHECKERS[branch]
+        self.draws = list(draws)
+        self.terms = [draw.term for draw in self.draws]
+        self.chunk_size = chunk_size
+        self.engine = Engine(
+            tickets_red=np.empty((0, self.spec.red_width), dtype=np.float32),
+            tickets_blue=np.empty((0, self.spec.blue_width), dtype=np.float32),
+            level_table=self.checker.level_table,
+            bonus_table=self.checker.bonus_table,
+        )
+
+    @staticmethod
+    def checkpoint_path(output: Path) -> Path:
+        return Path(output).with_suffix(".checkpoint.json")
+
+    @staticmethod
+    def totals_path(output: Path) -> Path:
+        return Path(output).with_suffix(".totals.json")
+
+    def _restore(self, source: Path, output: Path, fingerprint: dict) -> Tuple[BulkReport, int]:
+        """:return: (累计结果, 中奖文件应保留的字节数)，无法续跑时从头开始"""
+        path = self.checkpoint_path(output)
+        try:
+            state = json.loads(path.read_text(encoding="utf8"))
+            if state["fingerprint"] == fingerprint and output.exists():
+                report = BulkReport.from_dict(state["report"])
+                report.resumed = True
+                logging.info(
+                    f"resume bulk check - source={source.name} lines={report.lines} "
+                    f"offset={report.offset}"
+                )
+                return report, state["winners_bytes"]
+            logging.warning(f"checkpoint does not match source - path={path}")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            logging.warning(f"drop broken checkpoint - path={path} err={err}")
+        report = BulkReport(source=str(source), terms=list(self.terms))
+        report.levels = {term: {} for term in self.terms}
+        report.bonus = {term: 0 for term in self.terms}
+        return report, 0
+
+    def _accumulate(self, report: BulkReport, chunk: Chunk, writer) -> int:
+        """按 GRID_BUDGET 对开奖分块兑奖，累计奖级合计并写出中奖记录"""
+        self.engine.tickets_red = encode_masks(chunk.red_masks, self.spec.red_width)
+        self.engine.tickets_blue = encode_masks(chunk.blue_masks, self.spec.blue_width)
+        bonus_table = np.clip(self.engine.bonus_table, 0, None)
+        n_levels, winners = len(bonus_table), 0
+        zh_levels = [self.checker.get_zh_level(level) for level in range(n_levels)]
+        bonuses = [self.checker.get_bonus(level) for level in range(n_levels)]
+        text: List[str | None] = [None] * len(chunk.lines)
+        for offset, red, blue, levels in self.engine.iter_grid(self.draws):
+            for d, row in enumerate(levels):
+                term = self.terms[offset + d]
+                counts = np.bincount(row, minlength=n_levels)
+                tiers = report.levels[term]
+                for level in range(1, n_levels):
+                    if counts[level]:
+                        tiers[level] = tiers.get(level, 0) + int(counts[level])
+                report.bonus[term] += int((counts * bonus_table).sum())
+
+            draw_idx, ticket_idx = np.nonzero(levels)
+            # 每注号码只格式化一次，奖级名称与奖金查表
+            for j in np.unique(ticket_idx).tolist():
+                if text[j] is None:
+                    text[j] = " ".join(f"{n:02d}" for n in chunk.nums[j].tolist())
+            won = levels[draw_idx, ticket_idx].tolist()
+            writer.writerows(
+                zip(
+                    chunk.lines[ticket_idx].tolist(),
+                    [chunk.refs[j] for j in ticket_idx.tolist()],
+                    [self.terms[offset + d] for d in draw_idx.tolist()],
+                    [text[j] for j in ticket_idx.tolist()],
+                    red[draw_idx, ticket_idx].tolist(),
+                    blue[draw_idx, ticket_idx].tolist(),
+                    won,
+                    [zh_levels[level] for level in won],
+                    [bonuses[level] for level in won],
+                )
+            )
+            winners += len(draw_idx)
+        return winners
+
+    def run(self, source: Path, output: Path, resume: bool = True) -> BulkReport:
+        """
+        :param source: .csv 或 .jsonl/.ndjson 号码文件
+        :param output: 中奖记录 CSV
+        :param resume: 存在匹配的 checkpoint 时从中断处继续，否则从头开始
+        """
+        source, output = Path(source), Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        jsonl = source.suffix.lower() in (".jsonl", ".ndjson")
+        fingerprint = _fingerprint(source, self.terms, self.spec.branch)
+
+        if not resume:
+            self.checkpoint_path(output).unlink(missing_ok=True)
+        report, winners_bytes = self._restore(source, output, fingerprint)
+        start = time.perf_counter() - report.elapsed
+        rows_before = report.rows
+
+        with open(source, "rb") as src, open(output, "a+b") as raw:
+            # 丢弃上次 checkpoint 之后写入的不完整结果
+            raw.truncate(winners_bytes)
+            raw.seek(winners_bytes)
+            with open(raw.fileno(), "w", encoding="utf8", newline="", closefd=False) as out:
+                writer = csv.writer(out)
+                if not winners_bytes:
+                    writer.writerow(WINNERS_HEAD)
+                src.seek(report.offset)
+                while True:
+                    lines, offset = _read_lines(src, self.chunk_size)
+                    if not lines:
+                        break
+                    text = [line.decode("utf8", errors="replace") for line in lines]
+                    chunk = parse_chunk(text, report.lines + 1, self.spec, jsonl)
+                    report.winners += self._accumulate(report, chunk, writer)
+                    report.rows += len(chunk.lines)
+                    report.invalid += chunk.invalid
+                    report.lines += len(lines)
+                    report.offset = offset
+                    report.elapsed = time.perf_counter() - start
+
+                    out.flush()
+                    state = {
+                        "fingerprint": fingerprint,
+                        "winners_bytes": os.fstat(raw.fileno()).st_size,
+                        "report": report.as_dict(),
+                    }
+                    _atomic_json(self.checkpoint_path(output), state)
+                    logging.info(
+                        f"bulk check - source={source.name} rows={report.rows} "
+                        f"winners={report.winners} rate={report.throughput:.0f}/s"
+                    )
+
+        report.elapsed = time.perf_counter() - start
+        _atomic_json(self.totals_path(output), report.as_dict())
+        self.checkpoint_path(output).unlink(missing_ok=True)
+        logging.info(
+            f"bulk check done - source={source.name} rows={report.rows} invalid={report.invalid} "
+            f"winners={report.winners} new_rows={report.rows - rows_before} "
+            f"rate={report.throughput:.0f}/s"
+        )
+        return report
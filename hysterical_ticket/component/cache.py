@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 15:50
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 增量回测结果缓存
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.engine import Summary
+from hysterical_ticket.component.ticket import Draw, Ticket
+
+
+def tickets_key(tickets: Sequence[Ticket], branch: str, top_k: int = 0, history: str = "") -> str:
+    """
+    号码组的稳定哈希，与号码顺序相关，因为 Summary 按号码顺序存放
+
+    :param history: 历史的标识（如 csv 的绝对路径），不同历史的结果互不复用
+    """
+    digest = hashlib.sha256(f"{branch}:{top_k}:{history}".encode())
+    for ticket in tickets:
+        digest.update(f"|{ticket.red:x}.{ticket.blue:x}".encode())
+    return digest.hexdigest()[:32]
+
+
+def history_digest(draws: Sequence[Draw]) -> str:
+    """缓存覆盖的各期期号与号码的哈希，同一路径下的历史被替换或改写时不再命中"""
+    rows = np.array([(int(d.term), d.red, d.blue) for d in draws], dtype=np.int64)
+    return hashlib.sha256(rows.tobytes()).hexdigest()[:32]
+
+
+def _summary_arrays(summary: Summary):
+    return {
+        f.name: getattr(summary, f.name) for f in dataclasses.fields(summary) if f.name != "terms"
+    }
+
+
+@dataclass
+class ResultCache:
+    """
+    按号码组缓存截至某一期的 Summary，下次回测只计算新增的期号再与缓存合并
+
+    cache_dir/[key].npz，文件修改时间即最近使用时间，超出 max_entries 或 max_bytes 时
+    按最近最少使用淘汰
+    """
+
+    cache_dir: Path
+    max_entries: int = 256
+    max_bytes: int = 256 * 1024**2
+
+    suffix = ".npz"
+
+    def __post_init__(self):
+        self.cache_dir = Path(self.cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir.joinpath(f"{key}{self.suffix}")
+
+    def get(self, key: str) -> Tuple[Summary, str, str] | None:
+        """:return: (summary, last_term, history_digest) 或 None，旧版缓存的 digest 为空"""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                arrays = {name: data[name] for name in data.files if name != "meta"}
+            summary = Summary(terms=meta["terms"], **arrays)
+        except (FileNotFoundError, OSError, ValueError, KeyError, TypeError) as err:
+            if path.exists():
+                logging.warning(f"drop broken cache - key={key} err={err}")
+                path.unlink(missing_ok=True)
+            return None
+
+        os.utime(path)
+        return summary, meta["last_term"], meta.get("digest", "")
+
+    def put(self, key: str, summary: Summary, last_term: str, digest: str = ""):
+        """:param digest: summary 覆盖的各期的 history_digest"""
+        meta = json.dumps({"terms": summary.terms, "last_term": last_term, "digest": digest})
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.savez(file, meta=np.array(meta), **_summary_arrays(summary))
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(reverse=True)
+
+        kept, total = 0, 0
+        for mtime, size, path in entries:
+            if kept < self.max_entries and total + size <= self.max_bytes:
+                kept += 1
+                total += size
+                continue
+            path.unlink(missing_ok=True)
+            logging.info(f"evict cache - path={path.name}")
+
+    def clear(self):
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            path.unlink(missing_ok=True)
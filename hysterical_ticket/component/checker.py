@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 13:20
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 双色球与大乐透共用的兑奖/回测流程
+from __future__ import annotations
+
+import csv
+import logging
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Callable, List, Literal
+
+import numpy as np
+
+from hysterical_ticket.component.cache import ResultCache, history_digest, tickets_key
+from hysterical_ticket.component.compound import CompoundResult, CompoundTicket
+from hysterical_ticket.component.engine import BatchResult, Engine, Summary
+from hysterical_ticket.component.history import load_table
+from hysterical_ticket.component.parallel import SharedGrid, effective_workers
+from hysterical_ticket.component.ticket import SPECS, Draw, Ticket, as_ticket
+
+
+def read_history(cache_path: Path) -> List[List[str]]:
+    """:return: [[term, red_1, ..., blue_1], ...]"""
+    text = cache_path.read_text(encoding="utf8")
+    return list(csv.reader([k for k in text.split("\n")[1:] if k]))
+
+
+def read_draws(cache_path: Path, branch: str = "ssq") -> List[Draw]:
+    """优先读取 csv 旁的二进制历史，免去文本解析"""
+    table = load_table(cache_path)
+    if table is not None and table.branch == branch:
+        return table.draws()
+    return [Draw.from_row(tn, branch=branch) for tn in read_history(cache_path)]
+
+
+def sort_draws(draws: List[Draw]) -> List[Draw]:
+    """按开奖先后排列"""
+    return sorted(draws, key=lambda d: int(d.term))
+
+
+class NumsChecker:
+    """
+    子类声明玩法相关的部分：
+    branch: ssq / dlt
+    judge: (red_hits, blue_hits) -> level，逐注参照实现使用
+    get_bonus / get_zh_level: level -> 奖金 / 奖级名称
+    result_cls: 逐注结果的 dataclass
+    level_table / bonus_table: judge 与 get_bonus 的查找表，批量实现使用
+    """
+
+    branch: str
+    judge: Callable[[int, int], int]
+    get_bonus: Callable[[int], int]
+    get_zh_level: Callable[[int], str]
+    result_cls: type
+    level_table: np.ndarray
+    bonus_table: np.ndarray
+
+    def __init__(self, my_nums: List[List[str] | Ticket | CompoundTicket]):
+        self.my_nums = my_nums
+        self.tickets = [
+            mc if isinstance(mc, CompoundTicket) else as_ticket(mc, branch=self.branch)
+            for mc in my_nums
+        ]
+        # 单式在批量引擎中的列号，复式/胆拖为 -1
+        self._columns, column = [], 0
+        for ticket in self.tickets:
+            self._columns.append(-1 if isinstance(ticket, CompoundTicket) else column)
+            column += not isinstance(ticket, CompoundTicket)
+        self._engine: Engine | None = None
+
+    @property
+    def singles(self) -> List[Ticket]:
+        return [t for t in self.tickets if not isinstance(t, CompoundTicket)]
+
+    def _require_singles(self, task: str):
+        if len(self.singles) != len(self.tickets):
+            raise ValueError(f"Compound tickets are not supported - task={task}")
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            self._engine = Engine.from_tickets(
+                self.singles,
+                level_table=self.level_table,
+                bonus_table=self.bonus_table,
+                spec=SPECS[self.branch],
+            )
+        return self._engine
+
+    def _make_result(self, red: int, blue: int, level: int, term: str = ""):
+        if term:
+            return self.result_cls(
+                red=red,
+                blue=blue,
+                level=level,
+                bonus=self.get_bonus(level),
+                zh_level=self.get_zh_level(level),
+                term=term,
+            )
+        return self.result_cls(
+            red=red,
+            blue=blue,
+            level=level,
+            bonus=self.get_bonus(level),
+            zh_level=self.get_zh_level(level),
+        )
+
+    def _make_compound_result(self, ticket: CompoundTicket, draw: Ticket, term: str = ""):
+        red, blue = ticket.compare(draw)
+        counts = ticket.evaluate(draw, self.level_table)
+        levels = [level for level, n in enumerate(counts) if n and level]
+        level = min(levels, default=0)
+        result = CompoundResult(
+            red=red,
+            blue=blue,
+            bets=ticket.bets,
+            counts={level: counts[level] for level in levels},
+            level=level,
+            bonus=sum(max(self.get_bonus(lv), 0) * counts[lv] for lv in levels),
+            zh_level=self.get_zh_level(level),
+        )
+        if term:
+            result.term = term
+        return result
+
+    def _compare(self, ticket: Ticket | CompoundTicket, draw: Ticket, term: str = ""):
+        if isinstance(ticket, CompoundTicket):
+            return self._make_compound_result(ticket, draw, term)
+        red, blue = ticket.compare(draw)
+        return self._make_result(red, blue, self.judge(red, blue), term)
+
+    def get_results(self, bingo_nums: List[str] | Ticket):
+        """
+        本期兑奖，单式 yield (mc, result)，复式/胆拖 yield (mc, CompoundResult)
+        """
+        bingo = as_ticket(bingo_nums, branch=self.branch)
+        for mc, ticket in zip(self.my_nums, self.tickets):
+            yield mc, self._compare(ticket, bingo)
+
+    def trace_results(
+        self, cache_path: Path, engine: Literal["python", "numpy"] = "python", workers: int = 1
+    ):
+        """
+        历史回测，逐期逐注 yield (mc, result)，复式/胆拖 yield (mc, CompoundResult)
+
+        这是兼容旧调用方的接口，无论哪种 engine 都要为每一对 (term, mc) 创建结果对象，
+        耗时以此为主；大批量回测请使用 trace_matrix（矩阵）或 summarize（聚合）
+
+        :param cache_path: 双色球.csv / 大乐透.csv
+        :param engine: python 为逐注比对的参照实现，numpy 为批量矩阵实现，两者结果一致
+        :param workers: 大于 1 时按期号分片到多进程计算，隐含 engine="numpy"；
+            超过 CPU 核数时按核数计，网格过小时仍在本进程计算
+        """
+        if engine == "numpy" or workers > 1:
+            yield from self._trace_batched(cache_path, workers)
+            return
+
+        for draw in read_draws(cache_path, branch=self.branch):
+            term = draw.term
+            for mc, ticket in zip(self.my_nums, self.tickets):
+                yield mc, self._compare(ticket, draw, term)
+
+    def _trace_batched(self, cache_path: Path, workers: int = 1):
+        draws = read_draws(cache_path, branch=self.branch)
+        workers = effective_workers(workers, len(self.engine.tickets_red), len(draws))
+        with ExitStack() as stack:
+            grid = self.engine.iter_grid(draws)
+            if workers > 1:
+                grid = stack.enter_context(SharedGrid(self.engine, draws, workers)).iter_grid()
+            yield from self._iter_results(draws, grid)
+
+    def _iter_results(self, draws: List[Draw], grid):
+        """直接由命中矩阵与查找表构建结果对象，每块矩阵只转换一次为 Python 列表"""
+        n_levels = len(self.bonus_table)
+        bonuses = [self.get_bonus(level) for level in range(n_levels)]
+        zh_levels = [self.get_zh_level(level) for level in range(n_levels)]
+        result_cls = self.result_cls
+        pairs = list(zip(self.my_nums, self.tickets, self._columns))
+        for offset, red, blue, levels in grid:
+            for j, (reds, blues, row) in enumerate(
+                zip(red.tolist(), blue.tolist(), levels.tolist())
+            ):
+                draw = draws[offset + j]
+                term = draw.term
+                for mc, ticket, i in pairs:
+                    if i < 0:
+                        yield mc, self._make_compound_result(ticket, draw, term)
+                        continue
+                    level = row[i]
+                    # SSQResult 与 DLTResult 的字段顺序均为 red, blue, level, bonus, zh_level, term
+                    yield mc, result_cls(
+                        reds[i], blues[i], level, bonuses[level], zh_levels[level], term
+                    )
+
+    def trace_matrix(self, cache_path: Path) -> BatchResult:
+        """
+        历史回测的矩阵形式，不为每一对 (term, mc) 创建结果对象
+
+        :return: BatchResult, red/blue/level/bonus 的 shape 均为 (terms, len(my_nums))
+        """
+        self._require_singles("trace_matrix")
+        return self.engine.evaluate(read_draws(cache_path, branch=self.branch))
+
+    def summarize(
+        self, cache_path: Path, top_k: int = 0, workers: int = 1, cache: ResultCache = None
+    ) -> Summary:
+        """
+        历史回测的聚合形式，按期分块累加奖级分布、奖金、最长未中奖期数等，
+        不为每一对 (term, mc) 创建结果对象，也不保留 (terms, tickets) 矩阵
+
+        :param cache_path: 双色球.csv / 大乐透.csv
+        :param top_k: 为每注记录奖级最高的 k 期
+        :param workers: 大于 1 时按期号分片到多进程计算，各分片按期号顺序合并；
+            超过 CPU 核数时按核数计，网格过小时仍在本进程计算
+        :param cache: 命中缓存时只计算缓存之后新开奖的期号，再与缓存结果合并
+        """
+        self._require_singles("summarize")
+        draws = sort_draws(read_draws(cache_path, branch=self.branch))
+        if cache is None:
+            return self._summarize_draws(draws, top_k, workers)
+
+        history = str(Path(cache_path).resolve())
+        key = tickets_key(self.tickets, self.branch, top_k, history=history)
+        summary, pending = None, draws
+        hit = cache.get(key)
+        if hit:
+            cached, last_term, digest = hit
+            known = [d for d in draws if int(d.term) <= int(last_term)]
+            pending = draws[len(known) :]
+            # 历史被替换或改写（缺期、重排、号码变化）时缓存作废
+            if cached.terms == len(known) and digest == history_digest(known):
+                summary = cached
+        if summary is None:
+            summary, pending = Summary.empty(len(self.tickets), len(self.bonus_table), top_k), draws
+
+        logging.info(f"summarize - branch={self.branch} cached={summary.terms} new={len(pending)}")
+        if pending:
+            summary.merge(self._summarize_draws(pending, top_k, workers))
+        if draws:
+            cache.put(key, summary, last_term=draws[-1].term, digest=history_digest(draws))
+        return summary
+
+    def _summarize_draws(self, draws: List[Draw], top_k: int, workers: int) -> Summary:
+        workers = effective_workers(workers, len(self.engine.tickets_red), len(draws))
+        if workers > 1:
+            with SharedGrid(self.engine, draws, workers) as grid:
+                return grid.summarize(top_k)
+
+        summary = Summary.empty(len(self.tickets), n_levels=len(self.bonus_table), top_k=top_k)
+        for offset, _, _, levels in self.engine.iter_grid(draws):
+            terms = [d.term for d in draws[offset : offset + len(levels)]]
+            summary.update(terms, levels, self.bonus_table)
+        return summary
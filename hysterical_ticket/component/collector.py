@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import csv
-import json
 import logging
+import os
 import sys
-import time
+import tempfile
+from contextlib import AsyncExitStack, contextmanager
 from dataclasses import dataclass
 from dataclasses import field
 from enum import Enum
@@ -13,13 +14,38 @@ from typing import Literal, List, Callable
 
 import httpx
 from bs4 import BeautifulSoup
-from httpx import AsyncClient
+
+from hysterical_ticket.component.history import HistoryTable, load_table, release_table, table_path
+from hysterical_ticket.component.parser import parse_latest_date, parse_tdata
+from hysterical_ticket.component.schedule import is_stale
+from hysterical_ticket.component.session import BoundSession, Session
+from hysterical_ticket.component.stats import stats_path, update_stats
+from hysterical_ticket.component.store import Store, open_store
+from hysterical_ticket.component.ticket import Draw
 
 logging.basicConfig(
     level=logging.INFO, stream=sys.stdout, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
 
+VALIDATORS_FN = ".validators.json"
+# 期号范围页面，条件请求以它是否变化判断有没有新开奖
+LATEST_PAGE = "/history/history.shtml"
+
+
+@contextmanager
+def atomic_write(path: Path, **kwargs):
+    """写入同目录的临时文件，成功后再替换目标文件"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf8", **kwargs) as file:
+            yield file
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
 class Branch(Enum):
     SSQ = Literal["ssq"]
     DLT = Literal["dlt"]
@@ -30,12 +56,16 @@ class Collector:
     branch: str
 
     _name: str = ""
+    _key: str = ""
     _latest_term: str = ""
+    # 本次抓取的页面中最新一期的开奖日期，没有抓取页面时为空
+    _drawn_at: str = ""
     _container: List[List[str]] = field(default_factory=list)
     _container_head: List[str] = field(default_factory=list)
     _parser: Callable = None
 
-    _client: AsyncClient = None
+    _client: BoundSession = None
+    _store: Store = None
 
     @classmethod
     def from_branch(cls, branch: str, *args, **kwargs):
@@ -47,6 +77,7 @@ class Collector:
 
         if self.branch in [Branch.SSQ, "ssq"]:
             self._name = "双色球"
+            self._key = "ssq"
             self._container_head = [
                 "term",
                 "red_1",
@@ -60,6 +91,7 @@ class Collector:
             self._parser = self._parse_ssq_data
         elif self.branch in [Branch.DLT, "dlt"]:
             self._name = "大乐透"
+            self._key = "dlt"
             self._container_head = [
                 "term",
                 "red_1",
@@ -75,11 +107,23 @@ class Collector:
             logging.error(f"Unknown branch type - branch={self.branch}")
             sys.exit(1)
 
-    async def get_latest_term(self) -> str | None:
+    @property
+    def draws(self) -> List[Draw]:
+        return [Draw.from_row(row, branch=self._key) for row in self._container]
+
+    async def get_latest_term(self, conditional: bool = False) -> str | None:
+        """
+        :param conditional: 发送条件请求，页面自上次抓取后未变化（304）时返回 None
+        """
         if self._latest_term:
             return self._latest_term
 
-        resp = await self._client.get("/history/history.shtml")
+        resp = await self._client.get(LATEST_PAGE, conditional=conditional)
+        if resp.status_code == 304:
+            logging.info(f"get latest term - name={self._name} not_modified=True")
+            return None
+        # 重试耗尽后仍失败时直接抛出 HTTPStatusError，不把错误页交给解析
+        resp.raise_for_status()
 
         soup = BeautifulSoup(resp.text, "html.parser")
         latest_term = soup.find("div", class_="wrap_datachart").find("input", id="end")["value"]
@@ -90,72 +134,159 @@ class Collector:
         return latest_term
 
     def _parse_ssq_data(self, response: httpx.Response):
-        soup = BeautifulSoup(response.text, "html.parser")
-        trs = soup.find("tbody", attrs={"id": "tdata"}).find_all("tr")
-
         # 8列数据：期数ID, 红球6个, 蓝球1个
-        container = []
-        for tr in trs:
-            temp_ = [tr.find_all("td")[0].get_text().strip()]
-            temp_.extend([tr.find_all("td")[i].get_text().strip() for i in range(1, 7)])
-            temp_.append(tr.find_all("td")[7].get_text().strip())
-            container.append(temp_)
+        container = parse_tdata(response.text, n_cols=8)
         self._container = container
+        self._drawn_at = parse_latest_date(response.text) or ""
         return container
 
     def _parse_dlt_data(self, response: httpx.Response):
-        soup = BeautifulSoup(response.text, "html.parser")
-        trs = soup.find("tbody", attrs={"id": "tdata"}).find_all("tr")
-
         # 8列数据：期数ID, 红球5个, 蓝球2个
-        container = []
-        for tr in trs:
-            temp_ = [tr.find_all("td")[0].get_text().strip()]
-            temp_.extend([tr.find_all("td")[i].get_text().strip() for i in range(1, 6)])
-            temp_.extend([tr.find_all("td")[i].get_text().strip() for i in range(6, 8)])
-            container.append(temp_)
+        container = parse_tdata(response.text, n_cols=8)
         self._container = container
+        self._drawn_at = parse_latest_date(response.text) or ""
         return container
 
-    async def get_history(self):
-        """获取历史数据"""
+    def load_history(self, sp: Path) -> List[List[str]] | None:
+        """
+        读取本地历史并做一致性校验，任何一项不通过都返回 None：
+        表头一致、每行列数一致且均为数字、期号不重复、.bin 与 csv 的行数及期号一致、
+        store 中记录的最新期号一致
+
+        :param sp: 双色球.csv / 大乐透.csv
+        """
+        try:
+            with open(sp, encoding="utf8", newline="") as file:
+                rows = list(csv.reader(file))
+        except (FileNotFoundError, UnicodeDecodeError, csv.Error):
+            return None
+
+        if not rows or rows[0] != self._container_head:
+            return None
+        rows = rows[1:]
+        width = len(self._container_head)
+        if not rows or any(len(row) != width or not all(map(str.isdigit, row)) for row in rows):
+            return None
+        terms = [int(row[0]) for row in rows]
+        if len(set(terms)) != len(terms):
+            return None
+
+        table = load_table(sp)
+        consistent = table is None or table.terms.tolist() == terms
+        # 随后的 save_history 会重写 .bin，先释放映射，Windows 下被映射的文件不能替换
+        release_table(table_path(sp))
+        if not consistent:
+            return None
+
+        last_term = max(rows, key=lambda row: int(row[0]))[0]
+        store = self._store or open_store(sp.parent)
+        if store.latest_term(self._key) != last_term:
+            return None
+        return rows
+
+    @staticmethod
+    def merge_rows(rows: List[List[str]], new_rows: List[List[str]]) -> List[List[str]]:
+        """按期号去重合并，沿用本地历史的排列方向（开奖网站按期号倒序）"""
+        known = {row[0] for row in rows}
+        new_rows = [row for row in new_rows if row[0] not in known]
+        descending = len(rows) > 1 and int(rows[0][0]) > int(rows[-1][0])
+        new_rows.sort(key=lambda row: int(row[0]), reverse=descending)
+        return new_rows + rows if descending else rows + new_rows
+
+    async def get_history(self, sp: Path | None = None):
+        """
+        获取历史数据
+
+        :param sp: 本地历史，校验通过时只抓取最新一期之后的增量，否则从第 1 期全量抓取
+        """
         if self._container:
             logging.info(f"get history - name={self._name} length={len(self._container)}")
             return self._container
 
-        params = {"start": 1, "end": await self.get_latest_term()}
-        res = await self._client.get("/history/newinc/history.php", params=params)
+        rows = self.load_history(sp) if sp else None
+        if sp and rows is None and sp.exists():
+            logging.warning(f"local history failed consistency check - path={sp}")
 
+        latest_term = await self.get_latest_term(conditional=bool(rows))
+        if latest_term is None:
+            # 页面未变化，没有新开奖
+            self._latest_term = max(rows, key=lambda row: int(row[0]))[0]
+            self._container = rows
+            return self._container
+        if not rows:
+            params = {"start": 1, "end": latest_term}
+        else:
+            last_term = max(int(row[0]) for row in rows)
+            if last_term >= int(latest_term):
+                logging.info(f"get history - name={self._name} delta=0")
+                self._container = rows
+                return self._container
+            params = {"start": f"{last_term + 1:0{len(latest_term)}d}", "end": latest_term}
+
+        res = await self._client.get("/history/newinc/history.php", params=params)
+        res.raise_for_status()
         container = self._parser(res)
 
-        logging.info(f"get history - name={self._name} size={len(container)}")
+        if rows:
+            self._container = self.merge_rows(rows, container)
+            logging.info(f"get history - name={self._name} delta={len(container)}")
+        else:
+            logging.info(f"get history - name={self._name} size={len(container)}")
+        return self._container
+
+    def save_history(self, sp: Path, store: Store | None = None):
+        """
+        csv、.bin 与 .stats.npz 先写临时文件再替换，历史、最新期号与抓取时间在一个事务内写入 store
 
-    def save_history(self, sp: Path):
-        with open(sp, "w", encoding="utf8", newline="") as file:
+        :param store: 为 None 时使用 csv 所在目录的 hysteria.db
+        """
+        store = store or self._store or open_store(sp.parent)
+        with atomic_write(sp, newline="") as file:
             writer = csv.writer(file)
             writer.writerow(self._container_head)
             writer.writerows(self._container)
         logging.info(f"save history - branch={self._name} path={str(sp)}")
 
-        fn = f"{self._latest_term}.{self.branch}"
-        metadata = {"version": self._latest_term}
-        metadata = json.dumps(metadata, indent=4, sort_keys=False, ensure_ascii=True)
-        sp.parent.joinpath(fn).write_text(metadata)
-        logging.info(f"save latest term - branch={self._name} path={str(sp)}")
+        HistoryTable.write(table_path(sp), self._key, self._container)
+        # 出现次数、遗漏与冷热号只追加新的期号
+        update_stats(sp, self._key, self._container)
+
+        store.put_history(self._key, self._container, self._latest_term, self._drawn_at or None)
+        # 历史落盘后才让最新一期页面的 validator 生效，保存失败时下次仍会重新抓取
+        if self._client is not None:
+            self._client.commit(LATEST_PAGE)
+        store.track(sp, table_path(sp), stats_path(sp))
+        logging.info(f"save latest term - branch={self._name} term={self._latest_term}")
+
+
+def read_latest_term(store: Store | Path, ext: str) -> int:
+    """
+    本地最新期号，没有则为 0
 
+    :param store: Store 或其所在目录
+    """
+    store = store if isinstance(store, Store) else open_store(store)
+    return int(store.latest_term(ext.lstrip(".")) or 0)
 
-async def trace_history(output: Path, ext: str):
-    if output.exists() and time.time() - output.stat().st_ctime < 43200:
+
+async def trace_history(
+    output: Path, ext: str, session: Session | None = None, store: Store | None = None
+):
+    """
+    :param session: 共享的 HTTP 层，为 None 时临时创建一个
+    :param store: 为 None 时使用 output 所在目录的 hysteria.db
+    """
+    branch = ext.replace(".", "")
+    store = store or open_store(output.parent)
+    if output.exists() and not is_stale(branch, store):
         logging.info(f"load cache - task=collect ext={ext}")
         return
 
-    branch = ext.replace(".", "")
     base_url = f"https://datachart.500.com/{branch}"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/114.0.0.0 Safari/537.36 Edg/114.0.1823.79"
-    }
-    async with AsyncClient(headers=headers, base_url=base_url) as client:
-        collector = Collector.from_branch(branch, _client=client)
-        await collector.get_history()
+    async with AsyncExitStack() as stack:
+        if session is None:
+            validators_path = output.parent.joinpath(VALIDATORS_FN)
+            session = await stack.enter_async_context(Session(validators_path=validators_path))
+        collector = Collector.from_branch(branch, _client=session.bind(base_url), _store=store)
+        await collector.get_history(output)
         collector.save_history(output)
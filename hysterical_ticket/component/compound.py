@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 15:10
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 复式/胆拖投注
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import combinations
+from math import comb
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from hysterical_ticket.component.ticket import SPECS, Spec, Ticket, from_mask, popcount, to_mask
+
+
+def zone_distribution(hit_banker: int, hit_drag: int, n_drag: int, pick: int) -> List[int]:
+    """
+    单个号区内，按命中个数统计子注数
+
+    从 n_drag 个拖码中选 pick 个与全部胆码组成一注，
+    命中 h 个的注数为 C(hit_drag, h - hit_banker) * C(n_drag - hit_drag, pick - (h - hit_banker))
+
+    :return: counts[h] = 命中 h 个号码的子注数
+    """
+    counts = [0] * (hit_banker + pick + 1)
+    for x in range(min(hit_drag, pick) + 1):
+        counts[hit_banker + x] = comb(hit_drag, x) * comb(n_drag - hit_drag, pick - x)
+    return counts
+
+
+class CompoundTicket:
+    """
+    复式或胆拖投注，各号区分别由胆码掩码与拖码掩码组成，无胆码即为复式
+
+    >>> ct = CompoundTicket.from_nums(reds=["01", "02", "03", "04", "05", "06", "07"], blues=["01", "02"])
+    >>> ct.bets
+    14
+    """
+
+    __slots__ = ("red_banker", "red", "blue_banker", "blue", "spec")
+
+    def __init__(self, red_banker: int, red: int, blue_banker: int, blue: int, spec: Spec):
+        self.red_banker = red_banker
+        self.red = red
+        self.blue_banker = blue_banker
+        self.blue = blue
+        self.spec = spec
+        self._validate()
+
+    @classmethod
+    def from_nums(
+        cls,
+        reds: Sequence[str],
+        blues: Sequence[str],
+        red_bankers: Sequence[str] = (),
+        blue_bankers: Sequence[str] = (),
+        branch: str = "ssq",
+    ):
+        """
+        :param reds: 红球（前区）拖码，无胆码时即复式号码
+        :param blues: 蓝球（后区）拖码
+        :param red_bankers: 红球（前区）胆码
+        :param blue_bankers: 蓝球（后区）胆码，仅大乐透可用
+        """
+        spec = SPECS[branch]
+        return cls(
+            red_banker=to_mask(red_bankers, spec.red_width),
+            red=to_mask(reds, spec.red_width),
+            blue_banker=to_mask(blue_bankers, spec.blue_width),
+            blue=to_mask(blues, spec.blue_width),
+            spec=spec,
+        )
+
+    def _validate(self):
+        for banker, drag, size, zone in [
+            (self.red_banker, self.red, self.spec.red_size, "red"),
+            (self.blue_banker, self.blue, self.spec.blue_size, "blue"),
+        ]:
+            if banker & drag:
+                raise ValueError(f"Banker overlaps drag - zone={zone}")
+            n_banker = popcount(banker)
+            if n_banker >= size and drag:
+                raise ValueError(f"Too many bankers - zone={zone} bankers={n_banker} size={size}")
+            if n_banker + popcount(drag) < size:
+                raise ValueError(f"Not enough numbers - zone={zone} size={size}")
+
+    @property
+    def red_pick(self) -> int:
+        return self.spec.red_size - popcount(self.red_banker)
+
+    @property
+    def blue_pick(self) -> int:
+        return self.spec.blue_size - popcount(self.blue_banker)
+
+    @property
+    def bets(self) -> int:
+        """子注数"""
+        return comb(popcount(self.red), self.red_pick) * comb(popcount(self.blue), self.blue_pick)
+
+    def expand(self) -> List[Ticket]:
+        """展开为全部单式，仅用于核对"""
+        tickets = []
+        for reds in combinations(from_mask(self.red), self.red_pick):
+            red = self.red_banker | to_mask(reds, self.spec.red_width)
+            for blues in combinations(from_mask(self.blue), self.blue_pick):
+                blue = self.blue_banker | to_mask(blues, self.spec.blue_width)
+                tickets.append(Ticket(red=red, blue=blue, spec=self.spec))
+        return tickets
+
+    def compare(self, other: Ticket):
+        """:return: 命中红球数, 命中蓝球数（胆码与拖码合计）"""
+        return (
+            popcount((self.red_banker | self.red) & other.red),
+            popcount((self.blue_banker | self.blue) & other.blue),
+        )
+
+    def evaluate(self, other: Ticket, level_table: np.ndarray) -> List[int]:
+        """
+        不展开子注，由两个号区的命中分布直接求出各奖级的中奖注数
+
+        :param other: 开奖号码
+        :param level_table: (red_hits, blue_hits) -> level 查找表
+        :return: counts[level] = 该奖级的中奖注数
+        """
+        red = zone_distribution(
+            popcount(self.red_banker & other.red),
+            popcount(self.red & other.red),
+            popcount(self.red),
+            self.red_pick,
+        )
+        blue = zone_distribution(
+            popcount(self.blue_banker & other.blue),
+            popcount(self.blue & other.blue),
+            popcount(self.blue),
+            self.blue_pick,
+        )
+        counts = [0] * (int(level_table.max()) + 1)
+        for r, n_red in enumerate(red):
+            if not n_red:
+                continue
+            for b, n_blue in enumerate(blue):
+                if n_blue:
+                    counts[level_table[r, b]] += n_red * n_blue
+        return counts
+
+    def to_nums(self) -> Dict[str, List[str]]:
+        return {
+            "red_bankers": from_mask(self.red_banker),
+            "reds": from_mask(self.red),
+            "blue_bankers": from_mask(self.blue_banker),
+            "blues": from_mask(self.blue),
+        }
+
+    def __repr__(self):
+        return f"CompoundTicket({self.spec.branch}, {self.to_nums()})"
+
+
+@dataclass
+class CompoundResult:
+    """
+    red / blue: 胆码与拖码合计命中数
+    bets: 子注数
+    counts: {level: 中奖注数}，不含未中奖
+    level / zh_level: 最高中奖等级
+    bonus: 固定奖金合计，一、二等奖为浮动奖金，不计入
+    """
+
+    red: int = field(default=int)
+    blue: int = field(default=int)
+    bets: int = field(default=int)
+    counts: Dict[int, int] = field(default_factory=dict)
+    level: int = field(default=int)
+    bonus: int = field(default=int)
+    zh_level: str = field(default=str)
+    term: str = field(default=str)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 23:10
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 带约束的选号与校验：杀号排除、和值/奇偶/跨度过滤、不与历史开奖重复
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.generator import TicketGenerator, to_masks
+from hysterical_ticket.component.history import HistoryTable
+from hysterical_ticket.component.index import HistoryIndex
+from hysterical_ticket.component.ticket import Spec, to_mask
+
+
+@dataclass
+class Constraints:
+    """
+    exclude_red / exclude_blue: 杀号，不能出现的号码
+    red_sum: 红球和值范围，闭区间
+    red_odd: 红球奇数个数范围
+    red_span: 红球跨度（最大号 - 最小号）范围
+    unique: 不能与任何一期历史开奖完全相同（提示词要求 4）
+    unique_red: 红球部分也不能与历史开奖相同
+    """
+
+    exclude_red: Sequence[str] = ()
+    exclude_blue: Sequence[str] = ()
+    red_sum: Tuple[int, int] | None = None
+    red_odd: Tuple[int, int] | None = None
+    red_span: Tuple[int, int] | None = None
+    unique: bool = True
+    unique_red: bool = False
+
+    @classmethod
+    def from_fns(cls, fnc, **kwargs):
+        """:param fnc: FnsContainer"""
+        return cls(exclude_red=list(fnc.red), exclude_blue=list(fnc.blue), **kwargs)
+
+
+@dataclass
+class AcceptanceStats:
+    generated: int = 0
+    accepted: int = 0
+    batches: int = 0
+    # {rule: 未通过该规则的注数}，一注可能同时违反多条规则
+    rejected: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def rate(self) -> float:
+        return self.accepted / self.generated if self.generated else 0
+
+    def merge(self, other: AcceptanceStats):
+        self.generated += other.generated
+        self.accepted += other.accepted
+        self.batches += other.batches
+        for rule, count in other.rejected.items():
+            self.rejected[rule] = self.rejected.get(rule, 0) + count
+
+
+class ConstraintFilter:
+    """
+    对整批号码做向量化校验
+
+    >>> cf = ConstraintFilter.from_table(load_table(cache_path), Constraints.from_fns(fnc))
+    >>> reds, blues, stats = cf.sample(TicketGenerator.from_history(table), 1000)
+    """
+
+    def __init__(self, spec: Spec, constraints: Constraints, index: HistoryIndex | None = None):
+        self.spec = spec
+        self.constraints = constraints
+        self.stats = AcceptanceStats()
+        self._exclude_red = np.uint64(to_mask(constraints.exclude_red, spec.red_width))
+        self._exclude_blue = np.uint64(to_mask(constraints.exclude_blue, spec.blue_width))
+
+        # 历史开奖索引，为 None 时不检查是否与历史重复
+        self.index = index
+
+    @classmethod
+    def from_table(cls, table: HistoryTable, constraints: Constraints | None = None):
+        return cls(table.spec, constraints or Constraints(), HistoryIndex.from_table(table))
+
+    def rules(self, reds: np.ndarray, blues: np.ndarray) -> Dict[str, np.ndarray]:
+        """:return: {rule: 违反该规则的布尔数组}"""
+        c = self.constraints
+        red_masks, blue_masks = to_masks(reds), to_masks(blues)
+        rules = {}
+        if self._exclude_red:
+            rules["exclude_red"] = (red_masks & self._exclude_red) != 0
+        if self._exclude_blue:
+            rules["exclude_blue"] = (blue_masks & self._exclude_blue) != 0
+        if c.red_sum:
+            total = reds.sum(axis=1, dtype=np.int64)
+            rules["red_sum"] = (total < c.red_sum[0]) | (total > c.red_sum[1])
+        if c.red_odd:
+            odd = (reds & 1).sum(axis=1, dtype=np.int64)
+            rules["red_odd"] = (odd < c.red_odd[0]) | (odd > c.red_odd[1])
+        if c.red_span:
+            # 每行升序，跨度即首尾之差
+            span = reds[:, -1].astype(np.int64) - reds[:, 0]
+            rules["red_span"] = (span < c.red_span[0]) | (span > c.red_span[1])
+        if c.unique and self.index is not None:
+            rules["historical"] = self.index.contains(red_masks, blue_masks)
+        if c.unique_red and self.index is not None:
+            rules["historical_red"] = self.index.contains_red(red_masks)
+        return rules
+
+    def check(self, reds: np.ndarray, blues: np.ndarray) -> np.ndarray:
+        """:return: 通过全部规则的布尔数组，并累计到 self.stats"""
+        rules = self.rules(reds, blues)
+        ok = np.ones(len(reds), dtype=bool)
+        for rule, failed in rules.items():
+            ok &= ~failed
+            self.stats.rejected[rule] = self.stats.rejected.get(rule, 0) + int(failed.sum())
+        self.stats.generated += len(reds)
+        self.stats.accepted += int(ok.sum())
+        self.stats.batches += 1
+        return ok
+
+    def violations(self, nums: Sequence[str]) -> List[str]:
+        """单注号码违反的规则，nums 为 [red_1, ..., blue_1] 格式"""
+        size = self.spec.red_size
+        reds = np.array([[int(n) for n in nums[:size]]], dtype=np.uint8)
+        blues = np.array([[int(n) for n in nums[size:]]], dtype=np.uint8)
+        return [rule for rule, failed in self.rules(reds, blues).items() if failed[0]]
+
+    def sample(
+        self,
+        generator: TicketGenerator,
+        n: int,
+        max_generated: int | None = None,
+        min_rate: float = 1e-4,
+    ) -> Tuple[np.ndarray, np.ndarray, AcceptanceStats]:
+        """
+        批量拒绝采样直到得到 n 注，批大小按已观测的通过率调整
+
+        杀号在采样前就从生成器的权重中去掉，不消耗拒绝采样的配额
+
+        :param max_generated: 最多生成的注数，默认 n / min_rate，约束过紧时提前结束
+        :return: (reds, blues, 本次采样的统计)，注数可能少于 n
+        """
+        generator = generator.restrict(
+            red=self.constraints.exclude_red, blue=self.constraints.exclude_blue
+        )
+        max_generated = max_generated or int(n / min_rate) + 1
+        before = AcceptanceStats(**{**self.stats.__dict__, "rejected": dict(self.stats.rejected)})
+
+        reds_out, blues_out, accepted, generated = [], [], 0, 0
+        rate = 1.0
+        while accepted < n and generated < max_generated:
+            want = n - accepted
+            batch = int(min(max(want / max(rate, min_rate) * 1.2, 1024), max_generated - generated))
+            reds, blues = generator.sample(batch)
+            ok = self.check(reds, blues)
+            reds_out.append(reds[ok][:want])
+            blues_out.append(blues[ok][:want])
+            accepted += len(reds_out[-1])
+            generated += batch
+            rate = max(self.stats.accepted - before.accepted, 1) / (
+                self.stats.generated - before.generated
+            )
+
+        stats = AcceptanceStats(
+            generated=self.stats.generated - before.generated,
+            accepted=self.stats.accepted - before.accepted,
+            batches=self.stats.batches - before.batches,
+            rejected={
+                rule: count - before.rejected.get(rule, 0)
+                for rule, count in self.stats.rejected.items()
+            },
+        )
+        if accepted < n:
+            logging.warning(
+                f"constraints too tight - wanted={n} got={accepted} rate={stats.rate:.6f}"
+            )
+        logging.info(
+            f"sample constrained - n={accepted} generated={stats.generated} rate={stats.rate:.4f} "
+            f"rejected={stats.rejected}"
+        )
+        reds = np.concatenate(reds_out) if reds_out else np.empty((0, self.spec.red_size), np.uint8)
+        blues = (
+            np.concatenate(blues_out) if blues_out else np.empty((0, self.spec.blue_size), np.uint8)
+        )
+        return reds, blues, stats
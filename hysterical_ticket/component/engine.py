@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 10:12
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 批量开奖计算引擎
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.ticket import SPECS, Draw, Spec, Ticket
+
+# 单次矩阵运算的元素上限（tickets × terms），控制峰值内存
+GRID_BUDGET = 1 << 22
+
+
+def encode_masks(masks: Sequence[int], width: int) -> np.ndarray:
+    """
+    将位掩码展开为 one-hot 矩阵，两个矩阵相乘即得每一对的命中数
+
+    :param masks: Ticket.red / Ticket.blue 序列
+    :param width: 号码上限，如双色球红球为 33
+    :return: shape=(len(masks), width) float32
+    """
+    masks = np.asarray(masks, dtype=np.uint64).reshape(-1, 1)
+    bits = (masks >> np.arange(width, dtype=np.uint64)) & np.uint64(1)
+    return bits.astype(np.float32)
+
+
+def popcount_masks(masks: np.ndarray, dtype=np.int64) -> np.ndarray:
+    """按元素统计 uint64 位掩码数组中 1 的个数，numpy>=2.0 使用硬件 popcount"""
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).astype(dtype, copy=False)
+    bits = np.unpackbits(masks.view(np.uint8).reshape(*masks.shape, 8), axis=-1)
+    return bits.sum(axis=-1, dtype=dtype)
+
+
+def build_level_table(judge: Callable[[int, int], int], max_red: int, max_blue: int) -> np.ndarray:
+    """将 is_bingo 预计算为 (red_hits, blue_hits) -> level 查找表"""
+    table = np.zeros((max_red + 1, max_blue + 1), dtype=np.uint8)
+    for red in range(max_red + 1):
+        for blue in range(max_blue + 1):
+            table[red, blue] = judge(red, blue)
+    return table
+
+
+def build_lookup(mapping: Callable[[int], int], levels: int) -> np.ndarray:
+    """将 Level.get_bonus 预计算为 level -> bonus 查找表"""
+    return np.array([mapping(level) for level in range(levels)], dtype=np.int64)
+
+
+@dataclass
+class BatchResult:
+    terms: List[str] = field(default_factory=list)
+    red: np.ndarray = None
+    blue: np.ndarray = None
+    level: np.ndarray = None
+    bonus: np.ndarray = None
+
+
+@dataclass
+class Engine:
+    """
+    对 tickets × terms 网格做批量比对：
+    red_hits = T_red @ D_red.T, blue_hits = T_blue @ D_blue.T, level = table[red_hits, blue_hits]
+    """
+
+    tickets_red: np.ndarray
+    tickets_blue: np.ndarray
+    level_table: np.ndarray
+    bonus_table: np.ndarray
+
+    @classmethod
+    def from_tickets(
+        cls,
+        tickets: Sequence[Ticket],
+        *,
+        level_table: np.ndarray,
+        bonus_table: np.ndarray,
+        spec: Spec = None,
+    ):
+        spec = spec or (tickets[0].spec if tickets else SPECS["ssq"])
+        return cls(
+            tickets_red=encode_masks([t.red for t in tickets], spec.red_width),
+            tickets_blue=encode_masks([t.blue for t in tickets], spec.blue_width),
+            level_table=level_table,
+            bonus_table=bonus_table,
+        )
+
+    def encode_draws(self, draws: Sequence[Ticket]) -> Tuple[np.ndarray, np.ndarray]:
+        red = encode_masks([d.red for d in draws], self.tickets_red.shape[1])
+        blue = encode_masks([d.blue for d in draws], self.tickets_blue.shape[1])
+        return red, blue
+
+    def chunk_size(self) -> int:
+        return max(1, GRID_BUDGET // max(1, len(self.tickets_red)))
+
+    def hits(self, draws_red: np.ndarray, draws_blue: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """:return: red_hits, blue_hits shape=(terms, tickets) uint8"""
+        red = (draws_red @ self.tickets_red.T).astype(np.uint8)
+        blue = (draws_blue @ self.tickets_blue.T).astype(np.uint8)
+        return red, blue
+
+    def iter_grid(
+        self, draws: Sequence[Ticket]
+    ) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        """按期分块计算，yield (offset, red_hits, blue_hits, levels)"""
+        step = self.chunk_size()
+        for offset in range(0, len(draws), step):
+            draws_red, draws_blue = self.encode_draws(draws[offset : offset + step])
+            red, blue = self.hits(draws_red, draws_blue)
+            yield offset, red, blue, self.level_table[red, blue]
+
+    def evaluate(self, draws: Sequence[Draw]) -> BatchResult:
+        n_terms, n_tickets = len(draws), len(self.tickets_red)
+        red = np.empty((n_terms, n_tickets), dtype=np.uint8)
+        blue = np.empty((n_terms, n_tickets), dtype=np.uint8)
+        level = np.empty((n_terms, n_tickets), dtype=np.uint8)
+        for offset, r, b, lv in self.iter_grid(draws):
+            red[offset : offset + len(r)] = r
+            blue[offset : offset + len(b)] = b
+            level[offset : offset + len(lv)] = lv
+        return BatchResult(
+            terms=[d.term for d in draws],
+            red=red,
+            blue=blue,
+            level=level,
+            bonus=self.bonus_table[level],
+        )
+
+
+@dataclass
+class Summary:
+    """
+    回测聚合结果，按期分块累加，内存占用与历史期数无关
+
+    levels: (tickets, n_levels) 各奖级命中次数
+    bonus: (tickets,) 固定奖金合计，一、二等奖为浮动奖金，不计入
+    drought: (tickets,) 最长连续未中奖期数
+    leading / trailing: 首次中奖前 / 最近一次中奖后的连续未中奖期数，用于拼接相邻区间
+    first_hit / last_hit: 首次 / 最近一次中奖期号，未中奖为空串
+    best_level / best_term: 每注奖级最高的 top_k 期，空位的 level 为 0
+    """
+
+    terms: int
+    levels: np.ndarray
+    bonus: np.ndarray
+    drought: np.ndarray
+    leading: np.ndarray
+    trailing: np.ndarray
+    first_hit: np.ndarray
+    last_hit: np.ndarray
+    best_level: np.ndarray
+    best_term: np.ndarray
+
+    price = 2
+    _empty_rank = 0xFF
+
+    @classmethod
+    def empty(cls, n_tickets: int, n_levels: int, top_k: int = 0):
+        zeros = partial(np.zeros, n_tickets, dtype=np.int64)
+        return cls(
+            terms=0,
+            levels=np.zeros((n_tickets, n_levels), dtype=np.int64),
+            bonus=zeros(),
+            drought=zeros(),
+            leading=zeros(),
+            trailing=zeros(),
+            first_hit=np.full(n_tickets, "", dtype="<U16"),
+            last_hit=np.full(n_tickets, "", dtype="<U16"),
+            best_level=np.zeros((n_tickets, top_k), dtype=np.uint8),
+            best_term=np.full((n_tickets, top_k), "", dtype="<U16"),
+        )
+
+    @property
+    def top_k(self) -> int:
+        return self.best_level.shape[1]
+
+    @property
+    def cost(self) -> np.ndarray:
+        """(tickets,) 每注每期 2￥"""
+        return np.full(len(self.bonus), self.terms * self.price, dtype=np.int64)
+
+    @property
+    def roi(self) -> np.ndarray:
+        cost = self.cost
+        return np.divide(self.bonus - cost, cost, out=np.zeros(len(cost)), where=cost > 0)
+
+    @property
+    def total_bonus(self) -> int:
+        return int(self.bonus.sum())
+
+    @property
+    def total_cost(self) -> int:
+        return int(self.cost.sum())
+
+    @property
+    def total_roi(self) -> float:
+        cost = self.total_cost
+        return (self.total_bonus - cost) / cost if cost else 0.0
+
+    def update(self, terms: Sequence[str], levels: np.ndarray, bonus_table: np.ndarray):
+        """
+        累加紧随其后的一段开奖
+
+        :param terms: 该段的期号，按开奖先后排列
+        :param levels: shape=(len(terms), tickets)
+        """
+        n_terms = len(terms)
+        if not n_terms:
+            return self
+
+        for level in range(self.levels.shape[1]):
+            self.levels[:, level] += np.count_nonzero(levels == level, axis=0)
+        self.bonus += np.clip(bonus_table, 0, None)[levels].sum(axis=0)
+
+        hit = levels != 0
+        any_hit = hit.any(axis=0)
+        rows = np.arange(n_terms).reshape(-1, 1)
+        last = np.maximum.accumulate(np.where(hit, rows, -1), axis=0)
+        run = np.where(last < 0, rows + 1 + self.trailing, rows - last)
+        self.drought = np.maximum(self.drought, run.max(axis=0))
+
+        never = self.first_hit == ""
+        first_row = hit.argmax(axis=0)
+        self.leading = np.where(
+            never, np.where(any_hit, first_row, n_terms) + self.leading, self.leading
+        )
+        self.trailing = run[-1].astype(np.int64)
+
+        terms = np.asarray(terms, dtype="<U16")
+        self.first_hit = np.where(never & any_hit, terms[first_row], self.first_hit)
+        last_row = n_terms - 1 - hit[::-1].argmax(axis=0)
+        self.last_hit = np.where(any_hit, terms[last_row], self.last_hit)
+
+        if self.top_k:
+            self._merge_best(levels, hit, terms)
+
+        self.terms += n_terms
+        return self
+
+    def _merge_best(self, levels: np.ndarray, hit: np.ndarray, terms: np.ndarray):
+        """按 (奖级, 期号) 取前 top_k，先在段内用 argpartition 收窄候选再与已有结果合并"""
+        n_terms, k = len(terms), self.top_k
+        rank = np.where(hit, levels, self._empty_rank).astype(np.int64)
+        if n_terms > k:
+            key = rank * n_terms + np.arange(n_terms).reshape(-1, 1)
+            rows = np.argpartition(key, k - 1, axis=0)[:k]
+        else:
+            rows = np.broadcast_to(np.arange(n_terms).reshape(-1, 1), rank.shape)
+        rank = np.take_along_axis(rank, rows, axis=0).T
+        self._select_best(rank, terms[rows].T)
+
+    def _select_best(self, rank: np.ndarray, cand: np.ndarray):
+        """rank, cand: shape=(tickets, n) 的候选奖级与期号"""
+        current = np.where(self.best_level == 0, self._empty_rank, self.best_level)
+        rank = np.concatenate([current.astype(np.int64), rank], axis=1)
+        cand = np.concatenate([self.best_term, cand], axis=1)
+        order = np.lexsort((cand, rank), axis=1)[:, : self.top_k]
+        best_rank = np.take_along_axis(rank, order, axis=1)
+        empty = best_rank == self._empty_rank
+        self.best_level = np.where(empty, 0, best_rank).astype(np.uint8)
+        self.best_term = np.where(empty, "", np.take_along_axis(cand, order, axis=1))
+
+    def merge(self, other: Summary):
+        """
+        拼接紧随其后的一段回测结果，两段须为同一组号码
+
+        :param other: 开奖期号全部晚于 self 的 Summary
+        """
+        if not other.terms:
+            return self
+        if not self.terms:
+            self.__dict__.update(copy.deepcopy(other.__dict__))
+            return self
+
+        self.levels += other.levels
+        self.bonus += other.bonus
+        self.drought = np.maximum.reduce(
+            [self.drought, other.drought, self.trailing + other.leading]
+        )
+
+        never = self.first_hit == ""
+        other_hit = other.last_hit != ""
+        self.leading = np.where(never, self.leading + other.leading, self.leading)
+        self.trailing = np.where(other_hit, other.trailing, self.trailing + other.trailing)
+        self.first_hit = np.where(never, other.first_hit, self.first_hit)
+        self.last_hit = np.where(other_hit, other.last_hit, self.last_hit)
+
+        if self.top_k:
+            rank = np.where(other.best_level == 0, self._empty_rank, other.best_level)
+            self._select_best(rank.astype(np.int64), other.best_term)
+
+        self.terms += other.terms
+        return self
+
+    def as_records(self, my_nums: Sequence = None) -> List[dict]:
+        records = []
+        cost, roi = self.cost, self.roi
+        for i in range(len(self.bonus)):
+            record = {
+                "nums": my_nums[i] if my_nums is not None else i,
+                "levels": {lv: int(c) for lv, c in enumerate(self.levels[i]) if c and lv},
+                "bonus": int(self.bonus[i]),
+                "cost": int(cost[i]),
+                "roi": float(roi[i]),
+                "drought": int(self.drought[i]),
+                "first_hit": str(self.first_hit[i]),
+                "last_hit": str(self.last_hit[i]),
+            }
+            if self.top_k:
+                record["best"] = [
+                    (str(t), int(lv)) for t, lv in zip(self.best_term[i], self.best_level[i]) if lv
+                ]
+            records.append(record)
+        return records
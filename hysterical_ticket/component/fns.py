@@ -6,18 +6,19 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import inspect
-import json
 import logging
-from contextlib import suppress
+from contextlib import AsyncExitStack
 from dataclasses import dataclass
 from dataclasses import field
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List, Tuple
 
-import httpx
 from bs4 import BeautifulSoup
-from httpx import AsyncClient
+
+from hysterical_ticket.component.session import Session
+from hysterical_ticket.component.store import Store, open_store
 
 
 def from_dict_to_cls(cls, data):
@@ -33,62 +34,214 @@ def from_dict_to_cls(cls, data):
 class FnsContainer:
     red: List[str] = field(default_factory=list)
     blue: List[str] = field(default_factory=list)
-
-    token = "fns"
+    # 各来源的原始杀号，{source_name: [nums]}
+    sources: Dict[str, List[str]] = field(default_factory=dict)
+    # 超时或失败的来源
+    missing: List[str] = field(default_factory=list)
+    # 杀号页面自己标注的期号，页面未标注时为空
+    term: str = ""
 
     @classmethod
-    def from_metadata(cls, sp: Path):
-        metadata = {"red": [], "blue": []}
-        try:
-            metadata = json.loads(sp.read_text(encoding="utf8"))[FnsContainer.token]
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
-            pass
+    def from_store(cls, store: Store, branch: str, term: str):
+        metadata = store.get_fns(branch, term) or {"red": [], "blue": []}
         return from_dict_to_cls(cls, metadata)
 
     def is_ready(self):
-        return all(list(self.__dict__.values()))
+        """所有来源都已返回；部分结果可以使用，但下次仍会重新抓取"""
+        return bool(self.red or self.blue) and not self.missing
+
+    def as_metadata(self) -> dict:
+        return dict(self.__dict__)
+
+
+class FnsParseError(ValueError):
+    """杀号页面结构与预期不符"""
+
+
+def parse_360(text: str) -> Tuple[str, List[str]]:
+    """
+    cp.360.cn 杀号页面：倒数第 7 行为 `期号 01-02-03`
+
+    :return: (期号, 杀号)
+    """
+    soup = BeautifulSoup(text, "html.parser")
+    tbody = soup.find("tbody")
+    trs = tbody.find_all("tr") if tbody else []
+    try:
+        term_text, nums_text = trs[-7].text.split(" ")
+    except (IndexError, ValueError) as err:
+        raise FnsParseError(f"Unexpected fns page layout - rows={len(trs)}") from err
+    term = "".join(filter(str.isdigit, term_text))
+    return term, list(filter(None, nums_text.split("-")))
+
+
+def align_term(term: str, reference: str) -> str:
+    """
+    按 reference 的位数对齐期号，期号均为 年份 + 序号
+
+    >>> align_term("2023081", "23080"), align_term("081", "2023080")
+    ('23081', '2023081')
+    """
+    if not term or not reference or len(term) == len(reference):
+        return term
+    if len(term) > len(reference):
+        return term[-len(reference) :]
+    return reference[: len(reference) - len(term)] + term
+
+
+@dataclass
+class FnsSource:
+    """一个杀号来源，color 为 red 或 blue"""
+
+    name: str
+    url: str
+    color: str
+    weight: float = 1.0
+    timeout: float = 5.0
+    # 返回 (期号, 杀号)，页面不标注期号时期号为空
+    parser: Callable[[str], Tuple[str, List[str]]] = parse_360
+
+
+SOURCES: Dict[str, List[FnsSource]] = {
+    "ssq": [
+        FnsSource(name="360_red", url="https://cp.360.cn/shdd/shax", color="red"),
+        FnsSource(
+            name="360_blue",
+            url="https://cp.360.cn/shdd/shax?LotID=220051&ItemID=20344",
+            color="blue",
+        ),
+    ],
+    # 大乐透暂无核对过页面结构的来源，可通过 register_source 补充
+    "dlt": [],
+}
+
+
+def register_source(branch: str, source: FnsSource):
+    SOURCES.setdefault(branch, [])
+    SOURCES[branch] = [s for s in SOURCES[branch] if s.name != source.name] + [source]
 
-    def as_metadata(self):
-        md = {self.token: self.__dict__}
-        md = json.dumps(md, indent=4, ensure_ascii=True, allow_nan=True)
-        return md
+
+async def _fetch_source(session: Session, source: FnsSource) -> Tuple[str, List[str]]:
+    resp = await asyncio.wait_for(session.get(source.url), timeout=source.timeout)
+    resp.raise_for_status()
+    term, nums = source.parser(resp.text)
+    return term, sorted(set(nums))
+
+
+async def fetch_sources(
+    session: Session, sources: List[FnsSource], deadline: float
+) -> Dict[str, List[str] | BaseException]:
+    """
+    并发抓取所有来源，每个来源有自己的 timeout，deadline 到达时放弃尚未返回的来源
+
+    :return: {source_name: (term, nums) 或失败原因}
+    """
+    tasks = {asyncio.ensure_future(_fetch_source(session, source)): source for source in sources}
+    results = {}
+    if not tasks:
+        return results
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+        results[tasks[task].name] = asyncio.TimeoutError(f"deadline exceeded - {deadline}s")
+    for task in done:
+        err = task.exception()
+        results[tasks[task].name] = err if err is not None else task.result()
+    if pending:
+        await asyncio.wait(pending)
+    return results
+
+
+def merge_votes(
+    results: Dict[str, List[str] | BaseException], sources: List[FnsSource], quorum: float = 0.5
+) -> FnsContainer:
+    """
+    按权重投票合并各来源：某号码被杀的权重之和占同色已返回来源总权重的比例不低于 quorum 时排除
+
+    各来源标注的期号不一致时采用最新的期号，标注旧期号的来源视为缺失
+
+    :param quorum: 0 到 1，只有一个来源时等同于直接采用该来源
+    """
+    fnc = FnsContainer()
+    votes: Dict[str, Dict[str, float]] = {"red": {}, "blue": {}}
+    totals: Dict[str, float] = {"red": 0, "blue": 0}
+    terms = [
+        int(result[0])
+        for result in results.values()
+        if not isinstance(result, BaseException) and result[0]
+    ]
+    fnc.term = str(max(terms)) if terms else ""
+    for source in sources:
+        result = results.get(source.name)
+        if result is None or isinstance(result, BaseException):
+            fnc.missing.append(source.name)
+            logging.warning(f"fns source unavailable - source={source.name} err={result!r}")
+            continue
+        term, nums = result
+        if term and int(term) != int(fnc.term):
+            fnc.missing.append(source.name)
+            logging.warning(f"fns source is stale - source={source.name} term={term}")
+            continue
+        fnc.sources[source.name] = nums
+        totals[source.color] += source.weight
+        for num in nums:
+            votes[source.color][num] = votes[source.color].get(num, 0) + source.weight
+
+    for color, tally in votes.items():
+        nums = [num for num, weight in tally.items() if weight >= quorum * totals[color]]
+        setattr(fnc, color, sorted(nums))
+    return fnc
 
 
 @dataclass
 class FilterNums:
-    """双色球杀号"""
+    """双色球、大乐透杀号"""
 
     next_term: str
     cache_dir: Path
     branch_ext: str
 
     fnc: FnsContainer
-    _client: AsyncClient = None
+    _client: Session = None
+    # 杀号记录所在的 store，为 None 时使用 cache_dir 下的 hysteria.db
+    store: Store = None
+
+    sources: List[FnsSource] = None
+    # 所有来源共同的截止时间，到达后只使用已返回的来源
+    deadline: float = 8
+    quorum: float = 0.5
 
     def __post_init__(self):
         if not self.branch_ext.startswith("."):
             self.branch_ext = f".{self.branch_ext}"
-        self.output = self.cache_dir.joinpath(f"{self.next_term}{self.branch_ext}")
-        self._url2res = {
-            "https://cp.360.cn/shdd/shax": ["red"],  # red filter
-            "https://cp.360.cn/shdd/shax?LotID=220051&ItemID=20344": ["blue"],  # blue filter
-        }
+        self.store = self.store or open_store(self.cache_dir)
+        if self.sources is None:
+            # 采用 store 中保存的回测权重，权重为 0 的来源（手动停用）不抓取
+            branch = self.branch_ext.lstrip(".")
+            weights = self.store.weights(branch)
+            sources = [
+                dataclasses.replace(source, weight=weights.get(source.name, source.weight))
+                for source in SOURCES.get(branch, [])
+            ]
+            self.sources = [source for source in sources if source.weight > 0]
 
     @classmethod
     def from_db(cls, sp: Path, **kwargs):
         """
 
-        :param sp: [cache_dir]/[term][.branch_ext]
+        :param sp: [cache_dir]/[term][.branch_ext]，只用于确定期号与彩种，杀号保存在 store 中
         :return:
         """
         cache_dir = sp.parent
         next_term, branch_ext = sp.name.split(".")
-        fns_container = FnsContainer.from_metadata(sp)
+        store = kwargs.pop("store", None) or open_store(cache_dir)
+        fns_container = FnsContainer.from_store(store, branch_ext, next_term)
         ins = cls(
             next_term=next_term,
             cache_dir=cache_dir,
             branch_ext=branch_ext,
             fnc=fns_container,
+            store=store,
             **kwargs,
         )
         return ins
@@ -96,47 +249,54 @@ class FilterNums:
     async def fetch(self) -> FnsContainer:
         """
         获取下一期杀号
-        filter_num: 预测在下一期中不会出现的号数，红蓝分开预测
-        :return: self._container
+        filter_num: 预测在下一期中不会出现的号数，红蓝分开预测，多个来源按权重投票
+        :return: self.fnc，超时或失败的来源记录在 fnc.missing
         """
-
-        def parse_result(res: httpx.Response):
-            soup = BeautifulSoup(res.text, "html.parser")
-            trs = soup.find("tbody").find_all("tr")
-            with suppress(AttributeError, IndexError):
-                term_text, nums_text = trs[-7].text.split(" ")
-                filter_nums: List[str] = list(filter(None, nums_text.split("-")))
-                filter_nums = sorted(list(set(filter_nums)))
-                self._url2res[res.url].extend(filter_nums)
-                self.fnc.__setattr__(self._url2res[res.url][0], filter_nums)
-
         if self.fnc.is_ready():
             logging.info(f"load cache - task=fns branch={self.branch_ext}")
             return self.fnc
+        if not self.sources:
+            logging.warning(f"No fns source configured, skip fetching - branch={self.branch_ext}")
+            return self.fnc
 
-        tasks = [self._client.get(url) for url in self._url2res]
-        results = await asyncio.gather(*tasks)
-        for result in results:
-            parse_result(result)
-
+        results = await fetch_sources(self._client, self.sources, self.deadline)
+        self.fnc = merge_votes(results, self.sources, self.quorum)
+        logging.info(
+            f"fetch fns - branch={self.branch_ext} red={len(self.fnc.red)} "
+            f"blue={len(self.fnc.blue)} missing={self.fnc.missing}"
+        )
         return self.fnc
 
-    def save(self):
-        metadata = self.fnc.as_metadata()
-        self.output.write_text(metadata, encoding="utf8")
-
+    def save(self) -> bool:
+        """
+        页面标注的期号与 next_term 不一致时不保存，避免覆盖其他期的杀号记录；
+        没有配置来源的彩种不保存空记录
+        """
+        if not self.sources:
+            return False
+        page_term = align_term(self.fnc.term, self.next_term)
+        if page_term and int(page_term) != int(self.next_term):
+            logging.error(
+                f"fns term mismatch, skip saving - branch={self.branch_ext} "
+                f"page_term={self.fnc.term} next_term={self.next_term}"
+            )
+            return False
+        self.store.put_fns(self.branch_ext.lstrip("."), self.next_term, self.fnc.as_metadata())
+        return True
 
-async def get_fns_container(fns_sp: Path) -> FnsContainer:
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/115.0.0.0 Safari/537.36 Edg/115.0.1901.183",
-        "Host": "cp.360.cn",
-    }
-    proxies = {"all://": None}
 
+async def get_fns_container(
+    fns_sp: Path, session: Session | None = None, store: Store | None = None
+) -> FnsContainer:
+    """
+    :param session: 共享的 HTTP 层，为 None 时临时创建一个
+    :param store: 为 None 时使用 fns_sp 所在目录的 hysteria.db
+    """
     # Extract filter nums of ssq from some
-    async with AsyncClient(headers=headers, proxies=proxies) as client:
-        fns = FilterNums.from_db(sp=fns_sp, _client=client)
+    async with AsyncExitStack() as stack:
+        if session is None:
+            session = await stack.enter_async_context(Session())
+        fns = FilterNums.from_db(sp=fns_sp, _client=session, store=store)
         fns_container = await fns.fetch()
         fns.save()
     return fns_container
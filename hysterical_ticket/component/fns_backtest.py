@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 21:20
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 杀号准确率回测
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.engine import popcount_masks
+from hysterical_ticket.component.fns import SOURCES, FnsContainer, from_dict_to_cls
+from hysterical_ticket.component.history import HistoryTable
+from hysterical_ticket.component.store import Store, open_store
+from hysterical_ticket.component.ticket import SPECS, to_mask
+
+# 投票合并后的结果作为一个虚拟来源参与评估
+VOTE = "vote"
+
+# 回测给出的最低权重，杀号准确率的波动很大，不因回测结果停止抓取某个来源
+MIN_WEIGHT = 0.1
+# 调整权重前至少回测的期数，约一年
+MIN_TERMS = 150
+# 双侧检验 95% 置信
+Z_CRITICAL = 1.96
+
+
+@dataclass
+class Prediction:
+    term: int
+    source: str
+    color: str
+    nums: List[str]
+
+
+@dataclass
+class SourceAccuracy:
+    """
+    accuracy: 被杀号码确实没有开出的比例
+    false_kill_rate: 被杀号码中开出的比例，即 1 - accuracy
+    clean_rate: 一个号码都没有杀错的期数占比
+    baseline: 随机杀同样个数时的期望 accuracy
+    trend: [(term, 最近 window 期的 accuracy), ...]
+    """
+
+    source: str
+    color: str
+    terms: int = 0
+    killed: int = 0
+    false_kills: int = 0
+    clean_rate: float = 0
+    baseline: float = 0
+    trend: List[Tuple[int, float]] = field(default_factory=list)
+
+    @property
+    def accuracy(self) -> float:
+        return 1 - self.false_kill_rate if self.killed else 0
+
+    @property
+    def false_kill_rate(self) -> float:
+        return self.false_kills / self.killed if self.killed else 0
+
+    @property
+    def lift(self) -> float:
+        """相对随机杀号的提升，不大于 0 说明该来源不值得等待"""
+        return self.accuracy - self.baseline
+
+
+def source_color(branch: str, name: str) -> str | None:
+    for source in SOURCES.get(branch, []):
+        if source.name == name:
+            return source.color
+    return None
+
+
+def load_predictions(store: Store | Path, branch: str) -> List[Prediction]:
+    """
+    读取 store 中每一期的杀号记录
+
+    各来源的原始杀号与投票合并结果都会作为一条预测，旧版记录只有合并结果
+
+    :param store: Store 或其所在目录
+    """
+    store = store if isinstance(store, Store) else open_store(store)
+    predictions = []
+    for term, metadata in store.iter_fns(branch):
+        fnc = from_dict_to_cls(FnsContainer, metadata)
+        for name, nums in fnc.sources.items():
+            color = source_color(branch, name)
+            if color and nums:
+                predictions.append(Prediction(term, name, color, nums))
+        for color in ("red", "blue"):
+            if getattr(fnc, color):
+                predictions.append(Prediction(term, VOTE, color, getattr(fnc, color)))
+    return predictions
+
+
+def evaluate_predictions(
+    predictions: List[Prediction], table: HistoryTable, window: int = 10
+) -> List[SourceAccuracy]:
+    """
+    一次向量化计算所有预测的杀号个数与杀错个数，再按 (来源, 颜色) 聚合
+
+    :param table: 开奖历史，尚未开奖的期号会被跳过
+    :param window: trend 的滑动窗口期数
+    """
+    spec = SPECS[table.branch]
+    widths = {"red": spec.red_width, "blue": spec.blue_width}
+    sizes = {"red": spec.red_size, "blue": spec.blue_size}
+    predictions = [p for p in predictions if p.color in widths]
+    if not predictions or not len(table):
+        return []
+
+    terms = np.array([p.term for p in predictions], dtype=np.int64)
+    masks = np.array([to_mask(p.nums, widths[p.color]) for p in predictions], dtype=np.uint64)
+    is_red = np.array([p.color == "red" for p in predictions])
+
+    # 期号 -> 历史中的行
+    order = np.argsort(table.terms, kind="stable")
+    sorted_terms = table.terms[order].astype(np.int64)
+    pos = np.clip(np.searchsorted(sorted_terms, terms), 0, len(sorted_terms) - 1)
+    drawn_at = sorted_terms[pos] == terms
+    rows = order[pos]
+    drawn = np.where(
+        is_red, table.red_mask[rows].astype(np.uint64), table.blue_mask[rows].astype(np.uint64)
+    )
+
+    killed = popcount_masks(masks)
+    false_kills = popcount_masks(masks & drawn)
+
+    keys = [(p.source, p.color) for p in predictions]
+    groups = sorted(set(keys))
+    index = {key: i for i, key in enumerate(groups)}
+    group_ids = np.array([index[key] for key in keys])
+    valid = drawn_at & (killed > 0)
+
+    results = []
+    for gid, (source, color) in enumerate(groups):
+        sel = np.flatnonzero(valid & (group_ids == gid))
+        if not len(sel):
+            continue
+        sel = sel[np.argsort(terms[sel], kind="stable")]
+        k, f = killed[sel], false_kills[sel]
+        # 滑动窗口内的累计杀号数与杀错数
+        ck, cf = np.cumsum(k), np.cumsum(f)
+        lag_k = np.concatenate([np.zeros(window, dtype=np.int64), ck[:-window]])[: len(ck)]
+        lag_f = np.concatenate([np.zeros(window, dtype=np.int64), cf[:-window]])[: len(cf)]
+        trend = 1 - (cf - lag_f) / (ck - lag_k)
+        results.append(
+            SourceAccuracy(
+                source=source,
+                color=color,
+                terms=len(sel),
+                killed=int(k.sum()),
+                false_kills=int(f.sum()),
+                clean_rate=float(np.mean(f == 0)),
+                baseline=1 - sizes[color] / widths[color],
+                trend=list(zip(terms[sel].tolist(), trend.round(4).tolist())),
+            )
+        )
+    return results
+
+
+def significance(result: SourceAccuracy) -> float:
+    """
+    杀错个数相对随机杀号的 z 值，正数表示优于随机
+
+    随机杀号时每个被杀号码开出的概率为 1 - baseline，杀错个数近似服从二项分布
+    """
+    p = 1 - result.baseline
+    if not result.killed or not 0 < p < 1:
+        return 0.0
+    expected = result.killed * p
+    return (expected - result.false_kills) / math.sqrt(expected * (1 - p))
+
+
+def suggest_weights(
+    results: List[SourceAccuracy], min_terms: int = MIN_TERMS, z: float = Z_CRITICAL
+) -> Dict[str, float]:
+    """
+    按相对随机杀号的表现给出来源权重
+
+    样本不足 min_terms 期或与随机杀号的差异不显著（|z| < z）时保持 1；
+    显著时按 lift 调整，最低为 MIN_WEIGHT，来源仍会被抓取与回测，表现回升后权重随之恢复
+
+    :return: {source_name: weight}，可交给 apply_weights 保存
+    """
+    weights = {}
+    for result in results:
+        if result.source == VOTE:
+            continue
+        if result.terms < min_terms or abs(significance(result)) < z:
+            weights[result.source] = 1.0
+        else:
+            weight = 1 + result.lift / (1 - result.baseline)
+            weights[result.source] = round(max(weight, MIN_WEIGHT), 4)
+    return weights
+
+
+def apply_weights(store: Store | Path, branch: str, weights: Dict[str, float]):
+    """
+    将权重保存到 store，FilterNums 构建来源列表时读取，权重为 0 的来源不再抓取，只用于手动停用
+
+    :param store: Store 或其所在目录
+    """
+    store = store if isinstance(store, Store) else open_store(store)
+    store.put_weights(branch, weights)
+    logging.info(f"apply fns weights - branch={branch} weights={weights}")
+
+
+def backtest_fns(
+    store: Store | Path, table: HistoryTable, window: int = 10
+) -> List[SourceAccuracy]:
+    """
+    >>> table = load_table(history_dir.joinpath("双色球.csv"))
+    >>> for result in backtest_fns(history_dir, table):
+    ...     print(result.source, result.color, result.accuracy, result.lift)
+    """
+    predictions = load_predictions(store, table.branch)
+    results = evaluate_predictions(predictions, table, window=window)
+    for result in results:
+        logging.info(
+            f"fns accuracy - source={result.source} color={result.color} terms={result.terms} "
+            f"accuracy={result.accuracy:.4f} baseline={result.baseline:.4f} "
+            f"clean_rate={result.clean_rate:.4f}"
+        )
+    return results
+
+
+def tune_weights(
+    store: Store | Path, table: HistoryTable, min_terms: int = MIN_TERMS, window: int = 10
+) -> Dict[str, float]:
+    """
+    回测已保存的杀号记录，按结果更新 store 中的来源权重
+
+    :return: {source_name: weight}
+    """
+    store = store if isinstance(store, Store) else open_store(store)
+    results = backtest_fns(store, table, window=window)
+    weights = suggest_weights(results, min_terms=min_terms)
+    if weights:
+        apply_weights(store, table.branch, weights)
+    return weights
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 22:40
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 按历史频率加权的批量选号
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.history import HistoryTable
+from hysterical_ticket.component.ticket import SPECS, Spec, Ticket
+
+# 单批生成的注数上限，控制 (n, width) 随机矩阵的峰值内存
+BATCH_SIZE = 1 << 18
+
+
+def ball_weights(
+    columns: np.ndarray,
+    terms: np.ndarray,
+    width: int,
+    decay: float | None = None,
+    window: int | None = None,
+    smoothing: float = 1.0,
+) -> np.ndarray:
+    """
+    每个号码的出现频率权重
+
+    :param columns: shape=(rows, k) 的开奖号码
+    :param terms: 每行的期号，用于确定新旧
+    :param width: 号码上限
+    :param decay: 每早一期权重乘以 decay，如 0.99；None 表示不衰减
+    :param window: 只统计最近 window 期
+    :param smoothing: 每个号码的基础计数，避免从未出现的号码权重为 0
+    :return: shape=(width,) float64，和为 1，下标 i 对应号码 i+1
+    """
+    order = np.argsort(terms, kind="stable")[::-1]
+    if window:
+        order = order[:window]
+    ages = np.arange(len(order), dtype=np.float64)
+    row_weights = decay ** ages if decay else np.ones_like(ages)
+
+    nums = columns[order].astype(np.int64) - 1
+    counts = np.bincount(
+        nums.ravel(), weights=np.repeat(row_weights, nums.shape[1]), minlength=width
+    )[:width]
+    counts = counts + smoothing
+    return counts / counts.sum()
+
+
+class AliasTable:
+    """Walker 别名表，O(1) 时间按权重有放回抽样"""
+
+    def __init__(self, weights: np.ndarray):
+        weights = np.asarray(weights, dtype=np.float64)
+        n = len(weights)
+        scaled = weights * n / weights.sum()
+        self.prob = np.ones(n, dtype=np.float64)
+        self.alias = np.arange(n, dtype=np.int64)
+
+        small = [i for i in range(n) if scaled[i] < 1]
+        large = [i for i in range(n) if scaled[i] >= 1]
+        while small and large:
+            s, g = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] -= 1 - scaled[s]
+            (small if scaled[g] < 1 else large).append(g)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """:return: shape=(size,) 下标"""
+        idx = rng.integers(0, len(self.prob), size=size)
+        keep = rng.random(size) < self.prob[idx]
+        return np.where(keep, idx, self.alias[idx])
+
+
+def weighted_top_k(rng: np.random.Generator, log_weights: np.ndarray, n: int, k: int):
+    """
+    Gumbel-top-k：对 log(w) 加 Gumbel 噪声后取最大的 k 个，等价于按权重逐个无放回抽样
+
+    :return: shape=(n, k) 下标，每行互不相同
+    """
+    uniform = rng.random((n, len(log_weights)), dtype=np.float32)
+    np.maximum(uniform, np.finfo(np.float32).tiny, out=uniform)
+    keys = log_weights - np.log(-np.log(uniform))
+    return np.argpartition(keys, -k, axis=1)[:, -k:]
+
+
+def to_masks(nums: np.ndarray) -> np.ndarray:
+    """shape=(n, k) 号码 -> shape=(n,) uint64 位掩码，与 Ticket 一致"""
+    return np.bitwise_or.reduce(np.uint64(1) << (nums.astype(np.uint64) - np.uint64(1)), axis=1)
+
+
+@dataclass
+class TicketGenerator:
+    """
+    按号码权重批量生成互不重复的红球与蓝球
+
+    >>> gen = TicketGenerator.from_history(load_table(cache_path), decay=0.99, seed=42)
+    >>> reds, blues = gen.sample(1_000_000)
+    """
+
+    spec: Spec
+    red_weights: np.ndarray
+    blue_weights: np.ndarray
+    seed: int | None = None
+
+    def __post_init__(self):
+        self.rng = np.random.default_rng(self.seed)
+        with np.errstate(divide="ignore"):
+            self._red_log = np.log(self.red_weights).astype(np.float32)
+            self._blue_log = np.log(self.blue_weights).astype(np.float32)
+        self._blue_alias = AliasTable(self.blue_weights) if self.spec.blue_size == 1 else None
+
+    @classmethod
+    def from_history(
+        cls,
+        table: HistoryTable,
+        decay: float | None = None,
+        window: int | None = None,
+        seed: int | None = None,
+    ):
+        spec = table.spec
+        red = ball_weights(table.reds, table.terms, spec.red_width, decay, window)
+        blue = ball_weights(table.blues, table.terms, spec.blue_width, decay, window)
+        return cls(spec=spec, red_weights=red, blue_weights=blue, seed=seed)
+
+    @classmethod
+    def uniform(cls, branch: str = "ssq", seed: int | None = None):
+        spec = SPECS[branch]
+        red = np.full(spec.red_width, 1 / spec.red_width)
+        blue = np.full(spec.blue_width, 1 / spec.blue_width)
+        return cls(spec=spec, red_weights=red, blue_weights=blue, seed=seed)
+
+    def restrict(self, red: Sequence[str] = (), blue: Sequence[str] = ()) -> TicketGenerator:
+        """
+        排除部分号码（如杀号）后的生成器，与原生成器共用随机数流
+
+        :raise ValueError: 剩余号码不足一注
+        """
+        red_weights, blue_weights = self.red_weights.copy(), self.blue_weights.copy()
+        red_weights[[int(num) - 1 for num in red]] = 0
+        blue_weights[[int(num) - 1 for num in blue]] = 0
+        if (
+            np.count_nonzero(red_weights) < self.spec.red_size
+            or np.count_nonzero(blue_weights) < self.spec.blue_size
+        ):
+            raise ValueError(f"Too many excluded nums - red={list(red)} blue={list(blue)}")
+        generator = TicketGenerator(
+            spec=self.spec,
+            red_weights=red_weights / red_weights.sum(),
+            blue_weights=blue_weights / blue_weights.sum(),
+            seed=self.seed,
+        )
+        generator.rng = self.rng
+        return generator
+
+    def _sample_batch(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        reds = weighted_top_k(self.rng, self._red_log, n, self.spec.red_size)
+        if self._blue_alias is not None:
+            blues = self._blue_alias.sample(self.rng, n).reshape(n, 1)
+        else:
+            blues = weighted_top_k(self.rng, self._blue_log, n, self.spec.blue_size)
+        reds = np.sort(reds, axis=1).astype(np.uint8) + 1
+        blues = np.sort(blues, axis=1).astype(np.uint8) + 1
+        return reds, blues
+
+    def iter_batches(
+        self, n: int, batch_size: int = BATCH_SIZE
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        for start in range(0, n, batch_size):
+            yield self._sample_batch(min(batch_size, n - start))
+
+    def sample(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: (reds, blues)，shape 分别为 (n, red_size)、(n, blue_size) uint8，每行升序
+        """
+        if n <= 0:
+            return (
+                np.empty((0, self.spec.red_size), dtype=np.uint8),
+                np.empty((0, self.spec.blue_size), dtype=np.uint8),
+            )
+        batches = list(self.iter_batches(n))
+        return np.concatenate([b[0] for b in batches]), np.concatenate([b[1] for b in batches])
+
+    def tickets(self, n: int) -> List[Ticket]:
+        reds, blues = self.sample(n)
+        return [
+            Ticket(red=red, blue=blue, spec=self.spec)
+            for red, blue in zip(to_masks(reds).tolist(), to_masks(blues).tolist())
+        ]
+
+    def nums(self, n: int) -> List[List[str]]:
+        """与 NumsChecker 的 my_nums 相同的格式"""
+        reds, blues = self.sample(n)
+        return [[f"{num:02d}" for num in row] for row in np.hstack([reds, blues]).tolist()]
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 16:30
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 二进制列式开奖历史
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.ticket import SPECS, Draw, Spec, to_mask
+
+MAGIC = b"HTAB"
+VERSION = 1
+HEADER = struct.Struct("<4sH3sIBBB")
+HEADER_SIZE = 64
+SUFFIX = ".bin"
+
+
+def _layout(spec: Spec, n_rows: int) -> List[Tuple[str, str, Tuple[int, ...]]]:
+    """(列名, dtype, shape)，宽列在前以保证对齐"""
+    return [
+        ("red_mask", "<u8", (n_rows,)),
+        ("term", "<u4", (n_rows,)),
+        ("blue_mask", "<u2", (n_rows,)),
+        ("index", "<u2", (n_rows,)),
+        ("reds", "u1", (spec.red_size, n_rows)),
+        ("blues", "u1", (spec.blue_size, n_rows)),
+    ]
+
+
+class HistoryTable:
+    """
+    开奖历史的列式二进制文件，通过 mmap 只读打开，各列均为共享同一映射的零拷贝视图
+
+    文件结构：64 字节文件头 + 各列依次排列
+    term: 期号，如 23118
+    index: 期号在当年的序号，如 118
+    reds / blues: 每个号码一列，shape=(red_size, rows)
+    red_mask / blue_mask: 与 Ticket 相同的位掩码
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._mmap = np.memmap(self.path, dtype=np.uint8, mode="r")
+        magic, version, branch, n_rows, term_width, _, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a history table - path={self.path}")
+
+        self.branch = branch.decode()
+        self.spec = SPECS[self.branch]
+        self.term_width = term_width
+        self.columns: Dict[str, np.ndarray] = {}
+        offset = HEADER_SIZE
+        for name, dtype, shape in _layout(self.spec, n_rows):
+            column = np.ndarray(shape, dtype=dtype, buffer=self._mmap, offset=offset)
+            self.columns[name] = column
+            offset += column.nbytes
+
+    @staticmethod
+    def write(path: Path, branch: str, rows: Sequence[Sequence[str]]):
+        """
+        将 [[term, red_1, ..., blue_1], ...] 写入二进制文件，先写临时文件再替换
+
+        :param path: 通常与 csv 同名，后缀为 .bin
+        """
+        spec = SPECS[branch]
+        n_rows = len(rows)
+        term_width = max((len(row[0]) for row in rows), default=5)
+        columns = {
+            name: np.zeros(shape, dtype=dtype) for name, dtype, shape in _layout(spec, n_rows)
+        }
+        for i, row in enumerate(rows):
+            reds = row[1 : 1 + spec.red_size]
+            blues = row[1 + spec.red_size :]
+            columns["term"][i] = int(row[0])
+            columns["index"][i] = int(row[0]) % 1000
+            columns["reds"][:, i] = [int(n) for n in reds]
+            columns["blues"][:, i] = [int(n) for n in blues]
+            columns["red_mask"][i] = to_mask(reds, spec.red_width)
+            columns["blue_mask"][i] = to_mask(blues, spec.blue_width)
+
+        header = HEADER.pack(MAGIC, VERSION, branch.encode(), n_rows, term_width, 0, 0)
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(header.ljust(HEADER_SIZE, b"\0"))
+                for name, _, _ in _layout(spec, n_rows):
+                    file.write(columns[name].tobytes())
+            # 替换前释放缓存中的旧映射
+            release_table(path)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        logging.info(f"save history table - branch={branch} rows={n_rows} path={path}")
+
+    def close(self):
+        """
+        释放映射，之后不能再读取
+
+        各列都是映射的视图，全部丢弃后映射随之关闭。Windows 下仍被映射的文件不能替换或删除
+        """
+        self.columns = {}
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.columns["term"])
+
+    @property
+    def terms(self) -> np.ndarray:
+        return self.columns["term"]
+
+    @property
+    def reds(self) -> np.ndarray:
+        """shape=(rows, red_size) 视图"""
+        return self.columns["reds"].T
+
+    @property
+    def blues(self) -> np.ndarray:
+        return self.columns["blues"].T
+
+    @property
+    def red_mask(self) -> np.ndarray:
+        return self.columns["red_mask"]
+
+    @property
+    def blue_mask(self) -> np.ndarray:
+        return self.columns["blue_mask"]
+
+    def term_str(self, i: int) -> str:
+        return f"{int(self.terms[i]):0{self.term_width}d}"
+
+    def draws(self) -> List[Draw]:
+        return [
+            Draw(red=int(red), blue=int(blue), spec=self.spec, term=f"{term:0{self.term_width}d}")
+            for red, blue, term in zip(
+                self.red_mask.tolist(), self.blue_mask.tolist(), self.terms.tolist()
+            )
+        ]
+
+    def rows(self) -> List[List[str]]:
+        """还原为 [[term, red_1, ..., blue_1], ...]"""
+        return [draw.to_row() for draw in self.draws()]
+
+
+# 同一文件只映射一次，各消费者共享
+_tables: Dict[Path, Tuple[int, HistoryTable]] = {}
+
+
+def table_path(csv_path: Path) -> Path:
+    return Path(csv_path).with_suffix(SUFFIX)
+
+
+def open_table(path: Path) -> HistoryTable:
+    path = Path(path).absolute()
+    mtime = path.stat().st_mtime_ns
+    cached = _tables.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    table = HistoryTable(path)
+    _tables[path] = (mtime, table)
+    return table
+
+
+def release_table(path: Path):
+    """关闭并移出缓存的映射，持有旧 HistoryTable 的调用方需要重新 open_table"""
+    cached = _tables.pop(Path(path).absolute(), None)
+    if cached:
+        cached[1].close()
+
+
+def release_tables(directory: Path):
+    """释放 directory 下的全部映射，删除目录前调用"""
+    directory = Path(directory).absolute()
+    for path in [path for path in _tables if directory in path.parents]:
+        release_table(path)
+
+
+def load_table(csv_path: Path) -> HistoryTable | None:
+    """:return: csv 旁不早于 csv 的 .bin 历史，没有则为 None"""
+    path = table_path(csv_path)
+    try:
+        if Path(csv_path).exists() and path.stat().st_mtime_ns < Path(csv_path).stat().st_mtime_ns:
+            return None
+        return open_table(path)
+    except (FileNotFoundError, ValueError, struct.error):
+        return None
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 23:50
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 开奖历史索引：号码组合的精确查找与红球重合度近邻查找
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from hysterical_ticket.component.engine import GRID_BUDGET, popcount_masks
+from hysterical_ticket.component.history import HistoryTable
+from hysterical_ticket.component.store import Store
+from hysterical_ticket.component.ticket import SPECS, Spec, Ticket, as_ticket, to_mask
+
+_EMPTY = np.uint64(0xFFFFFFFFFFFFFFFF)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def combo_keys(red_masks: np.ndarray, blue_masks: np.ndarray, spec: Spec) -> np.ndarray:
+    """红球掩码与蓝球掩码拼成一个 uint64，作为一注号码的唯一键"""
+    red_masks = np.asarray(red_masks, dtype=np.uint64)
+    blue_masks = np.asarray(blue_masks, dtype=np.uint64)
+    return red_masks | (blue_masks << np.uint64(spec.red_width))
+
+
+class MaskSet:
+    """
+    uint64 键的开放寻址哈希表，对整批键向量化探测，单个键的期望探测次数为 O(1)
+
+    负载因子不超过 0.5，键不能为 2**64-1；重复的键只保留第一次出现时的 value
+    """
+
+    def __init__(self, keys: Sequence[int] | np.ndarray, values: np.ndarray | None = None):
+        keys = np.asarray(keys, dtype=np.uint64)
+        values = np.arange(len(keys)) if values is None else np.asarray(values)
+        keys, first = np.unique(keys, return_index=True)
+        values = values[first].astype(np.int64)
+
+        self._bits = max(4, (2 * len(keys)).bit_length())
+        self._slots = np.full(1 << self._bits, _EMPTY, dtype=np.uint64)
+        self._values = np.full(1 << self._bits, -1, dtype=np.int64)
+        self._max_probe = 0
+        self._size = len(keys)
+
+        mask = (1 << self._bits) - 1
+        for key, value, h in zip(keys.tolist(), values.tolist(), self._hash(keys).tolist()):
+            probe = 0
+            while self._slots[(h + probe) & mask] != _EMPTY:
+                probe += 1
+            self._slots[(h + probe) & mask] = key
+            self._values[(h + probe) & mask] = value
+            self._max_probe = max(self._max_probe, probe)
+
+    def __len__(self):
+        return self._size
+
+    def _hash(self, keys: np.ndarray) -> np.ndarray:
+        # Fibonacci hashing，取乘积的高位
+        return ((keys * _GOLDEN) >> np.uint64(64 - self._bits)).astype(np.int64)
+
+    def find(self, keys: np.ndarray) -> np.ndarray:
+        """:return: 与 keys 同形的 value，不存在为 -1"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        result = np.full(keys.shape, -1, dtype=np.int64)
+        active = np.ones(keys.shape, dtype=bool)
+        h, mask = self._hash(keys), (1 << self._bits) - 1
+        for probe in range(self._max_probe + 1):
+            pos = (h + probe) & mask
+            slot = self._slots[pos]
+            hit = active & (slot == keys)
+            result[hit] = self._values[pos[hit]]
+            active &= ~hit & (slot != _EMPTY)
+            if not active.any():
+                break
+        return result
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        return self.find(keys) >= 0
+
+    def __contains__(self, key: int) -> bool:
+        return bool(self.contains(np.array([key], dtype=np.uint64))[0])
+
+
+@dataclass
+class Neighbors:
+    """每注号码的 k 个最相近的历史开奖，按红球重合数、蓝球重合数、期号从新到旧排列"""
+
+    terms: np.ndarray
+    rows: np.ndarray
+    red_hits: np.ndarray
+    blue_hits: np.ndarray
+
+
+class HistoryIndex:
+    """
+    >>> index = HistoryIndex.from_table(load_table(cache_path))
+    >>> index.find(["01", "05", "12", "18", "25", "33", "07"])  # 开出过的期号或 None
+    >>> neighbors = index.nearest(reds, blues, k=3)
+    """
+
+    def __init__(self, spec: Spec, terms: np.ndarray, red_mask: np.ndarray, blue_mask: np.ndarray):
+        # 按期号升序，近邻查找时同分取较新的一期
+        order = np.argsort(np.asarray(terms), kind="stable")
+        self.spec = spec
+        self.terms = np.asarray(terms)[order]
+        self.red_mask = np.asarray(red_mask, dtype=np.uint64)[order]
+        self.blue_mask = np.asarray(blue_mask, dtype=np.uint64)[order]
+        self.combos = MaskSet(combo_keys(self.red_mask, self.blue_mask, spec))
+        self.reds = MaskSet(self.red_mask)
+
+    @classmethod
+    def from_table(cls, table: HistoryTable):
+        terms = np.array([table.term_str(i) for i in range(len(table))])
+        return cls(table.spec, terms, table.red_mask, table.blue_mask)
+
+    @classmethod
+    def from_store(cls, store: Store, branch: str):
+        spec = SPECS[branch]
+        rows = store.history(branch)
+        red = [to_mask(row[1 : 1 + spec.red_size], spec.red_width) for row in rows]
+        blue = [to_mask(row[1 + spec.red_size :], spec.blue_width) for row in rows]
+        terms = np.array([row[0] for row in rows], dtype=str)
+        return cls(spec, terms, np.array(red, dtype=np.uint64), np.array(blue, dtype=np.uint64))
+
+    def __len__(self):
+        return len(self.terms)
+
+    def lookup(self, red_masks: np.ndarray, blue_masks: np.ndarray) -> np.ndarray:
+        """:return: 完全相同的历史开奖所在的行，没有为 -1"""
+        return self.combos.find(combo_keys(red_masks, blue_masks, self.spec))
+
+    def contains(self, red_masks: np.ndarray, blue_masks: np.ndarray) -> np.ndarray:
+        return self.lookup(red_masks, blue_masks) >= 0
+
+    def contains_red(self, red_masks: np.ndarray) -> np.ndarray:
+        """红球部分与某一期历史开奖相同"""
+        return self.reds.contains(red_masks)
+
+    def find(self, nums: Sequence[str] | Ticket) -> str | None:
+        """:return: 开出过该注号码的期号"""
+        ticket = as_ticket(nums, branch=self.spec.branch)
+        row = int(self.lookup(np.array([ticket.red]), np.array([ticket.blue]))[0])
+        return str(self.terms[row]) if row >= 0 else None
+
+    def nearest(
+        self, red_masks: np.ndarray, blue_masks: np.ndarray | None = None, k: int = 1
+    ) -> Neighbors:
+        """
+        与全部历史开奖按位与后 popcount，按块计算 (chunk, rows) 重合数矩阵
+
+        :param blue_masks: None 时只比较红球
+        :return: Neighbors，各字段 shape=(n, k)
+        """
+        red_masks = np.asarray(red_masks, dtype=np.uint64)
+        n, m, k = len(red_masks), len(self), min(k, len(self))
+        rows = np.zeros((n, k), dtype=np.int64)
+        red_hits = np.zeros((n, k), dtype=np.uint8)
+        blue_hits = np.zeros((n, k), dtype=np.uint8)
+        if not m or not k:
+            return Neighbors(self.terms[rows], rows, red_hits, blue_hits)
+
+        # 分数 = 红球重合数 * (blue_size + 1) + 蓝球重合数，同分时较新的一期优先
+        # 历史按新到旧排列，argmax 取第一个最大值即为较新者；k > 1 时以行号打破平局
+        scale = self.spec.blue_size + 1
+        red_rev, blue_rev = self.red_mask[::-1].copy(), self.blue_mask[::-1].copy()
+        order = np.arange(m - 1, -1, -1, dtype=np.int32)
+        chunk = max(1, GRID_BUDGET // m)
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            red = popcount_masks(red_masks[start:stop, None] & red_rev, dtype=np.uint8)
+            score = red * np.uint8(scale)
+            if blue_masks is not None:
+                blue_chunk = np.asarray(blue_masks, dtype=np.uint64)[start:stop, None]
+                blue = popcount_masks(blue_chunk & blue_rev, dtype=np.uint8)
+                score += blue
+            if k == 1:
+                top = score.argmax(axis=1).reshape(-1, 1)
+            else:
+                key = score.astype(np.int32) * m + order
+                top = np.argpartition(key, -k, axis=1)[:, -k:]
+                rank = np.argsort(-np.take_along_axis(key, top, axis=1), axis=1)
+                top = np.take_along_axis(top, rank, axis=1)
+            rows[start:stop] = m - 1 - top
+            red_hits[start:stop] = np.take_along_axis(red, top, axis=1)
+            if blue_masks is not None:
+                blue_hits[start:stop] = np.take_along_axis(blue, top, axis=1)
+        return Neighbors(self.terms[rows], rows, red_hits, blue_hits)
+
+    def similar(self, nums: Sequence[str] | Ticket, k: int = 3) -> List[tuple]:
+        """:return: [(期号, 红球重合数, 蓝球重合数), ...]"""
+        ticket = as_ticket(nums, branch=self.spec.branch)
+        neighbors = self.nearest(np.array([ticket.red]), np.array([ticket.blue]), k=k)
+        return [
+            (str(term), int(red), int(blue))
+            for term, red, blue in zip(
+                neighbors.terms[0], neighbors.red_hits[0], neighbors.blue_hits[0]
+            )
+        ]
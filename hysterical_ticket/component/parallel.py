@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 14:30
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 多进程分片回测
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import reduce
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.engine import Engine, Summary
+from hysterical_ticket.component.ticket import Draw
+
+# (shm name, shape, dtype)
+Handle = Tuple[str, Tuple[int, ...], str]
+
+# 网格（号码数 × 期数）小于该元素数时，多进程的调度与通信开销大于收益
+MIN_PARALLEL_GRID = 1 << 24
+
+# 子进程内挂载的共享数组，由 _attach 按段名切换
+_shared: Dict[str, np.ndarray] = {}
+_segments: List[shared_memory.SharedMemory] = []
+
+# 主进程内按 workers 复用的进程池
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+# (handles, level_table, bonus_table)，随每个分片任务发送
+Context = Tuple[Dict[str, Handle], np.ndarray, np.ndarray]
+
+
+def effective_workers(workers: int, n_tickets: int, n_terms: int) -> int:
+    """进程数不超过 CPU 核数，网格过小时退回单进程"""
+    workers = min(workers, os.cpu_count() or 1)
+    if workers > 1 and n_tickets * n_terms < MIN_PARALLEL_GRID:
+        return 1
+    return max(1, workers)
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """相同 workers 的调用共享同一个进程池，进程池损坏时重建"""
+    pool = _pools.get(workers)
+    if pool is None or getattr(pool, "_broken", False):
+        pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        logging.info(f"start process pool - workers={workers}")
+    return pool
+
+
+@atexit.register
+def shutdown_pools():
+    for pool in _pools.values():
+        pool.shutdown(wait=True)
+    _pools.clear()
+
+
+def split_range(total: int, parts: int) -> List[Tuple[int, int]]:
+    """将 [0, total) 切分为至多 parts 段连续区间，前几段多分一个"""
+    parts = max(1, min(parts, total))
+    size, rest = divmod(total, parts)
+    bounds, start = [], 0
+    for i in range(parts):
+        stop = start + size + (i < rest)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def _attach(context: Context):
+    """进程池复用时子进程可能仍挂着上一次调用的共享内存，段名变化时先释放再挂载"""
+    handles, level_table, bonus_table = context
+    names = [name for name, _, _ in handles.values()]
+    if [shm.name for shm in _segments] == names:
+        return
+    _shared.clear()
+    for shm in _segments:
+        shm.close()
+    _segments.clear()
+    for key, (name, shape, dtype) in handles.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _segments.append(shm)
+        _shared[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _shared["level_table"] = level_table
+    _shared["bonus_table"] = bonus_table
+
+
+def _engine() -> Engine:
+    return Engine(
+        tickets_red=_shared["tickets_red"],
+        tickets_blue=_shared["tickets_blue"],
+        level_table=_shared["level_table"],
+        bonus_table=_shared["bonus_table"],
+    )
+
+
+def _iter_shard(start: int, stop: int):
+    engine = _engine()
+    step = engine.chunk_size()
+    for offset in range(start, stop, step):
+        end = min(offset + step, stop)
+        red, blue = engine.hits(_shared["draws_red"][offset:end], _shared["draws_blue"][offset:end])
+        yield offset, red, blue, engine.level_table[red, blue]
+
+
+def _hits_shard(context: Context, bounds: Tuple[int, int]):
+    """bounds 不超过 Engine.chunk_size() 期，返回的网格不超过 GRID_BUDGET 个元素"""
+    _attach(context)
+    start, stop = bounds
+    engine = _engine()
+    red, blue = engine.hits(_shared["draws_red"][start:stop], _shared["draws_blue"][start:stop])
+    return start, red, blue, engine.level_table[red, blue]
+
+
+def _summarize_shard(context: Context, task: Tuple[int, int, List[str], int]) -> Summary:
+    _attach(context)
+    start, stop, terms, top_k = task
+    n_tickets = len(_shared["tickets_red"])
+    bonus_table = _shared["bonus_table"]
+    summary = Summary.empty(n_tickets, n_levels=len(bonus_table), top_k=top_k)
+    for offset, _, _, levels in _iter_shard(start, stop):
+        summary.update(terms[offset - start : offset - start + len(levels)], levels, bonus_table)
+    return summary
+
+
+@dataclass
+class SharedGrid:
+    """
+    将编码后的号码与历史开奖放入共享内存，按期号区间分片交给进程池，
+    子进程直接挂载共享内存，不经 pickle 复制。进程池由 get_pool 跨调用复用，
+    每次调用只新建共享内存
+
+    >>> with SharedGrid(engine, draws, workers=8) as grid:
+    ...     summary = grid.summarize(top_k=3)
+    """
+
+    engine: Engine
+    draws: Sequence[Draw]
+    workers: int
+
+    _segments: List[shared_memory.SharedMemory] = field(default_factory=list)
+    _pool: ProcessPoolExecutor = None
+    _context: Context = None
+
+    def _publish(self, array: np.ndarray) -> Handle:
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        self._segments.append(shm)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+        return shm.name, array.shape, array.dtype.str
+
+    def __enter__(self):
+        draws_red, draws_blue = self.engine.encode_draws(self.draws)
+        handles = {
+            "tickets_red": self._publish(self.engine.tickets_red),
+            "tickets_blue": self._publish(self.engine.tickets_blue),
+            "draws_red": self._publish(draws_red),
+            "draws_blue": self._publish(draws_blue),
+        }
+        self._context = (handles, self.engine.level_table, self.engine.bonus_table)
+        self._pool = get_pool(self.workers)
+        logging.info(
+            f"start shared grid - workers={self.workers} "
+            f"tickets={len(self.engine.tickets_red)} terms={len(self.draws)}"
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._pool = self._context = None
+        for shm in self._segments:
+            shm.close()
+            shm.unlink()
+        self._segments.clear()
+
+    def iter_grid(self) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        与 Engine.iter_grid 相同，按期号顺序 yield (offset, red_hits, blue_hits, levels)
+
+        每个分片为 GRID_BUDGET 大小的一块，同时在途的分片不超过 2 * workers，
+        峰值内存与网格总大小无关
+        """
+        n, step = len(self.draws), self.engine.chunk_size()
+        shards = ((offset, min(offset + step, n)) for offset in range(0, n, step))
+        pending = deque(
+            self._pool.submit(_hits_shard, self._context, bounds)
+            for bounds in islice(shards, 2 * self.workers)
+        )
+        try:
+            while pending:
+                future = pending.popleft()
+                for bounds in islice(shards, 1):
+                    pending.append(self._pool.submit(_hits_shard, self._context, bounds))
+                yield future.result()
+        finally:
+            # 提前停止迭代时，等在途分片结束后才能释放共享内存
+            for future in pending:
+                future.cancel()
+            wait(pending)
+
+    def summarize(self, top_k: int = 0) -> Summary:
+        """draws 须已按开奖先后排列，各分片结果按期号顺序合并，与单进程结果一致"""
+        terms = [d.term for d in self.draws]
+        tasks = [
+            (start, stop, terms[start:stop], top_k)
+            for start, stop in split_range(len(self.draws), self.workers)
+        ]
+        init = Summary.empty(
+            len(self.engine.tickets_red), n_levels=len(self.engine.bonus_table), top_k=top_k
+        )
+        contexts = [self._context] * len(tasks)
+        return reduce(Summary.merge, self._pool.map(_summarize_shard, contexts, tasks), init)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 17:05
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 开奖历史表格解析
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# 期号 + 7 个号码
+N_COLS = 8
+
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def parse_tdata_bs4(text: str, n_cols: int = N_COLS) -> List[List[str]]:
+    """参照实现：BeautifulSoup + html.parser，每行只调用一次 find_all"""
+    soup = BeautifulSoup(text, "html.parser")
+    container = []
+    for tr in soup.find("tbody", attrs={"id": "tdata"}).find_all("tr"):
+        tds = tr.find_all("td", limit=n_cols)
+        container.append([td.get_text().strip() for td in tds])
+    return container
+
+
+def parse_tdata_lxml(text: str, n_cols: int = N_COLS) -> List[List[str]]:
+    tree = lxml_html.fromstring(text)
+    container = []
+    for tr in tree.xpath('//tbody[@id="tdata"]/tr'):
+        tds = tr.xpath("td")[:n_cols]
+        container.append([td.text_content().strip() for td in tds])
+    return container
+
+
+class _TdataTokenizer(HTMLParser):
+    """只在 tbody#tdata 内部收集 td 文本的流式解析器"""
+
+    def __init__(self, n_cols: int):
+        super().__init__(convert_charrefs=True)
+        self.n_cols = n_cols
+        self.rows: List[List[str]] = []
+        self._in_tbody = False
+        self._row: List[str] | None = None
+        self._cell: List[str] | None = None
+        self._depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tbody":
+            if self._in_tbody:
+                self._depth += 1
+            elif ("id", "tdata") in attrs:
+                self._in_tbody = True
+        elif not self._in_tbody:
+            return
+        elif tag == "tr":
+            # 允许省略 </tr>、</td>
+            self._close_row()
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._close_cell()
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if not self._in_tbody:
+            return
+        if tag == "td":
+            self._close_cell()
+        elif tag == "tr":
+            self._close_row()
+        elif tag == "tbody":
+            if self._depth:
+                self._depth -= 1
+                return
+            self._close_row()
+            self._in_tbody = False
+
+    def _close_cell(self):
+        if self._cell is not None:
+            self._row.append("".join(self._cell).strip())
+            self._cell = None
+
+    def _close_row(self):
+        if self._row is not None:
+            self._close_cell()
+            self.rows.append(self._row[: self.n_cols])
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def parse_tdata_stream(text: str, n_cols: int = N_COLS) -> List[List[str]]:
+    """标准库 HTMLParser 流式扫描，不构建整棵 DOM"""
+    tokenizer = _TdataTokenizer(n_cols)
+    tokenizer.feed(text)
+    tokenizer.close()
+    return tokenizer.rows
+
+
+BACKENDS: Dict[str, Callable[[str, int], List[List[str]]]] = {
+    "bs4": parse_tdata_bs4,
+    "stream": parse_tdata_stream,
+}
+if lxml_html is not None:
+    BACKENDS["lxml"] = parse_tdata_lxml
+
+DEFAULT_BACKEND = "lxml" if lxml_html is not None else "stream"
+
+
+def parse_tdata(text: str, n_cols: int = N_COLS, backend: str = DEFAULT_BACKEND):
+    """
+    解析 tbody#tdata 中每行的前 n_cols 列
+
+    :param backend: 安装了 lxml 时默认使用 lxml，否则使用流式解析
+    :return: [[term, red_1, ..., blue_1], ...]
+    """
+    return BACKENDS[backend](text, n_cols)
+
+
+def parse_latest_date(text: str) -> str | None:
+    """
+    表格按期号排序，最晚的开奖日期只会出现在第一行或最后一行，只扫描两端
+
+    :return: tbody#tdata 中最晚的开奖日期 YYYY-MM-DD，页面没有日期列时为 None
+    """
+    start = max(text.find('id="tdata"'), 0)
+    end = text.find("</tbody>", start)
+    end = len(text) if end < 0 else end
+    first = DATE_PATTERN.search(text, start, end)
+    dates = DATE_PATTERN.findall(text, max(start, end - 2048), end)
+    dates += [first.group()] if first else []
+    return max(dates) if dates else None
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 19:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 双色球、大乐透开奖历史与杀号的并发刷新
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Dict
+
+from hysterical_ticket.component.collector import VALIDATORS_FN, trace_history
+from hysterical_ticket.component.fns import FilterNums, FnsContainer, align_term
+from hysterical_ticket.component.fns_backtest import tune_weights
+from hysterical_ticket.component.history import load_table
+from hysterical_ticket.component.session import Session
+from hysterical_ticket.component.store import Store, open_store
+
+
+@dataclass
+class StageReport:
+    name: str
+    elapsed: float = 0
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class RefreshReport:
+    stages: Dict[str, StageReport] = field(default_factory=dict)
+    # {branch: FnsContainer}，抓取失败的彩种不在其中
+    fns: Dict[str, FnsContainer] = field(default_factory=dict)
+    elapsed: float = 0
+
+    @property
+    def ok(self) -> bool:
+        return all(stage.ok for stage in self.stages.values())
+
+    def timings(self) -> Dict[str, float]:
+        return {name: stage.elapsed for name, stage in self.stages.items()}
+
+
+async def _stage(report: RefreshReport, name: str, aw: Awaitable):
+    stage = report.stages[name] = StageReport(name=name)
+    start = time.perf_counter()
+    try:
+        return await aw
+    except Exception as err:
+        stage.error = err
+        logging.error(f"refresh stage failed - stage={name} err={err!r}")
+    finally:
+        stage.elapsed = time.perf_counter() - start
+        logging.info(f"refresh stage - stage={name} elapsed={stage.elapsed:.3f}s")
+
+
+async def _refresh_fns(
+    report: RefreshReport,
+    store: Store,
+    cache_dir: Path,
+    ext: str,
+    output: Path,
+    history: asyncio.Future,
+    session: Session,
+):
+    """
+    杀号页面与开奖历史并发抓取，等历史落盘后再保存
+
+    历史抓取失败时不保存：本地最新期号可能已经落后，按它推算的下一期会覆盖已保存的杀号。
+    期号优先采用杀号页面自己标注的期号，且必须晚于本地最新一期。
+    保存后用新的开奖历史回测已有杀号，更新下次抓取使用的来源权重
+
+    :param output: 开奖历史 csv
+    """
+    branch = ext.lstrip(".")
+    fns = FilterNums(
+        next_term="",
+        cache_dir=cache_dir,
+        branch_ext=ext,
+        fnc=FnsContainer(),
+        _client=session,
+        store=store,
+    )
+    container = await fns.fetch()
+    await asyncio.wait([history])
+
+    stage = report.stages.get(branch)
+    if stage is None or not stage.ok:
+        raise RuntimeError(f"History stage failed, fns not saved - branch={branch}")
+    latest_term = store.latest_term(branch)
+    if not latest_term:
+        raise RuntimeError(f"No local history to decide next term - branch={branch}")
+    page_term = align_term(container.term, latest_term)
+    if page_term and int(page_term) <= int(latest_term):
+        raise RuntimeError(
+            f"Fns page is not ahead of local history - branch={branch} "
+            f"page_term={container.term} latest_term={latest_term}"
+        )
+    fns = FilterNums(
+        next_term=page_term or str(int(latest_term) + 1),
+        cache_dir=cache_dir,
+        branch_ext=ext,
+        fnc=container,
+        store=store,
+    )
+    fns.save()
+
+    if table := load_table(output):
+        tune_weights(store, table)
+    return container
+
+
+async def refresh_all(
+    history_dir: Path, cache_dir: Path, session: Session | None = None, store: Store | None = None
+) -> RefreshReport:
+    """
+    并发刷新双色球、大乐透的开奖历史与杀号，总耗时约等于最慢的单个请求
+
+    :param history_dir: 双色球.csv / 大乐透.csv 所在目录
+    :param cache_dir: 杀号缓存目录
+    :param session: 共享的 HTTP 层，为 None 时临时创建一个，每个 host 的并发与速率由它限制
+    :param store: 开奖历史、期号与杀号共用的 store，为 None 时使用 history_dir 下的 hysteria.db
+    """
+    history_dir.mkdir(parents=True, exist_ok=True)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    store = store or open_store(history_dir)
+    report = RefreshReport()
+    start = time.perf_counter()
+
+    async with AsyncExitStack() as stack:
+        if session is None:
+            validators_path = history_dir.joinpath(VALIDATORS_FN)
+            session = await stack.enter_async_context(Session(validators_path=validators_path))
+
+        histories = {
+            ".ssq": history_dir.joinpath("双色球.csv"),
+            ".dlt": history_dir.joinpath("大乐透.csv"),
+        }
+        tasks = {}
+        for ext, output in histories.items():
+            branch = ext.lstrip(".")
+            history = asyncio.ensure_future(
+                _stage(report, branch, trace_history(output, ext, session, store))
+            )
+            tasks[branch] = history
+            tasks[f"fns_{branch}"] = asyncio.ensure_future(
+                _stage(
+                    report,
+                    f"fns_{branch}",
+                    _refresh_fns(report, store, cache_dir, ext, output, history, session),
+                )
+            )
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+        report.fns = {
+            branch: results[f"fns_{branch}"]
+            for branch in ("ssq", "dlt")
+            if results[f"fns_{branch}"] is not None
+        }
+
+    report.elapsed = time.perf_counter() - start
+    logging.info(f"refresh all - elapsed={report.elapsed:.3f}s timings={report.timings()}")
+    return report
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 20:10
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 录制与回放 HTTP 响应，离线运行 Collector 与 FilterNums
+from __future__ import annotations
+
+import json
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+
+# 响应体以解码后的文本保存，这些头不再适用
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class CassetteMissError(LookupError):
+    """回放时没有录制过的请求"""
+
+
+def _key(request: httpx.Request) -> Tuple[str, str]:
+    # 查询参数排序后作为键，与参数拼接顺序无关
+    url = request.url.copy_with(query=None)
+    params = sorted(request.url.params.multi_items())
+    if params:
+        url = url.copy_merge_params(params)
+    return request.method, str(url)
+
+
+def _dump(request: httpx.Request, response: httpx.Response) -> dict:
+    headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+    return {
+        "request": {"method": request.method, "url": str(request.url)},
+        "response": {
+            "status": response.status_code,
+            "headers": headers,
+            "encoding": response.encoding or "utf-8",
+            "text": response.text,
+        },
+    }
+
+
+class RecordTransport(httpx.AsyncBaseTransport):
+    """
+    转发请求并把每个请求与响应按顺序写入 cassette 文件
+
+    >>> async with Session(transport=RecordTransport(path)) as session:
+    ...     await trace_history(output, ".ssq", session)
+    """
+
+    def __init__(self, path: Path, inner: httpx.AsyncBaseTransport | None = None):
+        self.path = Path(path)
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.interactions: List[dict] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+        response = httpx.Response(
+            response.status_code, headers=response.headers, content=content, request=request
+        )
+        self.interactions.append(_dump(request, response))
+        return response
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        cassette = {"version": 1, "interactions": self.interactions}
+        self.path.write_text(json.dumps(cassette, ensure_ascii=False, indent=2), encoding="utf8")
+        logging.info(f"save cassette - path={self.path} interactions={len(self.interactions)}")
+
+    async def aclose(self):
+        # Session 每个 host 一个客户端，共用同一个 transport，会被关闭多次
+        self.save()
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    按 (method, url) 回放 cassette 中的响应，同一请求录制了多次时按录制顺序依次返回，
+    用完后重复最后一次
+
+    :param strict: 为 True 时遇到未录制的请求抛出 CassetteMissError，否则返回 404
+    """
+
+    def __init__(self, path: Path, strict: bool = True):
+        self.path = Path(path)
+        self.strict = strict
+        self._responses: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+        self._cursor: Dict[Tuple[str, str], int] = defaultdict(int)
+
+        cassette = json.loads(self.path.read_text(encoding="utf8"))
+        for interaction in cassette["interactions"]:
+            request = httpx.Request(**interaction["request"])
+            self._responses[_key(request)].append(interaction["response"])
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = _key(request)
+        responses = self._responses.get(key)
+        if not responses:
+            if self.strict:
+                raise CassetteMissError(f"Request not in cassette - method={key[0]} url={key[1]}")
+            return httpx.Response(404, request=request)
+
+        cursor = self._cursor[key]
+        self._cursor[key] = min(cursor + 1, len(responses) - 1)
+        data = responses[cursor]
+        # 按录制时的编码还原字节，保持与 Content-Type 声明的字符集一致
+        content = data["text"].encode(data.get("encoding") or "utf-8")
+        return httpx.Response(
+            data["status"], headers=data["headers"], content=content, request=request
+        )
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 19:40
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 开奖日历与本地历史的新鲜度
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Tuple
+
+from hysterical_ticket.component.store import Store, open_store
+
+CN_TZ = timezone(timedelta(hours=8), name="Asia/Shanghai")
+
+# 开奖日 (datetime.weekday()，周一为 0) 与开奖时间
+# 双色球：周二、周四、周日 21:15；大乐透：周一、周三、周六 21:25
+DRAW_CALENDAR: Dict[str, Tuple[Tuple[int, ...], time]] = {
+    "ssq": ((1, 3, 6), time(21, 15, tzinfo=CN_TZ)),
+    "dlt": ((0, 2, 5), time(21, 25, tzinfo=CN_TZ)),
+}
+
+# 没有最新一期的开奖日期时（旧版数据库），开奖后 SETTLE 以内每隔 RECHECK 重试一次
+# 有开奖日期时，本地期号落后于开奖日历推算的期号就每隔 RECHECK 重试，直到数据源更新
+SETTLE = timedelta(hours=2)
+RECHECK = timedelta(minutes=10)
+
+
+def _now(now: datetime | None) -> datetime:
+    return (now or datetime.now(CN_TZ)).astimezone(CN_TZ)
+
+
+def last_draw_at(branch: str, now: datetime | None = None) -> datetime:
+    """不晚于 now 的最近一次开奖时间"""
+    weekdays, at = DRAW_CALENDAR[branch]
+    now = _now(now)
+    for days in range(8):
+        day = now.date() - timedelta(days=days)
+        draw_at = datetime.combine(day, at)
+        if day.weekday() in weekdays and draw_at <= now:
+            return draw_at
+    raise ValueError(f"Invalid draw calendar - branch={branch}")
+
+
+def next_draw_at(branch: str, now: datetime | None = None) -> datetime:
+    """晚于 now 的下一次开奖时间，春节等休市期间不做特殊处理"""
+    weekdays, at = DRAW_CALENDAR[branch]
+    now = _now(now)
+    for days in range(8):
+        day = now.date() + timedelta(days=days)
+        draw_at = datetime.combine(day, at)
+        if day.weekday() in weekdays and draw_at > now:
+            return draw_at
+    raise ValueError(f"Invalid draw calendar - branch={branch}")
+
+
+def count_draws(branch: str, start: datetime, end: datetime) -> int:
+    """(start, end] 之间的开奖次数"""
+    count, draw_at = 0, next_draw_at(branch, start)
+    while draw_at <= end:
+        count += 1
+        draw_at = next_draw_at(branch, draw_at)
+    return count
+
+
+def read_metadata(branch: str, store: Store | Path) -> Tuple[int, datetime, datetime | None] | None:
+    """
+    读取 save_history 写入 store 的最新期号、抓取时间与最新一期的开奖时间
+
+    :param store: Store 或其所在目录
+    :return: (最新期号, 抓取时间, 开奖时间)，开奖日期未知时开奖时间为 None
+    """
+    store = store if isinstance(store, Store) else open_store(store)
+    metadata = store.metadata(branch)
+    if metadata is None:
+        return None
+    latest_term, fetched_at = metadata
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=CN_TZ)
+    day = store.drawn_at(branch)
+    drawn_at = datetime.combine(day, DRAW_CALENDAR[branch][1]) if day else None
+    return int(latest_term), fetched_at, drawn_at
+
+
+def expected_term(branch: str, store: Store | Path, now: datetime | None = None) -> int | None:
+    """
+    本地最新期号加上它开奖之后按开奖日历又经过的开奖次数，即当前应有的最新期号
+
+    春节等休市期间会高估，只会多发几次条件请求
+
+    :return: 开奖日期未知、跨年（期号从 001 重新编号）或没有本地历史时为 None
+    """
+    metadata = read_metadata(branch, store)
+    if metadata is None or metadata[2] is None:
+        return None
+    latest_term, _, drawn_at = metadata
+    now = _now(now)
+    if now.year != drawn_at.year:
+        return None
+    return latest_term + count_draws(branch, drawn_at, now)
+
+
+def is_stale(branch: str, store: Store | Path, now: datetime | None = None) -> bool:
+    """
+    本地历史是否可能缺少已经开奖的期号
+
+    - 没有本地元数据：需要抓取
+    - 本地最新期号落后于 expected_term：数据源可能尚未更新，距上次抓取超过 RECHECK 时重试，
+      直到期号追上为止，不受数据源延迟多久的影响
+    - 无法推算期号时按抓取时间判断：上次抓取早于最近一次开奖需要抓取，
+      抓取发生在开奖后 SETTLE 以内时每隔 RECHECK 重试
+    """
+    metadata = read_metadata(branch, store)
+    if metadata is None:
+        return True
+    latest_term, fetched_at, _ = metadata
+    now = _now(now)
+    expected = expected_term(branch, store, now)
+    if expected is not None:
+        return latest_term < expected and now - fetched_at >= RECHECK
+    draw_at = last_draw_at(branch, now)
+    if fetched_at < draw_at:
+        return True
+    return fetched_at < draw_at + SETTLE and now - fetched_at >= RECHECK
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 18:10
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 共享的 HTTP 连接池
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict
+from urllib.parse import urljoin
+
+import httpx
+from httpx import AsyncClient
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/115.0.0.0 Safari/537.36 Edg/115.0.1901.183"
+)
+
+
+@dataclass
+class HostProfile:
+    headers: Dict[str, str] = field(default_factory=dict)
+    # False 时不读取系统代理
+    trust_env: bool = True
+    # 每秒请求数上限，0 表示不限速
+    rate: float = 5
+
+
+PROFILES: Dict[str, HostProfile] = {
+    "datachart.500.com": HostProfile(headers={"User-Agent": USER_AGENT}),
+    "cp.360.cn": HostProfile(
+        headers={"User-Agent": USER_AGENT, "Host": "cp.360.cn"}, trust_env=False
+    ),
+}
+
+DEFAULT_PROFILE = HostProfile(headers={"User-Agent": USER_AGENT})
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class HostLimiter:
+    """单个 host 的并发上限与请求速率限制，rate 为每秒请求数，0 表示不限速"""
+
+    def __init__(self, concurrency: int, rate: float = 0):
+        self.rate = rate
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._next_at = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        if not self.rate:
+            return self
+        try:
+            async with self._lock:
+                now = asyncio.get_running_loop().time()
+                wait = self._next_at - now
+                self._next_at = max(now, self._next_at) + 1 / self.rate
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._semaphore.release()
+
+
+@dataclass
+class Session:
+    """
+    collector 与 fns 共用的 HTTP 层：
+    - 每个 host 一个长连接池
+    - 对连接错误、超时与 5xx 做有限次数的指数退避重试
+    - 记录 ETag / Last-Modified，conditional=True 时发送条件请求，未变化的页面返回 304 且没有响应体。
+      新的 validator 先暂存，调用方确认页面内容已处理（如历史已落盘）后 commit 才会生效，
+      否则下次条件请求仍使用旧的 validator，不会因 304 漏掉没有保存下来的内容
+    - 每个 host 至多 host_concurrency 个并发请求，每秒请求数默认按 PROFILES 中的 rate 限制，
+      host_rate 不为 None 时统一使用 host_rate（0 表示不限速，如离线回放）
+
+    >>> async with Session(validators_path=cache_dir.joinpath("validators.json")) as session:
+    ...     resp = await session.get("https://datachart.500.com/ssq/history/history.shtml")
+    """
+
+    validators_path: Path | None = None
+    retries: int = 3
+    backoff: float = 0.5
+    timeout: float = 10
+    max_connections: int = 4
+    host_concurrency: int = 2
+    host_rate: float | None = None
+    transport: httpx.AsyncBaseTransport | None = None
+
+    _clients: Dict[str, AsyncClient] = field(default_factory=dict)
+    _validators: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    # 尚未 commit 的 validator
+    _pending: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    _limiters: Dict[str, HostLimiter] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.validators_path and self.validators_path.exists():
+            try:
+                self._validators = json.loads(self.validators_path.read_text(encoding="utf8"))
+            except json.JSONDecodeError:
+                self._validators = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        self._limiters.clear()
+        for client in clients.values():
+            await client.aclose()
+        self.save_validators()
+
+    def save_validators(self):
+        if not self.validators_path:
+            return
+        self.validators_path.parent.mkdir(parents=True, exist_ok=True)
+        self.validators_path.write_text(json.dumps(self._validators, indent=4), encoding="utf8")
+
+    def client(self, host: str) -> AsyncClient:
+        if host not in self._clients:
+            profile = PROFILES.get(host, DEFAULT_PROFILE)
+            limits = httpx.Limits(
+                max_connections=self.max_connections, max_keepalive_connections=self.max_connections
+            )
+            kwargs = {"transport": self.transport} if self.transport else {}
+            self._clients[host] = AsyncClient(
+                headers=profile.headers,
+                trust_env=profile.trust_env,
+                limits=limits,
+                timeout=self.timeout,
+                **kwargs,
+            )
+        return self._clients[host]
+
+    def limiter(self, host: str) -> HostLimiter:
+        # 在事件循环内惰性创建，兼容 Python 3.8/3.9 的 asyncio 原语
+        if host not in self._limiters:
+            rate = PROFILES.get(host, DEFAULT_PROFILE).rate
+            rate = rate if self.host_rate is None else self.host_rate
+            self._limiters[host] = HostLimiter(self.host_concurrency, rate)
+        return self._limiters[host]
+
+    async def get(self, url: str, *, params=None, conditional: bool = False) -> httpx.Response:
+        """
+        :param conditional: 带上次记录的 ETag / Last-Modified，页面未变化时返回 304
+        :return: 最后一次尝试的响应，重试耗尽时抛出最后一次的异常
+        """
+        request_url = httpx.URL(url)
+        if params:
+            request_url = request_url.copy_merge_params(params)
+        request_url = str(request_url)
+        headers = {}
+        validator = self._validators.get(request_url, {})
+        if conditional and validator.get("etag"):
+            headers["If-None-Match"] = validator["etag"]
+        if conditional and validator.get("last_modified"):
+            headers["If-Modified-Since"] = validator["last_modified"]
+
+        host = httpx.URL(url).host
+        client = self.client(host)
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.limiter(host):
+                    resp = await client.get(request_url, headers=headers)
+            except httpx.TransportError as err:
+                if attempt == self.retries:
+                    raise
+                logging.warning(f"retry request - url={request_url} attempt={attempt} err={err!r}")
+            else:
+                if resp.status_code not in RETRY_STATUS or attempt == self.retries:
+                    break
+                logging.warning(
+                    f"retry request - url={request_url} attempt={attempt} status={resp.status_code}"
+                )
+            await asyncio.sleep(self.backoff * 2**attempt)
+
+        if resp.status_code == 200:
+            self._remember(request_url, resp)
+        return resp
+
+    def _remember(self, url: str, resp: httpx.Response):
+        validator = {}
+        if resp.headers.get("etag"):
+            validator["etag"] = resp.headers["etag"]
+        if resp.headers.get("last-modified"):
+            validator["last_modified"] = resp.headers["last-modified"]
+        self._pending[url] = validator
+
+    def commit(self, url: str, *, params=None):
+        """url 最近一次 200 响应的内容已处理，之后的条件请求使用它的 validator"""
+        request_url = httpx.URL(url)
+        if params:
+            request_url = request_url.copy_merge_params(params)
+        request_url = str(request_url)
+        if request_url not in self._pending:
+            return
+        validator = self._pending.pop(request_url)
+        if validator:
+            self._validators[request_url] = validator
+        else:
+            self._validators.pop(request_url, None)
+
+    def bind(self, base_url: str) -> BoundSession:
+        return BoundSession(session=self, base_url=base_url.rstrip("/") + "/")
+
+
+@dataclass
+class BoundSession:
+    """相对 base_url 发起请求，替代 AsyncClient(base_url=...) 的用法"""
+
+    session: Session
+    base_url: str
+
+    async def get(self, path: str, *, params=None, conditional: bool = False) -> httpx.Response:
+        url = urljoin(self.base_url, path.lstrip("/"))
+        return await self.session.get(url, params=params, conditional=conditional)
+
+    def commit(self, path: str, *, params=None):
+        self.session.commit(urljoin(self.base_url, path.lstrip("/")), params=params)
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 01:20
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 多进程蒙特卡洛模拟，按奖级比较各选号策略的期望与置信区间
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from hysterical_ticket.component.engine import GRID_BUDGET, Summary, popcount_masks
+from hysterical_ticket.component.generator import BATCH_SIZE, TicketGenerator, to_masks
+from hysterical_ticket.component.parallel import get_pool, split_range
+from hysterical_ticket.component.ticket import SPECS, Ticket, as_ticket
+from hysterical_ticket.component.verifier import CHECKERS
+
+
+@dataclass
+class Strategy:
+    """一组固定的号码，每期模拟开奖都用同一组号码兑奖"""
+
+    name: str
+    tickets: List[Ticket]
+
+    @classmethod
+    def from_nums(cls, name: str, nums: Sequence[Sequence[str] | Ticket], branch: str = "ssq"):
+        return cls(name=name, tickets=[as_ticket(mc, branch=branch) for mc in nums])
+
+    @classmethod
+    def from_generator(cls, name: str, generator: TicketGenerator, n: int):
+        return cls(name=name, tickets=generator.tickets(n))
+
+
+@dataclass
+class Moments:
+    """每期取值的和与平方和，按 worker 顺序相加保证结果可复现"""
+
+    draws: int
+    # (strategies, levels) 每期各奖级中奖注数
+    level_sum: np.ndarray
+    level_sq: np.ndarray
+    # (strategies,) 每期奖金
+    bonus_sum: np.ndarray
+    bonus_sq: np.ndarray
+
+    @classmethod
+    def empty(cls, n_strategies: int, n_levels: int):
+        return cls(
+            draws=0,
+            level_sum=np.zeros((n_strategies, n_levels), dtype=np.int64),
+            level_sq=np.zeros((n_strategies, n_levels), dtype=np.int64),
+            bonus_sum=np.zeros(n_strategies, dtype=np.float64),
+            bonus_sq=np.zeros(n_strategies, dtype=np.float64),
+        )
+
+    def merge(self, other: Moments):
+        self.draws += other.draws
+        self.level_sum += other.level_sum
+        self.level_sq += other.level_sq
+        self.bonus_sum += other.bonus_sum
+        self.bonus_sq += other.bonus_sq
+        return self
+
+
+def _simulate_shard(task) -> Moments:
+    """
+    子进程入口：用独立的随机数流生成 n_draws 期均匀开奖，对所有策略的号码兑奖
+
+    :param task: (branch, seed, n_draws, red_masks, blue_masks, bounds, bonus_table)
+    """
+    branch, seed, n_draws, red_masks, blue_masks, bounds, bonus_table = task
+    level_table = CHECKERS[branch].level_table
+    generator = TicketGenerator.uniform(branch)
+    generator.rng = np.random.default_rng(seed)
+
+    moments = Moments.empty(len(bounds), len(bonus_table))
+    step = max(1, GRID_BUDGET // max(1, len(red_masks)))
+    for reds, blues in generator.iter_batches(n_draws, batch_size=min(BATCH_SIZE, step)):
+        red = popcount_masks(to_masks(reds)[:, None] & red_masks, dtype=np.uint8)
+        blue = popcount_masks(to_masks(blues)[:, None] & blue_masks, dtype=np.uint8)
+        levels = level_table[red, blue]
+        bonus = bonus_table[levels]
+        for s, (start, stop) in enumerate(bounds):
+            block = levels[:, start:stop]
+            for level in range(1, len(bonus_table)):
+                hits = np.count_nonzero(block == level, axis=1).astype(np.int64)
+                moments.level_sum[s, level] += hits.sum()
+                moments.level_sq[s, level] += (hits * hits).sum()
+            payout = bonus[:, start:stop].sum(axis=1, dtype=np.int64).astype(np.float64)
+            moments.bonus_sum[s] += payout.sum()
+            moments.bonus_sq[s] += (payout * payout).sum()
+        moments.draws += len(levels)
+    return moments
+
+
+@dataclass
+class Estimate:
+    """每期的期望值与置信区间"""
+
+    mean: float
+    low: float
+    high: float
+    std: float
+
+
+def _estimate(total: float, sq: float, n: int, z: float, rare: bool = False) -> Estimate:
+    """正态近似；rare 为 True 且从未出现时用 rule of three 给出上界（约 95%）"""
+    if rare and total == 0:
+        return Estimate(mean=0.0, low=0.0, high=3 / n, std=0.0)
+    mean = float(total) / n
+    var = max(float(sq) / n - mean * mean, 0.0) * n / max(n - 1, 1)
+    half = z * (var / n) ** 0.5
+    return Estimate(mean=mean, low=max(mean - half, 0.0), high=mean + half, std=var**0.5)
+
+
+@dataclass
+class StrategyReport:
+    name: str
+    tickets: int
+    draws: int
+    # {奖级名称: 每期中奖注数的估计}
+    tiers: Dict[str, Estimate] = field(default_factory=dict)
+    # 每期奖金与每期净亏损（成本 - 奖金）
+    bonus: Estimate = None
+    loss: Estimate = None
+
+    @property
+    def cost(self) -> int:
+        return self.tickets * Summary.price
+
+    @property
+    def expected_roi(self) -> float:
+        return (self.bonus.mean - self.cost) / self.cost if self.cost else 0.0
+
+
+@dataclass
+class SimulationResult:
+    branch: str
+    seed: int
+    workers: int
+    draws: int
+    confidence: float
+    reports: List[StrategyReport]
+    elapsed: float = 0.0
+
+    def as_records(self) -> List[dict]:
+        return [
+            {
+                "name": r.name,
+                "tickets": r.tickets,
+                "cost": r.cost,
+                "bonus": r.bonus.mean,
+                "loss": r.loss.mean,
+                "loss_ci": (r.loss.low, r.loss.high),
+                "loss_std": r.loss.std,
+                "roi": r.expected_roi,
+                "tiers": {name: (e.mean, e.low, e.high) for name, e in r.tiers.items()},
+            }
+            for r in self.reports
+        ]
+
+
+def simulate(
+    strategies: Sequence[Strategy],
+    draws: int = 1_000_000,
+    branch: str = "ssq",
+    seed: int = 0,
+    workers: int = 1,
+    confidence: float = 0.95,
+    floating: Dict[int, int] | None = None,
+) -> SimulationResult:
+    """
+    所有策略共用同一批模拟开奖（公共随机数），策略之间的差异不受抽样噪声影响
+
+    :param draws: 模拟开奖期数，按 worker 切分
+    :param seed: 与 workers 一起决定全部随机数：SeedSequence(seed).spawn(workers)
+    :param floating: 浮动奖（一、二等奖）按固定金额计入，{level: bonus}；默认与 Summary 一致记为 0
+    """
+    if draws < 1:
+        raise ValueError(f"Invalid number of draws - draws={draws}")
+    if workers < 1:
+        raise ValueError(f"Invalid number of workers - workers={workers}")
+    start = time.perf_counter()
+    spec, checker = SPECS[branch], CHECKERS[branch]
+    bonus_table = np.clip(checker.bonus_table, 0, None)
+    for level, bonus in (floating or {}).items():
+        bonus_table[level] = bonus
+
+    red_masks = np.array([t.red for s in strategies for t in s.tickets], dtype=np.uint64)
+    blue_masks = np.array([t.blue for s in strategies for t in s.tickets], dtype=np.uint64)
+    bounds, offset = [], 0
+    for strategy in strategies:
+        bounds.append((offset, offset + len(strategy.tickets)))
+        offset += len(strategy.tickets)
+
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    shards = split_range(draws, workers)
+    tasks = [
+        (spec.branch, seeds[i], stop - begin, red_masks, blue_masks, bounds, bonus_table)
+        for i, (begin, stop) in enumerate(shards)
+    ]
+    if workers > 1:
+        parts = list(get_pool(len(tasks)).map(_simulate_shard, tasks))
+    else:
+        parts = [_simulate_shard(task) for task in tasks]
+
+    moments = Moments.empty(len(strategies), len(bonus_table))
+    for part in parts:
+        moments.merge(part)
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    n = moments.draws
+    reports = []
+    for s, strategy in enumerate(strategies):
+        tiers = {
+            checker.get_zh_level(level): _estimate(
+                moments.level_sum[s, level], moments.level_sq[s, level], n, z, rare=True
+            )
+            for level in range(1, len(bonus_table))
+        }
+        bonus = _estimate(moments.bonus_sum[s], moments.bonus_sq[s], n, z)
+        cost = len(strategy.tickets) * Summary.price
+        loss = Estimate(
+            mean=cost - bonus.mean, low=cost - bonus.high, high=cost - bonus.low, std=bonus.std
+        )
+        reports.append(
+            StrategyReport(
+                name=strategy.name,
+                tickets=len(strategy.tickets),
+                draws=n,
+                tiers=tiers,
+                bonus=bonus,
+                loss=loss,
+            )
+        )
+
+    result = SimulationResult(
+        branch=branch,
+        seed=seed,
+        workers=workers,
+        draws=n,
+        confidence=confidence,
+        reports=reports,
+        elapsed=time.perf_counter() - start,
+    )
+    logging.info(
+        f"simulate - branch={branch} draws={n} strategies={len(strategies)} "
+        f"workers={workers} elapsed={result.elapsed:.2f}s"
+    )
+    return result
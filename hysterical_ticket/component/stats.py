@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 00:20
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 号码出现次数、遗漏、同期共现与冷热号的增量统计
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.ticket import SPECS
+
+# 冷热号的滑动窗口（期数）
+WINDOWS = (10, 30, 100)
+
+STATS_SUFFIX = ".stats.npz"
+
+
+@dataclass
+class ZoneStats:
+    """
+    红球或蓝球一个区的统计，下标 i 对应号码 i+1
+
+    counts: 累计出现次数
+    omission: 当前遗漏，距上次出现经过的期数，从未出现时为已统计的期数
+    max_omission: 历史最大遗漏
+    pairs: (width, width) 同期共现次数，对称，对角线为 0
+    window_counts: (len(windows), width) 最近 w 期的出现次数
+    recent: (max(windows), k) 最近开奖的环形缓冲，用于窗口滑出
+    """
+
+    counts: np.ndarray
+    omission: np.ndarray
+    max_omission: np.ndarray
+    pairs: np.ndarray
+    window_counts: np.ndarray
+    recent: np.ndarray
+
+    @classmethod
+    def empty(cls, width: int, k: int, windows: Sequence[int]):
+        zeros = np.zeros(width, dtype=np.int64)
+        return cls(
+            counts=zeros.copy(),
+            omission=zeros.copy(),
+            max_omission=zeros.copy(),
+            pairs=np.zeros((width, width), dtype=np.int64),
+            window_counts=np.zeros((len(windows), width), dtype=np.int64),
+            recent=np.zeros((max(windows), k), dtype=np.int64),
+        )
+
+    @classmethod
+    def from_indices(cls, idx: np.ndarray, width: int, windows: Sequence[int]):
+        """
+        一次性构建全部历史的统计，结果与逐期 append 一致
+
+        :param idx: shape=(terms, k) 按期号顺序排列的号码下标
+        """
+        n_terms, k = idx.shape
+        zone = cls.empty(width, k, windows)
+        if not n_terms:
+            return zone
+        onehot = np.zeros((n_terms, width), dtype=np.int64)
+        onehot[np.arange(n_terms)[:, None], idx] = 1
+
+        # last[t, i]: 截至第 t 期号码 i 最近一次出现的位置，未出现为 -1；第 t 期后遗漏为 t - last
+        positions = np.arange(n_terms)[:, None]
+        last = np.maximum.accumulate(np.where(onehot > 0, positions, -1), axis=0)
+        zone.counts = onehot.sum(axis=0)
+        zone.omission = n_terms - 1 - last[-1]
+        zone.max_omission = (positions - last).max(axis=0)
+
+        zone.pairs = onehot.T @ onehot
+        np.fill_diagonal(zone.pairs, 0)
+        for i, w in enumerate(windows):
+            zone.window_counts[i] = onehot[-w:].sum(axis=0)
+        cap = len(zone.recent)
+        tail = np.arange(max(0, n_terms - cap), n_terms)
+        zone.recent[tail % cap] = idx[tail]
+        return zone
+
+    def append(self, nums: np.ndarray, position: int, windows: Sequence[int]):
+        """
+        :param nums: 本期号码的下标（号码 - 1）
+        :param position: 本期之前已统计的期数
+        """
+        self.counts[nums] += 1
+        self.omission += 1
+        self.omission[nums] = 0
+        np.maximum(self.max_omission, self.omission, out=self.max_omission)
+
+        self.pairs[np.ix_(nums, nums)] += 1
+        self.pairs[nums, nums] -= 1
+
+        cap = len(self.recent)
+        for i, w in enumerate(windows):
+            if position >= w:
+                self.window_counts[i, self.recent[(position - w) % cap]] -= 1
+            self.window_counts[i, nums] += 1
+        self.recent[position % cap] = nums
+
+
+@dataclass
+class HistoryStats:
+    """
+    >>> stats = update_stats(cache_path, "ssq", rows)
+    >>> stats.hot("red", window=30, k=5), stats.red.omission
+
+    按期号顺序逐期追加，每期只更新本期号码涉及的计数
+    """
+
+    branch: str
+    windows: Tuple[int, ...] = WINDOWS
+    terms: int = 0
+    last_term: str = ""
+    red: ZoneStats = None
+    blue: ZoneStats = None
+
+    def __post_init__(self):
+        spec = SPECS[self.branch]
+        self.windows = tuple(self.windows)
+        self.red = self.red or ZoneStats.empty(spec.red_width, spec.red_size, self.windows)
+        self.blue = self.blue or ZoneStats.empty(spec.blue_width, spec.blue_size, self.windows)
+
+    @classmethod
+    def from_rows(
+        cls, branch: str, rows: Sequence[Sequence[str]], windows: Sequence[int] = WINDOWS
+    ) -> HistoryStats:
+        """全量构建，冷启动与重建时使用；期号重复时保留第一次出现的一行，与 extend 一致"""
+        spec = SPECS[branch]
+        unique = {}
+        for row in sorted(rows, key=lambda row: int(row[0])):
+            unique.setdefault(int(row[0]), row)
+        rows = list(unique.values())
+        nums = np.array([row[1:] for row in rows], dtype=np.int64).reshape(
+            len(rows), spec.red_size + spec.blue_size
+        )
+        windows = tuple(windows)
+        return cls(
+            branch=branch,
+            windows=windows,
+            terms=len(rows),
+            last_term=rows[-1][0] if rows else "",
+            red=ZoneStats.from_indices(nums[:, : spec.red_size] - 1, spec.red_width, windows),
+            blue=ZoneStats.from_indices(nums[:, spec.red_size :] - 1, spec.blue_width, windows),
+        )
+
+    def append(self, row: Sequence[str]) -> bool:
+        """
+        :param row: [term, red_1, ..., blue_1]
+        :return: 期号不晚于已统计的最新一期时忽略，返回 False
+        """
+        term = row[0]
+        if self.last_term and int(term) <= int(self.last_term):
+            return False
+        spec = SPECS[self.branch]
+        reds = np.array([int(n) - 1 for n in row[1 : 1 + spec.red_size]], dtype=np.int64)
+        blues = np.array([int(n) - 1 for n in row[1 + spec.red_size :]], dtype=np.int64)
+        self.red.append(reds, self.terms, self.windows)
+        self.blue.append(blues, self.terms, self.windows)
+        self.terms += 1
+        self.last_term = term
+        return True
+
+    def extend(self, rows: Sequence[Sequence[str]]) -> int:
+        """:return: 新追加的期数"""
+        return sum(self.append(row) for row in sorted(rows, key=lambda row: int(row[0])))
+
+    def sync(self, rows: Sequence[Sequence[str]]) -> HistoryStats:
+        """
+        与完整历史对齐：只逐期追加新的期号；尚未统计或已统计部分的期数对不上
+        （历史被改写、跨年重编号）时向量化重建
+        """
+        if not self.terms:
+            return HistoryStats.from_rows(self.branch, rows, self.windows)
+        known = sum(1 for row in rows if self.last_term and int(row[0]) <= int(self.last_term))
+        if known != self.terms:
+            logging.warning(
+                f"rebuild stats - branch={self.branch} cached={self.terms} history={known}"
+            )
+            return HistoryStats.from_rows(self.branch, rows, self.windows)
+        self.extend(rows)
+        return self
+
+    def zone(self, color: str) -> ZoneStats:
+        return self.red if color == "red" else self.blue
+
+    def frequency(self, color: str = "red", window: int | None = None) -> np.ndarray:
+        """:return: 每个号码每期出现的比例"""
+        zone = self.zone(color)
+        if window is None:
+            return zone.counts / max(self.terms, 1)
+        return zone.window_counts[self.windows.index(window)] / max(min(window, self.terms), 1)
+
+    def _rank(self, color: str, window: int | None, k: int, reverse: bool) -> List[str]:
+        freq = self.frequency(color, window)
+        # 频率相同时遗漏小者更热
+        omission = self.zone(color).omission
+        order = np.lexsort((omission, -freq)) if reverse else np.lexsort((-omission, freq))
+        return [f"{i + 1:02d}" for i in order[:k].tolist()]
+
+    def hot(self, color: str = "red", window: int | None = None, k: int = 5) -> List[str]:
+        return self._rank(color, window, k, reverse=True)
+
+    def cold(self, color: str = "red", window: int | None = None, k: int = 5) -> List[str]:
+        return self._rank(color, window, k, reverse=False)
+
+    def top_pairs(self, color: str = "red", k: int = 10) -> List[Tuple[str, str, int]]:
+        pairs = np.triu(self.zone(color).pairs, 1)
+        flat = np.argsort(pairs, axis=None, kind="stable")[::-1][:k]
+        rows, cols = np.unravel_index(flat, pairs.shape)
+        return [
+            (f"{i + 1:02d}", f"{j + 1:02d}", int(pairs[i, j]))
+            for i, j in zip(rows.tolist(), cols.tolist())
+        ]
+
+    # ---------------- persistence ----------------
+
+    def save(self, path: Path):
+        meta = json.dumps(
+            {
+                "branch": self.branch,
+                "windows": list(self.windows),
+                "terms": self.terms,
+                "last_term": self.last_term,
+            }
+        )
+        arrays = {
+            f"{color}_{f.name}": getattr(self.zone(color), f.name)
+            for color in ("red", "blue")
+            for f in dataclasses.fields(ZoneStats)
+        }
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.savez(file, meta=np.array(meta), **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> HistoryStats | None:
+        """:return: 文件不存在或损坏时为 None"""
+        path = Path(path)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                zones = {
+                    color: ZoneStats(
+                        **{f.name: data[f"{color}_{f.name}"] for f in dataclasses.fields(ZoneStats)}
+                    )
+                    for color in ("red", "blue")
+                }
+            return cls(
+                branch=meta["branch"],
+                windows=tuple(meta["windows"]),
+                terms=meta["terms"],
+                last_term=meta["last_term"],
+                **zones,
+            )
+        except (FileNotFoundError, OSError, ValueError, KeyError, TypeError) as err:
+            if path.exists():
+                logging.warning(f"drop broken stats - path={path} err={err}")
+                path.unlink(missing_ok=True)
+            return None
+
+
+def stats_path(csv_path: Path) -> Path:
+    """双色球.csv -> 双色球.stats.npz"""
+    return Path(csv_path).with_suffix(STATS_SUFFIX)
+
+
+def update_stats(
+    csv_path: Path, branch: str, rows: Sequence[Sequence[str]], windows: Sequence[int] = WINDOWS
+) -> HistoryStats:
+    """
+    读取 csv 旁保存的统计，追加 rows 中的新期号后写回
+
+    :param rows: 完整历史 [[term, red_1, ..., blue_1], ...]
+    """
+    path = stats_path(csv_path)
+    stats = HistoryStats.load(path)
+    if stats is None or stats.branch != branch or stats.windows != tuple(windows):
+        stats = HistoryStats(branch=branch, windows=tuple(windows))
+
+    terms, last_term = stats.terms, stats.last_term
+    stats = stats.sync(rows)
+    if (stats.terms, stats.last_term) != (terms, last_term) or not path.exists():
+        stats.save(path)
+        logging.info(
+            f"update stats - branch={branch} terms={stats.terms} last_term={stats.last_term}"
+        )
+    return stats
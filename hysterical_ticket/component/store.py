@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 22:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 开奖历史、期号元数据与杀号的本地 SQLite 存储
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+STORE_FN = "hysteria.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    branch TEXT NOT NULL,
+    term_id INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    nums TEXT NOT NULL,
+    PRIMARY KEY (branch, term_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    branch TEXT PRIMARY KEY,
+    latest_term TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    drawn_at TEXT
+);
+CREATE TABLE IF NOT EXISTS fns (
+    branch TEXT NOT NULL,
+    term_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (branch, term_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS weights (
+    branch TEXT NOT NULL,
+    source TEXT NOT NULL,
+    weight REAL NOT NULL,
+    PRIMARY KEY (branch, source)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+
+class Store:
+    """
+    单个 SQLite 文件，按彩种保存：
+    - history: 开奖历史，(branch, term) 主键
+    - meta: 最新期号、抓取时间与最新一期的开奖日期，取代 {term}.{branch} 元数据文件
+    - fns: 每一期的杀号，取代 cache_dir/{term}.{branch} JSON
+    - weights: 杀号回测给出的来源权重
+    - files: 程序写出的其他文件（csv、.bin）的大小，用于统计磁盘占用
+
+    每次写入都在一个事务内完成
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(meta)")]
+        if "drawn_at" not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE meta ADD COLUMN drawn_at TEXT")
+
+    def close(self):
+        self._conn.close()
+
+    # ---------------- history ----------------
+
+    def put_history(
+        self,
+        branch: str,
+        rows: Sequence[Sequence[str]],
+        latest_term: str,
+        drawn_at: str | None = None,
+    ):
+        """
+        整体替换某一彩种的历史，并记录最新期号与抓取时间
+
+        :param drawn_at: 最新一期的开奖日期 YYYY-MM-DD，为 None 时沿用同一期号已记录的日期
+        """
+        fetched_at = datetime.now().astimezone().isoformat(timespec="seconds")
+        records = [(branch, int(row[0]), row[0], ",".join(row[1:])) for row in rows]
+        with self._conn:
+            self._conn.execute("DELETE FROM history WHERE branch = ?", (branch,))
+            self._conn.executemany("INSERT INTO history VALUES (?, ?, ?, ?)", records)
+            self._put_meta(branch, latest_term, fetched_at, drawn_at)
+
+    def history(self, branch: str) -> List[List[str]]:
+        """:return: 按期号升序的 [[term, red_1, ..., blue_1], ...]"""
+        cursor = self._conn.execute(
+            "SELECT term, nums FROM history WHERE branch = ? ORDER BY term_id", (branch,)
+        )
+        return [[term] + nums.split(",") for term, nums in cursor]
+
+    def _put_meta(self, branch: str, latest_term: str, fetched_at: str, drawn_at: str | None):
+        if drawn_at is None:
+            row = self._conn.execute(
+                "SELECT drawn_at FROM meta WHERE branch = ? AND latest_term = ?",
+                (branch, latest_term),
+            ).fetchone()
+            drawn_at = row[0] if row else None
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (branch, latest_term, fetched_at, drawn_at) "
+            "VALUES (?, ?, ?, ?)",
+            (branch, latest_term, fetched_at, drawn_at),
+        )
+
+    def set_meta(self, branch: str, latest_term: str, fetched_at: str, drawn_at: str | None = None):
+        with self._conn:
+            self._put_meta(branch, latest_term, fetched_at, drawn_at)
+
+    def metadata(self, branch: str) -> Tuple[str, datetime] | None:
+        """:return: (最新期号, 抓取时间)"""
+        row = self._conn.execute(
+            "SELECT latest_term, fetched_at FROM meta WHERE branch = ?", (branch,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], datetime.fromisoformat(row[1])
+
+    def latest_term(self, branch: str) -> str | None:
+        metadata = self.metadata(branch)
+        return metadata[0] if metadata else None
+
+    def drawn_at(self, branch: str) -> date | None:
+        """:return: 最新一期的开奖日期，旧版数据库或页面没有日期列时为 None"""
+        row = self._conn.execute("SELECT drawn_at FROM meta WHERE branch = ?", (branch,)).fetchone()
+        return date.fromisoformat(row[0]) if row and row[0] else None
+
+    # ---------------- fns ----------------
+
+    def put_fns(self, branch: str, term: str | int, payload: dict):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fns VALUES (?, ?, ?)",
+                (branch, int(term), json.dumps(payload, ensure_ascii=True)),
+            )
+
+    def get_fns(self, branch: str, term: str | int) -> dict | None:
+        row = self._conn.execute(
+            "SELECT payload FROM fns WHERE branch = ? AND term_id = ?", (branch, int(term))
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_fns(self, branch: str) -> Iterator[Tuple[int, dict]]:
+        cursor = self._conn.execute(
+            "SELECT term_id, payload FROM fns WHERE branch = ? ORDER BY term_id", (branch,)
+        )
+        for term, payload in cursor:
+            yield term, json.loads(payload)
+
+    # ---------------- weights ----------------
+
+    def put_weights(self, branch: str, weights: Dict[str, float]):
+        """整体替换某一彩种的来源权重"""
+        with self._conn:
+            self._conn.execute("DELETE FROM weights WHERE branch = ?", (branch,))
+            self._conn.executemany(
+                "INSERT INTO weights VALUES (?, ?, ?)",
+                [(branch, source, float(weight)) for source, weight in weights.items()],
+            )
+
+    def weights(self, branch: str) -> Dict[str, float]:
+        """:return: {source_name: weight}，未回测过的彩种为空"""
+        cursor = self._conn.execute(
+            "SELECT source, weight FROM weights WHERE branch = ?", (branch,)
+        )
+        return dict(cursor.fetchall())
+
+    # ---------------- accounting ----------------
+
+    def track(self, *paths: Path):
+        """记录文件当前大小，不存在的文件移出统计"""
+        with self._conn:
+            for path in paths:
+                path = Path(path).absolute()
+                if path.exists():
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?)",
+                        (str(path), path.stat().st_size),
+                    )
+                else:
+                    self._conn.execute("DELETE FROM files WHERE path = ?", (str(path),))
+
+    def disk_usage(self) -> int:
+        """数据库本身与 track 过的文件的总字节数"""
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        tracked = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+        wal = self.path.with_name(f"{self.path.name}-wal")
+        return page_count * page_size + tracked + (wal.stat().st_size if wal.exists() else 0)
+
+    # ---------------- migration ----------------
+
+    def import_sidecars(self, directory: Path, branches: Sequence[str] = ("ssq", "dlt")) -> int:
+        """
+        导入旧版的 {term}.{branch} 元数据与杀号 JSON 并删除原文件
+
+        :return: 导入的文件数
+        """
+        imported = 0
+        for branch in branches:
+            for path in sorted(Path(directory).glob(f"*.{branch}")):
+                term = path.name.split(".")[0]
+                try:
+                    data = json.loads(path.read_text(encoding="utf8"))
+                except (OSError, json.JSONDecodeError):
+                    continue
+                if not term.isdigit() or not isinstance(data, dict):
+                    continue
+                if "fns" in data:
+                    self.put_fns(branch, term, data["fns"])
+                elif "version" in data:
+                    metadata = self.metadata(branch)
+                    if metadata is None or int(metadata[0]) < int(data["version"]):
+                        fetched_at = datetime.fromtimestamp(path.stat().st_mtime).astimezone()
+                        self.set_meta(
+                            branch, data["version"], fetched_at.isoformat(timespec="seconds")
+                        )
+                else:
+                    continue
+                path.unlink()
+                imported += 1
+        if imported:
+            logging.info(f"import sidecars - dir={directory} files={imported}")
+        return imported
+
+
+# 同一路径只打开一次连接
+_stores: Dict[Path, Store] = {}
+
+
+def store_path(path: Path) -> Path:
+    """目录则使用其中的 hysteria.db"""
+    path = Path(path)
+    return path if path.suffix == ".db" else path.joinpath(STORE_FN)
+
+
+def open_store(path: Path) -> Store:
+    """
+    :param path: 数据库文件，或其所在目录
+    """
+    path = store_path(path).absolute()
+    if path not in _stores:
+        _stores[path] = Store(path)
+    return _stores[path]
+
+
+def close_store(path: Path):
+    store = _stores.pop(store_path(path).absolute(), None)
+    if store is not None:
+        store.close()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 20:25
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 任意长度的模拟开奖历史与对应的网页
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+
+import httpx
+import numpy as np
+
+from hysterical_ticket.component.fns import SOURCES
+from hysterical_ticket.component.schedule import last_draw_at
+from hysterical_ticket.component.ticket import SPECS
+
+# 每年约 153 期，期号为两位年份 + 三位序号
+TERMS_PER_YEAR = 153
+
+
+def synthetic_rows(
+    branch: str = "ssq", n: int = 3000, seed: int = 0, start_year: int = 3
+) -> List[List[str]]:
+    """
+    生成 n 期按期号升序排列的开奖历史
+
+    期号为年份 + 三位序号，年份通常两位；超过 99 年时所有期号的年份统一加宽，期号仍递增且唯一
+
+    :return: [[term, red_1, ..., blue_1], ...]，号码升序且两位补零
+    """
+    spec = SPECS[branch]
+    rng = np.random.default_rng(seed)
+    # 每行取随机排列的前 k 个，得到不重复的号码
+    reds = np.sort(np.argsort(rng.random((n, spec.red_width)), axis=1)[:, : spec.red_size] + 1)
+    blues = np.sort(np.argsort(rng.random((n, spec.blue_width)), axis=1)[:, : spec.blue_size] + 1)
+
+    last_year = start_year + (n - 1) // TERMS_PER_YEAR
+    year_width = max(2, len(str(last_year)))
+    rows = []
+    for i, (red, blue) in enumerate(zip(reds.tolist(), blues.tolist())):
+        year, index = divmod(i, TERMS_PER_YEAR)
+        term = f"{start_year + year:0{year_width}d}{index + 1:03d}"
+        rows.append([term] + [f"{num:02d}" for num in red + blue])
+    return rows
+
+
+def draw_dates(
+    branch: str, rows: Sequence[Sequence[str]], now: datetime | None = None
+) -> Dict[str, str]:
+    """按开奖日历倒推每一期的开奖日期，最新一期为 now 之前最近的一次开奖"""
+    dates, draw_at = {}, last_draw_at(branch, now)
+    for row in sorted(rows, key=lambda r: int(r[0]), reverse=True):
+        dates[row[0]] = draw_at.date().isoformat()
+        draw_at = last_draw_at(branch, draw_at - timedelta(seconds=1))
+    return dates
+
+
+def history_page(
+    rows: Sequence[Sequence[str]], branch: str = "ssq", dates: Dict[str, str] | None = None
+) -> str:
+    """
+    datachart.500.com 开奖历史页面的 tbody#tdata 部分，按期号倒序
+
+    :param dates: {term: YYYY-MM-DD}，缺少的期号使用固定日期
+    """
+    red_size = SPECS[branch].red_size
+    dates = dates or {}
+    trs = []
+    for row in sorted(rows, key=lambda r: int(r[0]), reverse=True):
+        tds = [f"<td>{row[0]}</td>"]
+        tds += [f'<td class="t_cfont2">{num}</td>' for num in row[1 : 1 + red_size]]
+        tds += [f'<td class="t_cfont4">{num}</td>' for num in row[1 + red_size :]]
+        tds += ["<td>1,234,567</td>", "<td>5</td>", "<td>8,000,000</td>"]
+        tds += [f"<td>{dates.get(row[0], '2023-10-12')}</td>"]
+        trs.append('<tr class="t_tr1">\n<!--<td>2</td>-->\n' + "\n".join(tds) + "\n</tr>")
+    return (
+        '<html><body><div class="chart"><table><tbody id="tdata">\n'
+        + "\n".join(trs)
+        + "\n</tbody></table></div></body></html>"
+    )
+
+
+def latest_page(rows: Sequence[Sequence[str]]) -> str:
+    """datachart.500.com 历史首页，只包含期号范围输入框"""
+    first = min(rows, key=lambda r: int(r[0]))[0]
+    last = max(rows, key=lambda r: int(r[0]))[0]
+    return (
+        '<html><body><div class="wrap_datachart">'
+        f'<input id="start" value="{first}"/><input id="end" value="{last}"/>'
+        "</div></body></html>"
+    )
+
+
+def fns_page(term: str, nums: Sequence[str]) -> str:
+    """cp.360.cn 杀号页面，FilterNums 读取倒数第 7 行"""
+    trs = [f"<tr><td>{term} {'-'.join(nums)}</td></tr>"]
+    trs += [f"<tr><td>{int(term) - i}期</td></tr>" for i in range(1, 7)]
+    return f"<html><body><table><tbody>{''.join(trs)}</tbody></table></body></html>"
+
+
+class SyntheticTransport(httpx.MockTransport):
+    """
+    以模拟数据响应 Collector 与 FilterNums 的全部请求，最新一期视为最近一次开奖
+
+    :param histories: {"ssq": rows, "dlt": rows}
+    :param fns: {"red": [...], "blue": [...]}，下一期的杀号
+    """
+
+    def __init__(self, histories: Dict[str, List[List[str]]], fns: Dict[str, List[str]] = None):
+        self.histories = histories
+        self.fns = fns or {"red": ["01", "02", "03"], "blue": ["04", "05"]}
+        super().__init__(self.handle)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == "cp.360.cn":
+            for branch, sources in SOURCES.items():
+                for source in sources:
+                    if httpx.URL(source.url) == request.url:
+                        rows = self.histories.get(branch) or [["0"]]
+                        term = str(max(int(row[0]) for row in rows) + 1)
+                        return httpx.Response(200, html=fns_page(term, self.fns[source.color]))
+            return httpx.Response(404)
+
+        branch, *_ = request.url.path.strip("/").split("/")
+        rows = self.histories.get(branch)
+        if request.url.host != "datachart.500.com" or rows is None:
+            return httpx.Response(404)
+        if request.url.path.endswith("history.shtml"):
+            return httpx.Response(200, html=latest_page(rows))
+
+        start, end = int(request.url.params["start"]), int(request.url.params["end"])
+        selected = [row for row in rows if start <= int(row[0]) <= end]
+        return httpx.Response(200, html=history_page(selected, branch, draw_dates(branch, rows)))
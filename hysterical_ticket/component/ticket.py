@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/18 11:05
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 号码的位掩码表示
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+
+    def popcount(x: int) -> int:
+        return bin(x).count("1")
+
+
+class Spec:
+    """
+    red_size: 每注红球（前区）个数
+    red_width: 红球号码上限
+    blue_size: 每注蓝球（后区）个数
+    blue_width: 蓝球号码上限
+    """
+
+    __slots__ = ("branch", "red_size", "red_width", "blue_size", "blue_width")
+
+    def __init__(self, branch: str, red_size: int, red_width: int, blue_size: int, blue_width: int):
+        self.branch = branch
+        self.red_size = red_size
+        self.red_width = red_width
+        self.blue_size = blue_size
+        self.blue_width = blue_width
+
+    def __repr__(self):
+        return f"Spec(branch={self.branch!r})"
+
+
+SPECS: Dict[str, Spec] = {
+    "ssq": Spec("ssq", red_size=6, red_width=33, blue_size=1, blue_width=16),
+    "dlt": Spec("dlt", red_size=5, red_width=35, blue_size=2, blue_width=12),
+}
+
+
+def to_mask(nums: Sequence[str], width: int) -> int:
+    """["01", "07"] -> 0b1000001, 号码 n 对应第 n-1 位"""
+    mask = 0
+    for num in nums:
+        n = int(num)
+        if not 1 <= n <= width:
+            raise ValueError(f"Number out of range - num={num} width={width}")
+        mask |= 1 << (n - 1)
+    return mask
+
+
+def from_mask(mask: int) -> List[str]:
+    nums = []
+    n = 1
+    while mask:
+        if mask & 1:
+            nums.append(f"{n:02d}")
+        mask >>= 1
+        n += 1
+    return nums
+
+
+class Ticket:
+    """
+    一注号码，红球与蓝球分别压缩为一个整数位掩码，
+    比对只需一次按位与加 popcount
+
+    >>> t = Ticket.from_nums(["01", "07", "12", "18", "23", "25", "03"])
+    >>> t.to_nums()
+    ['01', '07', '12', '18', '23', '25', '03']
+    """
+
+    __slots__ = ("red", "blue", "spec")
+
+    def __init__(self, red: int, blue: int, spec: Spec = SPECS["ssq"]):
+        self.red = red
+        self.blue = blue
+        self.spec = spec
+
+    @classmethod
+    def from_nums(cls, nums: Sequence[str], branch: str = "ssq", **kwargs):
+        """号码个数不符、超出范围或注内重复时抛出 ValueError"""
+        spec = SPECS[branch]
+        if len(nums) != spec.red_size + spec.blue_size:
+            raise ValueError(
+                f"Wrong number count - nums={list(nums)} "
+                f"expected={spec.red_size}+{spec.blue_size}"
+            )
+        red = to_mask(nums[: spec.red_size], spec.red_width)
+        blue = to_mask(nums[spec.red_size :], spec.blue_width)
+        if popcount(red) < spec.red_size or popcount(blue) < spec.blue_size:
+            raise ValueError(f"Duplicate numbers - nums={list(nums)}")
+        return cls(red=red, blue=blue, spec=spec, **kwargs)
+
+    def to_nums(self) -> List[str]:
+        return from_mask(self.red) + from_mask(self.blue)
+
+    def compare(self, other: Ticket) -> Tuple[int, int]:
+        """:return: 命中红球数, 命中蓝球数"""
+        return popcount(self.red & other.red), popcount(self.blue & other.blue)
+
+    def __eq__(self, other):
+        if not isinstance(other, Ticket):
+            return NotImplemented
+        return (self.red, self.blue, self.spec.branch) == (other.red, other.blue, other.spec.branch)
+
+    def __hash__(self):
+        return hash((self.red, self.blue, self.spec.branch))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.spec.branch}, {self.to_nums()})"
+
+
+class Draw(Ticket):
+    """一期开奖结果"""
+
+    __slots__ = ("term",)
+
+    def __init__(self, red: int, blue: int, spec: Spec = SPECS["ssq"], term: str = ""):
+        super().__init__(red, blue, spec)
+        self.term = term
+
+    @classmethod
+    def from_row(cls, row: Sequence[str], branch: str = "ssq"):
+        """[term, red_1, ..., blue_1] -> Draw"""
+        return cls.from_nums(row[1:], branch=branch, term=row[0])
+
+    def to_row(self) -> List[str]:
+        return [self.term] + self.to_nums()
+
+    def __repr__(self):
+        return f"Draw({self.spec.branch}, {self.term}, {self.to_nums()})"
+
+
+def as_ticket(nums: Sequence[str] | Ticket, branch: str = "ssq") -> Ticket:
+    if isinstance(nums, Ticket):
+        return nums
+    return Ticket.from_nums(nums, branch=branch)
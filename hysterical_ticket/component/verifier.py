@@ -2,23 +2,240 @@
 # Time       : 2023/7/24 19:01
 # Author     : QIN2DIM
 # Github     : https://github.com/QIN2DIM
-# Description:
+# Description: 校验 AI 给出的 🐞 答案块，合格的号码交给兑奖程序
+from __future__ import annotations
+
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from hysterical_ticket.component.bingo_dlt import DLTNumsChecker
+from hysterical_ticket.component.bingo_ssq import SSQNumsChecker
+from hysterical_ticket.component.checker import NumsChecker
+from hysterical_ticket.component.constraints import ConstraintFilter
+from hysterical_ticket.component.ticket import SPECS, Spec
+
+MARKER = "🐞"
+
+CHECKERS: Dict[str, type] = {"ssq": SSQNumsChecker, "dlt": DLTNumsChecker}
+
+REASONS = {
+    "format": "不是 List[str] 格式",
+    "size": "号码个数不对",
+    "range": "号码超出范围",
+    "duplicate": "同一注内号码重复",
+    "repeated": "与前面的答案重复",
+    "unsorted": "未按升序排列，已自动排序",
+    "exclude_red": "包含红球杀号",
+    "exclude_blue": "包含蓝球杀号",
+    "red_sum": "红球和值超出范围",
+    "red_odd": "红球奇数个数超出范围",
+    "red_span": "红球跨度超出范围",
+    "historical": "与历史开奖相同",
+    "historical_red": "红球与历史开奖相同",
+}
+
+
+class BlockParser:
+    """
+    逐块读入文本，按行产出 🐞 与 🐞 之间的内容
+
+    只用 str.find / str.split 切分，文本长度线性；一行可以跨越多个 chunk
+    """
+
+    def __init__(self):
+        self.lineno = 0
+        self.in_block = False
+        # 已打开的答案块数
+        self.blocks = 0
+        self._pending: List[str] = []
+
+    def feed(self, chunk: str) -> Iterator[Tuple[int, str]]:
+        """:return: (行号, 块内一行去掉首尾空白后的内容)"""
+        start = 0
+        while True:
+            end = chunk.find("\n", start)
+            if end < 0:
+                break
+            self._pending.append(chunk[start:end])
+            line, self._pending = "".join(self._pending), []
+            yield from self._line(line)
+            start = end + 1
+        if start < len(chunk):
+            self._pending.append(chunk[start:])
+
+    def close(self) -> Iterator[Tuple[int, str]]:
+        if self._pending:
+            line, self._pending = "".join(self._pending), []
+            yield from self._line(line)
+
+    def _line(self, line: str) -> Iterator[Tuple[int, str]]:
+        self.lineno += 1
+        for i, part in enumerate(line.split(MARKER)):
+            if i:
+                self.in_block = not self.in_block
+                self.blocks += self.in_block
+            part = part.strip()
+            # 代码块围栏不是答案
+            if self.in_block and part and not part.startswith("```"):
+                yield self.lineno, part
+
+
+def parse_token(token: str) -> str | None:
+    """`"01"`、`'1'`、`1` -> `01`"""
+    token = token.strip().strip("\"'").strip()
+    if not token.isdigit() or len(token) > 2:
+        return None
+    return f"{int(token):02d}"
+
+
+def parse_nums(text: str) -> List[str] | None:
+    """
+    `["01", "02", ...]`、`['01', ...]` 或 `[1, 2, ...]`
+
+    :return: 两位数字符串，不符合格式为 None
+    """
+    text = text.rstrip(",，;； ")
+    if len(text) < 2 or text[0] != "[" or text[-1] != "]":
+        return None
+    nums = [parse_token(token) for token in text[1:-1].replace("，", ",").split(",")]
+    return None if None in nums else nums
+
+
+@dataclass
+class LineResult:
+    lineno: int
+    raw: str
+    # 规范化后的号码，红球在前，各区升序
+    nums: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def describe(self) -> str:
+        reasons = [REASONS.get(r, r) for r in self.errors + self.warnings]
+        raw = self.raw if len(self.raw) <= 80 else f"{self.raw[:77]}..."
+        return f"第 {self.lineno} 行 {raw}" + (f"：{'；'.join(reasons)}" if reasons else "")
+
+
+def validate_nums(nums: List[str], spec: Spec) -> Tuple[List[str], List[str], List[str]]:
+    """
+    号码个数、范围、注内重复与排序
+
+    :return: (规范化后的号码, errors, warnings)
+    """
+    if len(nums) != spec.red_size + spec.blue_size:
+        return nums, ["size"], []
+    errors, warnings, normalized = [], [], []
+    zones = [(nums[: spec.red_size], spec.red_width), (nums[spec.red_size :], spec.blue_width)]
+    for zone, width in zones:
+        values = [int(num) for num in zone]
+        if any(v < 1 or v > width for v in values) and "range" not in errors:
+            errors.append("range")
+        if len(set(values)) != len(values) and "duplicate" not in errors:
+            errors.append("duplicate")
+        if values != sorted(values) and "unsorted" not in warnings:
+            warnings.append("unsorted")
+        normalized.extend(f"{v:02d}" for v in sorted(values))
+    return normalized, errors, warnings
 
 
 @dataclass
 class Verifier:
+    """
+    >>> verifier = Verifier.from_str(answer, branch="ssq", constraint_filter=cf)
+    >>> results = verifier.verify()
+    >>> summary = verifier.checker().summarize(cache_path)
+
+    流式输入时用 feed / close 代替 verify
+    """
+
     raw_container: str = None
     _sequence: List[List[str]] = field(default_factory=list)
+    branch: str = "ssq"
+    # 杀号与历史开奖约束，为 None 时只做格式校验
+    constraint_filter: ConstraintFilter | None = None
 
     def __post_init__(self):
         self._sequence = self._sequence or []
+        self.spec = SPECS[self.branch]
+        self.results: List[LineResult] = []
+        self._parser = BlockParser()
+        self._seen = set()
 
     @classmethod
-    def from_str(cls, raw_container: str):
-        return cls(raw_container=raw_container)
+    def from_str(cls, raw_container: str, **kwargs):
+        return cls(raw_container=raw_container, **kwargs)
 
     @classmethod
-    def from_list(cls, raw_sequence: List[List[str]]):
-        return cls(_sequence=raw_sequence)
+    def from_list(cls, raw_sequence: List[List[str]], **kwargs):
+        return cls(_sequence=raw_sequence, **kwargs)
+
+    @property
+    def blocks(self) -> int:
+        return self._parser.blocks
+
+    def _validate(self, lines: Sequence[Tuple[int, str, List[str] | None]]) -> List[LineResult]:
+        """逐行做格式校验，再对整批合格的号码做一次向量化的约束校验"""
+        batch = []
+        for lineno, raw, nums in lines:
+            result = LineResult(lineno=lineno, raw=raw)
+            if nums is None:
+                result.errors.append("format")
+            else:
+                result.nums, result.errors, result.warnings = validate_nums(nums, self.spec)
+            if result.ok:
+                key = tuple(result.nums)
+                if key in self._seen:
+                    result.errors.append("repeated")
+                self._seen.add(key)
+            batch.append(result)
+
+        candidates = [r for r in batch if r.ok]
+        if self.constraint_filter is not None and candidates:
+            size = self.spec.red_size
+            matrix = np.array([[int(n) for n in r.nums] for r in candidates], dtype=np.uint8)
+            rules = self.constraint_filter.rules(matrix[:, :size], matrix[:, size:])
+            for rule, failed in rules.items():
+                for i in np.flatnonzero(failed).tolist():
+                    candidates[i].errors.append(rule)
+
+        self.results.extend(batch)
+        return batch
+
+    def feed(self, chunk: str) -> List[LineResult]:
+        """:return: chunk 中已完整的答案行的校验结果"""
+        lines = [(lineno, raw, parse_nums(raw)) for lineno, raw in self._parser.feed(chunk)]
+        return self._validate(lines)
+
+    def close(self) -> List[LineResult]:
+        lines = [(lineno, raw, parse_nums(raw)) for lineno, raw in self._parser.close()]
+        return self._validate(lines)
+
+    def verify(self) -> List[LineResult]:
+        if self.raw_container is not None:
+            self.feed(self.raw_container)
+            self.close()
+        else:
+            lines = []
+            for i, nums in enumerate(self._sequence):
+                tokens = [parse_token(str(num)) for num in nums]
+                lines.append((i + 1, str(nums), None if None in tokens else tokens))
+            self._validate(lines)
+        return self.results
+
+    @property
+    def valid(self) -> List[List[str]]:
+        return [r.nums for r in self.results if r.ok]
+
+    @property
+    def invalid(self) -> List[LineResult]:
+        return [r for r in self.results if not r.ok]
+
+    def checker(self) -> NumsChecker:
+        """合格的号码直接交给对应彩种的兑奖程序"""
+        return CHECKERS[self.branch](self.valid)
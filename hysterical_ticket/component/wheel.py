@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 00:50
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 旋转矩阵：在给定注数内最大化选号池中 t 个红球组合的覆盖
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from itertools import combinations, cycle
+from math import comb
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from hysterical_ticket.component.engine import Summary
+from hysterical_ticket.component.ticket import SPECS, Spec, Ticket, to_mask
+from hysterical_ticket.component.verifier import CHECKERS
+
+# 候选注数上限，约为 30 选 6，控制 (candidates, C(k, t)) 关联矩阵的内存
+MAX_CANDIDATES = 600_000
+
+
+def _combos(n: int, k: int) -> np.ndarray:
+    """:return: shape=(C(n, k), k) 按字典序排列的组合下标"""
+    flat = np.fromiter(
+        (i for c in combinations(range(n), k) for i in c), dtype=np.int16, count=comb(n, k) * k
+    )
+    return flat.reshape(-1, k)
+
+
+def _masks(idx: np.ndarray) -> np.ndarray:
+    """(..., k) 下标 -> (...,) int64 位掩码"""
+    return np.bitwise_or.reduce(np.int64(1) << idx.astype(np.int64), axis=-1)
+
+
+def coverage(ticket_masks: Sequence[int], v: int, t: int) -> float:
+    """
+    :param ticket_masks: 以选号池下标表示的每注红球位掩码
+    :return: 选号池中被至少一注完整包含的 t 个号码组合所占比例
+    """
+    targets = _masks(_combos(v, t))
+    tickets = np.asarray(ticket_masks, dtype=np.int64)
+    if not len(tickets):
+        return 0.0
+    covered = np.zeros(len(targets), dtype=bool)
+    for ticket in tickets:
+        covered |= (targets & ticket) == targets
+    return float(covered.mean())
+
+
+class CoverState:
+    """
+    贪心与局部搜索共用的增量状态
+
+    incidence[c]: 候选 c 包含的 t 组合编号，shape=(candidates, C(k, t))
+    reverse[s]: 包含 t 组合 s 的候选编号，shape=(C(v, t), C(v-t, k-t))
+    gains[c]: 候选 c 包含的尚未被覆盖的 t 组合数，加入或移出一注时只更新受影响的候选
+    """
+
+    def __init__(self, v: int, k: int, t: int):
+        self.candidates = _combos(v, k)
+        sub = _combos(k, t)
+        targets = np.sort(_masks(_combos(v, t)))
+        self.incidence = np.searchsorted(targets, _masks(self.candidates[:, sub])).astype(np.int32)
+        order = np.argsort(self.incidence.ravel(), kind="stable")
+        self.reverse = (order // len(sub)).astype(np.int32).reshape(len(targets), -1)
+        self.gains = np.full(len(self.candidates), len(sub), dtype=np.int32)
+        self.counts = np.zeros(len(targets), dtype=np.int32)
+
+    @property
+    def covered(self) -> int:
+        return int(np.count_nonzero(self.counts))
+
+    @property
+    def total(self) -> int:
+        return len(self.counts)
+
+    def add(self, c: int):
+        s = self.incidence[c]
+        fresh = s[self.counts[s] == 0]
+        self.counts[s] += 1
+        np.add.at(self.gains, self.reverse[fresh].ravel(), -1)
+
+    def remove(self, c: int):
+        s = self.incidence[c]
+        self.counts[s] -= 1
+        freed = s[self.counts[s] == 0]
+        np.add.at(self.gains, self.reverse[freed].ravel(), 1)
+
+    def best(self, rng: np.random.Generator | None = None) -> int:
+        """增益最大的候选，rng 不为 None 时在并列者中随机选择"""
+        if rng is None:
+            return int(self.gains.argmax())
+        ties = np.flatnonzero(self.gains == self.gains.max())
+        return int(ties[rng.integers(len(ties))])
+
+
+@dataclass
+class Wheel:
+    """
+    >>> wheel = build_wheel([f"{i:02d}" for i in range(1, 21)], budget=200, t=4, blues=["03", "11"])
+    >>> wheel.coverage, wheel.backtest(cache_path).total_roi
+    """
+
+    spec: Spec
+    pool: List[str]
+    t: int
+    tickets: List[Ticket]
+    covered: int
+    total: int
+    # 以选号池下标表示的红球位掩码，用于计算其他 t 的覆盖率
+    pool_masks: List[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def coverage(self) -> float:
+        return self.covered / self.total if self.total else 0.0
+
+    def coverage_by_t(self, ts: Sequence[int] = (2, 3, 4)) -> Dict[int, float]:
+        return {
+            t: coverage(self.pool_masks, len(self.pool), t)
+            for t in ts
+            if t <= min(self.spec.red_size, len(self.pool))
+        }
+
+    def nums(self) -> List[List[str]]:
+        return [ticket.to_nums() for ticket in self.tickets]
+
+    def backtest(self, cache_path: Path, **kwargs) -> Summary:
+        """用对应彩种的兑奖程序回测整组号码，kwargs 透传给 NumsChecker.summarize"""
+        return CHECKERS[self.spec.branch](self.tickets).summarize(cache_path, **kwargs)
+
+
+def build_wheel(
+    pool: Sequence[str],
+    budget: int,
+    t: int = 3,
+    blues: Sequence[str] = ("01",),
+    branch: str = "ssq",
+    refine: int = 2,
+    seed: int | None = None,
+) -> Wheel:
+    """
+    贪心选择覆盖最多未覆盖 t 组合的一注，再做局部搜索：逐注移出后换成当前增益最大的候选，
+    严格变好才替换；全部覆盖后提前结束
+
+    :param pool: 选号池中的红球
+    :param budget: 最多注数
+    :param blues: 蓝球池，按组合依次轮换分配给各注
+    :param refine: 局部搜索轮数
+    :param seed: 不为 None 时在增益并列的候选中随机选择
+    """
+    spec = SPECS[branch]
+    pool = sorted({f"{int(num):02d}" for num in pool}, key=int)
+    v, k = len(pool), spec.red_size
+    if not k <= v or not 1 <= t <= k:
+        raise ValueError(f"Invalid wheel - pool={v} red_size={k} t={t}")
+    if comb(v, k) > MAX_CANDIDATES:
+        raise ValueError(f"Pool too large - candidates={comb(v, k)} limit={MAX_CANDIDATES}")
+    if len(blues) < spec.blue_size:
+        raise ValueError(f"Not enough blues - blues={list(blues)} blue_size={spec.blue_size}")
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed) if seed is not None else None
+    state = CoverState(v, k, t)
+
+    chosen: List[int] = []
+    while len(chosen) < budget and state.covered < state.total:
+        c = state.best(rng)
+        state.add(c)
+        chosen.append(c)
+
+    for _ in range(refine):
+        improved = False
+        for i, c in enumerate(chosen):
+            state.remove(c)
+            # 移出后 c 自身的增益即它独占覆盖的组合数
+            best = state.best(rng)
+            if state.gains[best] > state.gains[c]:
+                chosen[i] = c = best
+                improved = True
+            state.add(c)
+        if not improved:
+            break
+
+    blue_cycle = cycle(combinations(sorted(blues, key=int), spec.blue_size))
+    pool_masks, tickets = [], []
+    for c in chosen:
+        reds = [pool[i] for i in state.candidates[c].tolist()]
+        pool_masks.append(int(_masks(state.candidates[c])))
+        tickets.append(
+            Ticket(
+                red=to_mask(reds, spec.red_width),
+                blue=to_mask(next(blue_cycle), spec.blue_width),
+                spec=spec,
+            )
+        )
+
+    wheel = Wheel(
+        spec=spec,
+        pool=pool,
+        t=t,
+        tickets=tickets,
+        covered=state.covered,
+        total=state.total,
+        pool_masks=pool_masks,
+        elapsed=time.perf_counter() - start,
+    )
+    logging.info(
+        f"build wheel - branch={branch} pool={v} t={t} tickets={len(tickets)} "
+        f"coverage={wheel.coverage:.4f} elapsed={wheel.elapsed:.2f}s"
+    )
+    return wheel
@@ -17,10 +17,15 @@ from typing import List, Tuple
 import easygui
 import pyperclip
 
-from hysterical_ticket.component.collector import trace_history
-from hysterical_ticket.component.fns import get_fns_container
+from hysterical_ticket.component.collector import read_latest_term, trace_history
+from hysterical_ticket.component.constraints import ConstraintFilter, Constraints
+from hysterical_ticket.component.fns import FnsContainer, get_fns_container
+from hysterical_ticket.component.history import load_table, release_tables
+from hysterical_ticket.component.pipeline import refresh_all
 from hysterical_ticket.component.prompts import TEMPLATE_DLT
 from hysterical_ticket.component.prompts import TEMPLATE_SSQ
+from hysterical_ticket.component.store import Store, close_store, open_store, store_path
+from hysterical_ticket.component.verifier import Verifier
 
 
 class Toolkit:
@@ -39,29 +44,30 @@ class Toolkit:
 
     @staticmethod
     def clean(root: Path, do: bool | None = True) -> float | None:
-        """return sizeof root(MB)"""
+        """return sizeof root(MB)，由 store 记录的文件大小得出，不遍历目录"""
         total = 0
-        if root.exists():
-            for f in root.glob("**/*"):
-                total += f.stat().st_size
-            if do:
-                shutil.rmtree(root)
+        if store_path(root).exists():
+            total = open_store(root).disk_usage()
+        if do and root.exists():
+            close_store(root)
+            release_tables(root)
+            shutil.rmtree(root)
         return total / 1024**2
 
     @staticmethod
-    def get_term_format(cache: Path, ext: str) -> Tuple[int, int]:
-        latest_term = 0
-        for fn in os.listdir(cache):
-            if fn.endswith(ext):
-                latest_term = int(fn.split(ext)[0])
+    def get_term_format(store: Store, ext: str) -> Tuple[int, int]:
+        latest_term = read_latest_term(store, ext)
         return latest_term, latest_term + 1
 
     @staticmethod
-    async def gen_ignored_text(fns_sp: Path) -> str:
+    async def gen_ignored_text(fns_sp: Path, store: Store | None = None) -> str:
         template = ""
         try:
-            container = await get_fns_container(fns_sp)
-            template = f"红球不能出现如下列表中的数字：\n{container.red}\n蓝球不能出现如下列表中的数字：\n{container.blue}\n"
+            container = await get_fns_container(fns_sp, store=store)
+            if container.red:
+                template += f"红球不能出现如下列表中的数字：\n{container.red}\n"
+            if container.blue:
+                template += f"蓝球不能出现如下列表中的数字：\n{container.blue}\n"
         except KeyError as err:
             logging.error(err)
         return template
@@ -93,8 +99,18 @@ class ChatPanel:
             self.path_dlt: (TEMPLATE_DLT, ".dlt"),
         }
 
+        # 导入旧版的 {term}.{branch} 元数据与杀号文件
+        for directory in [self.history_dir, self.cache_dir]:
+            if directory.exists():
+                self.store.import_sidecars(directory)
+
+    @property
+    def store(self) -> Store:
+        # 开奖历史、期号与杀号共用 root 下的 hysteria.db，清理缓存后重新创建
+        return open_store(self.root)
+
     def menu_main(self):
-        choices = ["抓取双色球开奖记录", "抓取大乐透开奖记录", "清理缓存", "关于", "退出"]
+        choices = ["抓取双色球开奖记录", "抓取大乐透开奖记录", "结果校验", "清理缓存", "关于", "退出"]
         choices = self.kit.setup_ordered_list(choices)
         return easygui.choicebox(title=self.TITLE, choices=choices)
 
@@ -107,20 +123,21 @@ class ChatPanel:
         # 启动 playground
         webbrowser.open("https://claude.ai/chats")
 
-        # 执行抓取程序
-        await self.kit.trace_history(output, ext)
+        # 执行抓取程序，双色球、大乐透与杀号并发刷新
+        report = await refresh_all(self.history_dir, self.cache_dir, store=self.store)
+        stage = report.stages[ext.lstrip(".")]
+        if not stage.ok:
+            raise stage.error
 
         # 自动打开 Playground 和 数据目录
         os.startfile(self.history_dir)
 
         # 生成提示词模版
-        latest_term, next_term = self.kit.get_term_format(self.history_dir, ext)
+        latest_term, next_term = self.kit.get_term_format(self.store, ext)
 
         # 插入杀号模版
-        ignored_text = ""
-        if ext.endswith("ssq"):
-            fns_sp = self.cache_dir.joinpath(f"{next_term}{ext}")
-            ignored_text = await self.kit.gen_ignored_text(fns_sp)
+        fns_sp = self.cache_dir.joinpath(f"{next_term}{ext}")
+        ignored_text = await self.kit.gen_ignored_text(fns_sp, self.store)
 
         text = text.format(latest_term=latest_term, next_term=next_term, ignored_text=ignored_text)
 
@@ -133,7 +150,48 @@ class ChatPanel:
         )
 
     def menu_validate(self):
-        return
+        branches = {"双色球": self.path_ssq, "大乐透": self.path_dlt}
+        choice = easygui.buttonbox(msg="选择彩种", title=self.TITLE, choices=list(branches))
+        if not choice:
+            return
+        output = branches[choice]
+        _, ext = self.path2solution[output]
+        branch = ext.lstrip(".")
+
+        # 默认读取剪贴板中的回答
+        answer = easygui.textbox(msg="粘贴包含 🐞 答案块的回答", title=self.TITLE, text=pyperclip.paste())
+        if not answer:
+            return
+
+        # 杀号与历史开奖约束，本地没有数据时只做格式校验
+        constraint_filter = None
+        table = load_table(output)
+        if table is not None:
+            _, next_term = self.kit.get_term_format(self.store, ext)
+            fnc = FnsContainer.from_store(self.store, branch, str(next_term))
+            constraint_filter = ConstraintFilter.from_table(table, Constraints.from_fns(fnc))
+
+        verifier = Verifier.from_str(answer, branch=branch, constraint_filter=constraint_filter)
+        results = verifier.verify()
+        if not verifier.blocks:
+            return easygui.msgbox(msg="回答中没有 🐞 答案块", title=self.TITLE)
+
+        lines = [f"合格 {len(verifier.valid)} 注，不合格 {len(verifier.invalid)} 注", ""]
+        lines += [f"✘ {r.describe()}" for r in verifier.invalid]
+        lines += [f"! {r.describe()}" for r in results if r.ok and r.warnings]
+
+        # 合格的号码做一次历史回测
+        if verifier.valid and output.exists():
+            summary = verifier.checker().summarize(output)
+            lines += ["", f"历史回测 {summary.terms} 期："]
+            for record in summary.as_records(verifier.valid):
+                lines.append(
+                    f"{' '.join(record['nums'])}  奖金 {record['bonus']}  "
+                    f"最长未中奖 {record['drought']} 期  最近中奖 {record['last_hit'] or '无'}"
+                )
+
+        pyperclip.copy("\n".join(str(nums) for nums in verifier.valid))
+        easygui.textbox(msg="合格的号码已复制到剪贴板", title=self.TITLE, text="\n".join(lines))
 
     def menu_clean(self):
         sizeof = self.kit.clean(root=self.root)
@@ -27,7 +27,9 @@ setup(
         "pyperclip>=1.8.2",
         "bs4>=0.0.1",
         "beautifulsoup4>=4.12.2",
+        "numpy>=1.21.0",
     ],
+    extras_require={"lxml": ["lxml>=4.9.0"]},
     python_requires=">=3.8",
     classifiers=[
         "Topic :: Scientific/Engineering",
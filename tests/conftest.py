@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 03:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 测试共用的模拟历史与号码
+from __future__ import annotations
+
+import csv
+import os
+import shutil
+import weakref
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+import pytest
+
+from hysterical_ticket.component.engine import Summary
+from hysterical_ticket.component.history import HistoryTable
+from hysterical_ticket.component.synthetic import synthetic_rows
+
+HEADS = {
+    "ssq": ["term", "red_1", "red_2", "red_3", "red_4", "red_5", "red_6", "blue_1"],
+    "dlt": ["term", "red_1", "red_2", "red_3", "red_4", "red_5", "blue_1", "blue_2"],
+}
+FILENAMES = {"ssq": "双色球.csv", "dlt": "大乐透.csv"}
+
+
+def write_history(path: Path, branch: str, rows: Sequence[Sequence[str]]) -> Path:
+    """写出与 Collector.save_history 相同表头的历史 csv，不生成 .bin"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADS[branch])
+        writer.writerows(rows)
+    return path
+
+
+def make_tickets(branch: str, rows: Sequence[Sequence[str]], n: int = 40) -> List[List[str]]:
+    """随机号码之外混入几期开奖号码，保证高奖级也能被覆盖到"""
+    tickets = [row[1:] for row in synthetic_rows(branch, n, seed=7)]
+    return tickets + [list(row[1:]) for row in rows[::37]]
+
+
+def assert_summary_equal(a: Summary, b: Summary):
+    assert a.terms == b.terms
+    for name in [
+        "levels",
+        "bonus",
+        "drought",
+        "leading",
+        "trailing",
+        "first_hit",
+        "last_hit",
+        "best_level",
+        "best_term",
+    ]:
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+
+
+@pytest.fixture(params=["ssq", "dlt"])
+def branch(request) -> str:
+    return request.param
+
+
+@pytest.fixture
+def history_rows(branch) -> List[List[str]]:
+    return synthetic_rows(branch, 240, seed=1)
+
+
+@pytest.fixture
+def history_path(tmp_path, branch, history_rows) -> Path:
+    return write_history(tmp_path.joinpath(FILENAMES[branch]), branch, history_rows)
+
+
+@pytest.fixture
+def windows_mapping(monkeypatch):
+    """
+    模拟 Windows：仍被映射的文件不能替换或删除
+
+    :return: [(path, weakref(memmap))]，记录测试期间打开的全部映射
+    """
+    mappings = []
+    init, replace, rmtree = HistoryTable.__init__, os.replace, shutil.rmtree
+
+    def tracked_init(self, path):
+        init(self, path)
+        mappings.append((Path(path).absolute(), weakref.ref(self._mmap)))
+
+    def check(target: Path):
+        target = Path(target).absolute()
+        for path, ref in mappings:
+            if ref() is not None and (path == target or target in path.parents):
+                raise PermissionError(f"The process cannot access the mapped file - path={path}")
+
+    def strict_replace(src, dst):
+        check(dst)
+        replace(src, dst)
+
+    def strict_rmtree(path, *args, **kwargs):
+        check(path)
+        rmtree(path, *args, **kwargs)
+
+    monkeypatch.setattr(HistoryTable, "__init__", tracked_init)
+    monkeypatch.setattr(os, "replace", strict_replace)
+    monkeypatch.setattr(shutil, "rmtree", strict_rmtree)
+    return mappings
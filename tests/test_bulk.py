@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 03:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 大文件批量兑奖的合计结果与断点续跑
+from __future__ import annotations
+
+import csv
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from hysterical_ticket.component.bulk import BulkChecker
+from hysterical_ticket.component.generator import TicketGenerator
+from hysterical_ticket.component.ticket import Draw
+from hysterical_ticket.component.verifier import CHECKERS
+
+
+class Abort(Exception):
+    pass
+
+
+@pytest.fixture
+def draws(branch, history_rows):
+    return [Draw.from_row(row, branch=branch) for row in history_rows[-8:]]
+
+
+@pytest.fixture
+def tickets(tmp_path, branch, history_rows):
+    nums = TicketGenerator.uniform(branch, seed=3).nums(3000)
+    # 开奖号码本身保证有头奖
+    nums += [row[1:] for row in history_rows[-8:]]
+    path = tmp_path.joinpath("tickets.csv")
+    with open(path, "w", encoding="utf8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id"] + [f"n_{i}" for i in range(len(nums[0]))])
+        writer.writerows([f"user-{i}"] + n for i, n in enumerate(nums))
+        writer.writerow(["bad", "x"])
+    return path, nums
+
+
+def winners(path: Path):
+    return sorted(path.read_text(encoding="utf8").splitlines())
+
+
+def test_totals_match_reference(tmp_path, branch, draws, tickets):
+    source, nums = tickets
+    report = BulkChecker(draws, branch, chunk_size=700).run(source, tmp_path.joinpath("w.csv"))
+    assert report.rows == len(nums) and report.invalid == 1
+
+    checker = CHECKERS[branch](nums)
+    for draw in draws:
+        expected = Counter(r.level for _, r in checker.get_results(draw) if r.level)
+        assert report.levels[draw.term] == dict(expected)
+        assert report.bonus[draw.term] == sum(
+            max(checker.get_bonus(lv), 0) * n for lv, n in expected.items()
+        )
+    assert any(report.levels[draw.term].get(1) for draw in draws)
+
+
+def test_resume_after_abort(tmp_path, branch, draws, tickets, monkeypatch):
+    source, _ = tickets
+    expected = BulkChecker(draws, branch, chunk_size=500).run(source, tmp_path.joinpath("a.csv"))
+
+    output = tmp_path.joinpath("b.csv")
+    accumulate, calls = BulkChecker._accumulate, []
+
+    def abort_midway(self, report, chunk, writer):
+        calls.append(len(chunk.lines))
+        if len(calls) == 3:
+            # 中断前已写出一部分本块结果，续跑时应被丢弃
+            writer.writerow(["partial"])
+            raise Abort
+        return accumulate(self, report, chunk, writer)
+
+    monkeypatch.setattr(BulkChecker, "_accumulate", abort_midway)
+    with pytest.raises(Abort):
+        BulkChecker(draws, branch, chunk_size=500).run(source, output)
+    assert BulkChecker.checkpoint_path(output).exists()
+    monkeypatch.undo()
+
+    report = BulkChecker(draws, branch, chunk_size=500).run(source, output)
+    assert report.resumed
+    assert (report.rows, report.invalid, report.winners) == (
+        expected.rows,
+        expected.invalid,
+        expected.winners,
+    )
+    assert report.levels == expected.levels and report.bonus == expected.bonus
+    assert winners(output) == winners(tmp_path.joinpath("a.csv"))
+    assert not BulkChecker.checkpoint_path(output).exists()
+    assert BulkChecker.totals_path(output).exists()
+
+
+def test_changed_draws_restart_from_scratch(tmp_path, branch, draws, tickets, monkeypatch):
+    source, nums = tickets
+    output = tmp_path.joinpath("w.csv")
+
+    accumulate, calls = BulkChecker._accumulate, []
+
+    def abort(self, report, chunk, writer):
+        calls.append(len(chunk.lines))
+        if len(calls) == 2:
+            raise Abort
+        return accumulate(self, report, chunk, writer)
+
+    monkeypatch.setattr(BulkChecker, "_accumulate", abort)
+    with pytest.raises(Abort):
+        BulkChecker(draws, branch, chunk_size=500).run(source, output)
+    assert BulkChecker.checkpoint_path(output).exists()
+    monkeypatch.undo()
+
+    report = BulkChecker(draws[:-1], branch, chunk_size=500).run(source, output)
+    assert not report.resumed and report.rows == len(nums)
+    assert report.terms == [draw.term for draw in draws[:-1]]
+
+
+def test_malformed_rows_are_counted_invalid(tmp_path, branch, draws):
+    width = len(draws[0].to_row()) - 1
+    source = tmp_path.joinpath("tickets.csv")
+    good = draws[0].to_row()[1:]
+    rows = [
+        ["ok"] + good,
+        ["huge"] + ["9" * 40] + good[1:],
+        ["dup"] + [good[0]] * width,
+        ["range"] + ["99"] + good[1:],
+        ["short"] + good[:-1],
+        ["text"] + ["x"] * width,
+    ]
+    with open(source, "w", encoding="utf8", newline="") as file:
+        csv.writer(file).writerows([["id"] + [f"n_{i}" for i in range(width)]] + rows)
+
+    report = BulkChecker(draws, branch).run(source, tmp_path.joinpath("w.csv"))
+    assert (report.rows, report.invalid) == (1, len(rows) - 1)
+    assert report.levels[draws[0].term] == {1: 1}
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 03:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 回测结果缓存的增量计算对照全量计算
+from __future__ import annotations
+
+from conftest import FILENAMES, assert_summary_equal, make_tickets, write_history
+from hysterical_ticket.component.cache import ResultCache
+from hysterical_ticket.component.synthetic import synthetic_rows
+from hysterical_ticket.component.verifier import CHECKERS
+
+
+def spy_summarize(checker):
+    """记录每次实际计算的期数"""
+    calls, summarize = [], checker._summarize_draws
+
+    def wrapper(draws, top_k, workers):
+        calls.append(len(draws))
+        return summarize(draws, top_k, workers)
+
+    checker._summarize_draws = wrapper
+    return calls
+
+
+def test_incremental_matches_full(tmp_path, branch, history_rows):
+    path = write_history(tmp_path.joinpath(FILENAMES[branch]), branch, history_rows[:200])
+    cache = ResultCache(tmp_path.joinpath("cache"))
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    calls = spy_summarize(checker)
+
+    first = checker.summarize(path, top_k=3, cache=cache)
+    assert_summary_equal(first, CHECKERS[branch](checker.my_nums).summarize(path, top_k=3))
+
+    # 新开奖 40 期，只计算新增部分
+    write_history(path, branch, history_rows)
+    incremental = checker.summarize(path, top_k=3, cache=cache)
+    assert calls == [200, 40]
+    assert_summary_equal(incremental, CHECKERS[branch](checker.my_nums).summarize(path, top_k=3))
+
+    # 没有新开奖时直接命中缓存
+    assert_summary_equal(incremental, checker.summarize(path, top_k=3, cache=cache))
+    assert calls == [200, 40]
+
+
+def test_rewritten_history_invalidates_cache(tmp_path, branch, history_rows):
+    path = write_history(tmp_path.joinpath(FILENAMES[branch]), branch, history_rows)
+    cache = ResultCache(tmp_path.joinpath("cache"))
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    checker.summarize(path, cache=cache)
+
+    # 期号不变，号码被改写
+    other = synthetic_rows(branch, len(history_rows), seed=2)
+    write_history(path, branch, other)
+    calls = spy_summarize(checker)
+    summary = checker.summarize(path, cache=cache)
+    assert calls == [len(other)]
+    assert_summary_equal(summary, CHECKERS[branch](checker.my_nums).summarize(path))
+
+
+def test_cache_is_keyed_on_history(tmp_path, branch, history_rows):
+    a = write_history(tmp_path.joinpath("a", FILENAMES[branch]), branch, history_rows)
+    b = write_history(
+        tmp_path.joinpath("b", FILENAMES[branch]), branch, synthetic_rows(branch, 250, seed=3)
+    )
+    cache = ResultCache(tmp_path.joinpath("cache"))
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    checker.summarize(a, cache=cache)
+    assert_summary_equal(
+        checker.summarize(b, cache=cache), CHECKERS[branch](checker.my_nums).summarize(b)
+    )
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 03:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 开奖历史的增量抓取与条件请求
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from pathlib import Path
+
+import httpx
+import pytest
+
+from conftest import FILENAMES
+from hysterical_ticket.component.checker import read_history
+from hysterical_ticket.component.collector import Collector
+from hysterical_ticket.component.session import Session
+from hysterical_ticket.component.store import open_store
+from hysterical_ticket.component.synthetic import SyntheticTransport
+
+
+class RecordingTransport(SyntheticTransport):
+    """记录全部请求"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return super().handle(request)
+
+    def history_requests(self):
+        return [r for r in self.requests if r.url.path.endswith("history.php")]
+
+
+class ETagTransport(RecordingTransport):
+    """历史首页带 ETag，If-None-Match 命中时返回 304；history_down 时增量页面返回 503"""
+
+    history_down = False
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.history_down and request.url.path.endswith("history.php"):
+            self.requests.append(request)
+            return httpx.Response(503)
+        resp = super().handle(request)
+        if request.url.path.endswith("history.shtml") and resp.status_code == 200:
+            etag = f'"{hashlib.md5(resp.content).hexdigest()}"'
+            if request.headers.get("if-none-match") == etag:
+                return httpx.Response(304)
+            resp.headers["ETag"] = etag
+        return resp
+
+
+def collect(session: Session, branch: str, output: Path) -> Collector:
+    async def run():
+        collector = Collector.from_branch(
+            branch,
+            _client=session.bind(f"https://datachart.500.com/{branch}"),
+            _store=open_store(output.parent),
+        )
+        await collector.get_history(output)
+        collector.save_history(output)
+        return collector
+
+    return asyncio.run(run())
+
+
+def sorted_rows(rows):
+    return sorted(rows, key=lambda row: int(row[0]))
+
+
+def test_delta_fetch(tmp_path, branch, history_rows, windows_mapping):
+    output = tmp_path.joinpath(FILENAMES[branch])
+    transport = RecordingTransport({branch: history_rows[:-5]})
+    session = Session(transport=transport, backoff=0, host_rate=0)
+
+    # 本地没有历史，从第 1 期全量抓取
+    collect(session, branch, output)
+    (full,) = transport.history_requests()
+    assert full.url.params["start"] == "1"
+    assert sorted_rows(read_history(output)) == history_rows[:-5]
+
+    # 校验本地历史后不再持有 .bin 的映射，随后才能替换
+    assert Collector.from_branch(branch).load_history(output) == read_history(output)
+    assert all(ref() is None for _, ref in windows_mapping)
+
+    # 新开奖 5 期，只抓取本地最新一期之后的增量
+    transport.histories = {branch: history_rows}
+    transport.requests.clear()
+    collector = collect(session, branch, output)
+    (delta,) = transport.history_requests()
+    assert delta.url.params["start"] == history_rows[-5][0]
+    assert delta.url.params["end"] == history_rows[-1][0]
+    assert sorted_rows(read_history(output)) == history_rows
+    assert open_store(tmp_path).latest_term(branch) == history_rows[-1][0]
+    assert max(int(draw.term) for draw in collector.draws) == int(history_rows[-1][0])
+
+
+def test_inconsistent_local_history_refetches_all(tmp_path, branch, history_rows):
+    output = tmp_path.joinpath(FILENAMES[branch])
+    transport = RecordingTransport({branch: history_rows})
+    session = Session(transport=transport, backoff=0, host_rate=0)
+    collect(session, branch, output)
+
+    # 丢失最新 3 期的 csv 与 store 中的最新期号不一致（开奖网站按期号倒序）
+    lines = output.read_text(encoding="utf8").splitlines()
+    output.write_text("\n".join(lines[:1] + lines[4:]) + "\n", encoding="utf8")
+    transport.requests.clear()
+    collect(session, branch, output)
+    (full,) = transport.history_requests()
+    assert full.url.params["start"] == "1"
+    assert sorted_rows(read_history(output)) == history_rows
+
+
+def test_not_modified_skips_fetch(tmp_path, branch, history_rows):
+    output = tmp_path.joinpath(FILENAMES[branch])
+    transport = ETagTransport({branch: history_rows})
+    session = Session(transport=transport, backoff=0, host_rate=0)
+    collect(session, branch, output)
+
+    # 页面未变化时返回 304，不再抓取历史
+    transport.requests.clear()
+    collect(session, branch, output)
+    assert transport.requests[0].headers.get("if-none-match")
+    assert not transport.history_requests()
+    assert sorted_rows(read_history(output)) == history_rows
+
+
+def test_failed_fetch_does_not_commit_validator(tmp_path, branch, history_rows):
+    output = tmp_path.joinpath(FILENAMES[branch])
+    validators_path = tmp_path.joinpath(".validators.json")
+    transport = ETagTransport({branch: history_rows[:-3]})
+    session = Session(
+        validators_path=validators_path, transport=transport, backoff=0, retries=0, host_rate=0
+    )
+    collect(session, branch, output)
+
+    # 有新开奖，但增量页面抓取失败：新页面的 ETag 不能生效
+    transport.histories = {branch: history_rows}
+    transport.history_down = True
+    with pytest.raises(httpx.HTTPStatusError):
+        collect(session, branch, output)
+    asyncio.run(session.aclose())
+    assert sorted_rows(read_history(output)) == history_rows[:-3]
+
+    # 下次运行（新的进程）不会收到 304，补上漏掉的开奖
+    transport.history_down = False
+    transport.requests.clear()
+    session = Session(validators_path=validators_path, transport=transport, backoff=0, host_rate=0)
+    collect(session, branch, output)
+    (delta,) = transport.history_requests()
+    assert delta.url.params["start"] == history_rows[-3][0]
+    assert sorted_rows(read_history(output)) == history_rows
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 08:20
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 带约束选号的规则校验与拒绝采样
+from __future__ import annotations
+
+import pytest
+
+from hysterical_ticket.component.constraints import ConstraintFilter, Constraints
+from hysterical_ticket.component.fns import FnsContainer
+from hysterical_ticket.component.generator import TicketGenerator
+from hysterical_ticket.component.history import HistoryTable, open_table
+from hysterical_ticket.component.synthetic import synthetic_rows
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path.joinpath("ssq.bin")
+    HistoryTable.write(path, "ssq", synthetic_rows("ssq", 400, seed=3))
+    return open_table(path)
+
+
+def test_sampled_tickets_satisfy_every_rule(table):
+    constraints = Constraints(
+        exclude_red=["01", "02", "03"],
+        exclude_blue=["16"],
+        red_sum=(90, 120),
+        red_odd=(2, 4),
+        red_span=(20, 30),
+        unique_red=True,
+    )
+    cf = ConstraintFilter.from_table(table, constraints)
+    reds, blues, stats = cf.sample(TicketGenerator.from_history(table, seed=1), 2000)
+    assert len(reds) == 2000 and stats.accepted >= 2000 and 0 < stats.rate < 1
+    historical = {tuple(row[1:7]) for row in table.rows()}
+    for red, blue in zip(reds.tolist(), blues.tolist()):
+        assert not {1, 2, 3} & set(red) and blue != [16]
+        assert 90 <= sum(red) <= 120
+        assert 2 <= sum(n % 2 for n in red) <= 4
+        assert 20 <= red[-1] - red[0] <= 30
+        assert tuple(f"{n:02d}" for n in red) not in historical
+    # 杀号在生成器中已经排除，不计入拒绝
+    assert stats.rejected.get("exclude_red", 0) == stats.rejected.get("exclude_blue", 0) == 0
+
+
+def test_violations_of_single_ticket(table):
+    row = table.rows()[10]
+    cf = ConstraintFilter.from_table(table, Constraints(exclude_red=[row[1]], red_sum=(0, 10)))
+    assert cf.violations(row[1:]) == ["exclude_red", "red_sum", "historical"]
+    assert ConstraintFilter.from_table(table).violations(row[1:]) == ["historical"]
+    unchecked = ConstraintFilter(table.spec, Constraints())
+    assert unchecked.violations(row[1:]) == []
+
+
+def test_too_tight_constraints_return_fewer(table):
+    cf = ConstraintFilter.from_table(table, Constraints(red_sum=(21, 21)))
+    reds, blues, stats = cf.sample(TicketGenerator.uniform(seed=2), 10, max_generated=5000)
+    # 只有 01-06 的和为 21
+    assert len(reds) <= 10 and stats.generated <= 5000
+    assert all(red == [1, 2, 3, 4, 5, 6] for red in reds.tolist())
+
+
+def test_stats_accumulate_across_samples(table):
+    cf = ConstraintFilter.from_table(table, Constraints(red_odd=(3, 3)))
+    generator = TicketGenerator.uniform(seed=3)
+    _, _, first = cf.sample(generator, 100)
+    _, _, second = cf.sample(generator, 100)
+    assert first.accepted >= 100 and second.accepted >= 100
+    assert cf.stats.accepted == first.accepted + second.accepted
+    assert cf.stats.generated == first.generated + second.generated
+
+
+def test_from_fns():
+    fnc = FnsContainer(red=["01", "02"], blue=["03"])
+    constraints = Constraints.from_fns(fnc, red_sum=(60, 140))
+    assert constraints.exclude_red == ["01", "02"] and constraints.exclude_blue == ["03"]
+    assert constraints.red_sum == (60, 140)
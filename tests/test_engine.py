@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 03:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 批量引擎、复式闭式解与分段合并对照逐注参照实现
+from __future__ import annotations
+
+from collections import Counter
+
+import pytest
+
+from conftest import assert_summary_equal, make_tickets
+from hysterical_ticket.component.checker import read_draws, sort_draws
+from hysterical_ticket.component.compound import CompoundTicket
+from hysterical_ticket.component.engine import Summary
+from hysterical_ticket.component.ticket import Draw
+from hysterical_ticket.component.verifier import CHECKERS
+
+
+def test_numpy_engine_matches_reference(branch, history_path, history_rows):
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    reference = list(checker.trace_results(history_path))
+    assert reference == list(checker.trace_results(history_path, engine="numpy"))
+    # 混入的开奖号码保证有头奖
+    assert any(result.level == 1 for _, result in reference)
+
+    matrix = checker.trace_matrix(history_path)
+    assert [r.level for _, r in reference] == matrix.level.ravel().tolist()
+    assert [r.bonus for _, r in reference] == matrix.bonus.ravel().tolist()
+
+
+def test_parallel_trace_matches_reference(branch, history_path, history_rows):
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    reference = list(checker.trace_results(history_path))
+    assert reference == list(checker.trace_results(history_path, workers=2))
+
+
+COMPOUNDS = {
+    "ssq": [
+        dict(reds=["01", "05", "09", "13", "17", "21", "25", "29"], blues=["03", "07", "11"]),
+        dict(
+            reds=["02", "06", "10", "14", "18", "22", "26"],
+            blues=["01", "16"],
+            red_bankers=["30", "33"],
+        ),
+    ],
+    "dlt": [
+        dict(reds=["01", "06", "11", "16", "21", "26", "31"], blues=["02", "05", "09"]),
+        dict(
+            reds=["03", "08", "13", "18", "23", "28"],
+            blues=["01", "04", "12"],
+            red_bankers=["35"],
+            blue_bankers=["07"],
+        ),
+    ],
+}
+
+
+@pytest.mark.parametrize("index", [0, 1])
+def test_compound_closed_form_matches_expansion(branch, history_rows, index):
+    ticket = CompoundTicket.from_nums(**COMPOUNDS[branch][index], branch=branch)
+    checker = CHECKERS[branch]
+    expanded = ticket.expand()
+    assert len(expanded) == ticket.bets
+
+    for row in history_rows:
+        draw = Draw.from_row(row, branch=branch)
+        expected = Counter(checker.judge(*single.compare(draw)) for single in expanded)
+        counts = ticket.evaluate(draw, checker.level_table)
+        assert {lv: n for lv, n in enumerate(counts) if n} == dict(expected)
+
+        _, result = next(checker([ticket]).get_results(draw))
+        bonus = sum(max(checker.get_bonus(lv), 0) * n for lv, n in expected.items() if lv)
+        assert result.bonus == bonus
+        assert result.level == min((lv for lv in expected if lv), default=0)
+
+
+@pytest.mark.parametrize("top_k", [0, 3])
+@pytest.mark.parametrize("bounds", [[1], [60, 61, 200], [10, 120, 239]])
+def test_summary_merge_across_shards(branch, history_path, history_rows, top_k, bounds):
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    draws = sort_draws(read_draws(history_path, branch=branch))
+    whole = checker._summarize_draws(draws, top_k=top_k, workers=1)
+
+    merged = Summary.empty(len(checker.tickets), len(checker.bonus_table), top_k)
+    for start, stop in zip([0] + bounds, bounds + [len(draws)]):
+        merged.merge(checker._summarize_draws(draws[start:stop], top_k=top_k, workers=1))
+    assert_summary_equal(whole, merged)
+
+
+def test_parallel_summarize_matches_single_process(branch, history_path, history_rows):
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    single = checker.summarize(history_path, top_k=2)
+    assert_summary_equal(single, checker.summarize(history_path, top_k=2, workers=3))
+
+
+def test_summary_counts_match_reference(branch, history_path, history_rows):
+    tickets = make_tickets(branch, history_rows)
+    checker = CHECKERS[branch](tickets)
+    summary = checker.summarize(history_path)
+
+    levels = [Counter() for _ in tickets]
+    for i, (_, result) in enumerate(checker.trace_results(history_path)):
+        levels[i % len(tickets)][result.level] += 1
+    for i, counter in enumerate(levels):
+        assert {lv: int(n) for lv, n in enumerate(summary.levels[i]) if n} == dict(counter)
+
+
+def test_mixed_single_and_compound_trace(branch, history_path, history_rows):
+    compounds = [CompoundTicket.from_nums(**kw, branch=branch) for kw in COMPOUNDS[branch]]
+    singles = make_tickets(branch, history_rows, n=5)
+    checker = CHECKERS[branch](singles[:2] + compounds[:1] + singles[2:] + compounds[1:])
+    reference = list(checker.trace_results(history_path))
+    assert reference == list(checker.trace_results(history_path, engine="numpy"))
+    assert len(reference) == len(checker.tickets) * len(history_rows)
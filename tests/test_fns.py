@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 05:30
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 杀号页面解析、多来源投票与未配置来源的彩种
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import httpx
+import pytest
+
+from hysterical_ticket.component.fns import (
+    SOURCES,
+    FilterNums,
+    FnsContainer,
+    FnsParseError,
+    FnsSource,
+    align_term,
+    merge_votes,
+    parse_360,
+)
+from hysterical_ticket.component.session import Session
+from hysterical_ticket.component.store import open_store
+from hysterical_ticket.component.synthetic import SyntheticTransport, fns_page, synthetic_rows
+
+
+def source(name: str, color: str = "red", weight: float = 1.0) -> FnsSource:
+    return FnsSource(name=name, url=f"https://example.com/{name}", color=color, weight=weight)
+
+
+def test_parse_360_reads_term_row():
+    assert parse_360(fns_page("2023081", ["05", "01", "33"])) == ("2023081", ["05", "01", "33"])
+    with pytest.raises(FnsParseError):
+        parse_360("<html><body><table><tbody></tbody></table></body></html>")
+
+
+def test_align_term():
+    assert align_term("23081", "2023080") == "2023081"
+    assert align_term("2023081", "2023080") == "2023081"
+    assert align_term("", "2023080") == ""
+
+
+def test_merge_votes_weighted_quorum():
+    sources = [source("a"), source("b"), source("c", weight=2), source("d", color="blue")]
+    results = {
+        "a": ("101", ["01", "02"]),
+        "b": ("101", ["02", "03"]),
+        "c": ("101", ["03"]),
+        "d": ("101", ["07"]),
+    }
+    fnc = merge_votes(results, sources, quorum=0.5)
+    # 红球总权重 4：02 得 2 票、03 得 3 票，01 只有 1 票
+    assert fnc.red == ["02", "03"] and fnc.blue == ["07"]
+    assert fnc.term == "101" and not fnc.missing
+
+
+def test_merge_votes_marks_failed_and_stale_sources_missing():
+    sources = [source("a"), source("b"), source("c")]
+    results = {"a": ("102", ["01"]), "b": ("101", ["02"]), "c": TimeoutError("deadline")}
+    fnc = merge_votes(results, sources)
+    assert fnc.term == "102" and fnc.red == ["01"]
+    assert sorted(fnc.missing) == ["b", "c"]
+    assert not fnc.is_ready()
+
+
+def test_ssq_fetch_and_save(tmp_path):
+    rows = synthetic_rows("ssq", 30)
+    next_term = str(int(rows[-1][0]) + 1)
+    transport = SyntheticTransport({"ssq": rows}, fns={"red": ["09", "01"], "blue": ["04"]})
+
+    async def run():
+        async with Session(transport=transport, backoff=0, host_rate=0) as session:
+            fns = FilterNums(
+                next_term=next_term,
+                cache_dir=tmp_path,
+                branch_ext="ssq",
+                fnc=FnsContainer(),
+                _client=session,
+            )
+            await fns.fetch()
+            return fns
+
+    fns = asyncio.run(run())
+    assert fns.fnc.red == ["01", "09"] and fns.fnc.blue == ["04"] and fns.fnc.is_ready()
+    assert fns.save()
+    assert open_store(tmp_path).get_fns("ssq", next_term)["red"] == ["01", "09"]
+
+
+def test_dlt_has_no_source_and_says_so(tmp_path, caplog):
+    assert SOURCES["dlt"] == []
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(404)
+
+    async def run():
+        transport = httpx.MockTransport(handler)
+        async with Session(transport=transport, backoff=0, host_rate=0) as session:
+            fns = FilterNums(
+                next_term="23100",
+                cache_dir=tmp_path,
+                branch_ext="dlt",
+                fnc=FnsContainer(),
+                _client=session,
+            )
+            return fns, await fns.fetch()
+
+    with caplog.at_level(logging.WARNING):
+        fns, container = asyncio.run(run())
+    assert not requests and not container.red and not container.blue
+    assert "No fns source configured" in caplog.text
+    assert not fns.save()
+    assert open_store(tmp_path).get_fns("dlt", "23100") is None
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 04:30
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 杀号准确率回测与来源权重
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from hysterical_ticket.component.fns import SOURCES, FilterNums, FnsContainer
+from hysterical_ticket.component.fns_backtest import (
+    MIN_WEIGHT,
+    VOTE,
+    SourceAccuracy,
+    backtest_fns,
+    significance,
+    suggest_weights,
+    tune_weights,
+)
+from hysterical_ticket.component.history import HistoryTable, open_table
+from hysterical_ticket.component.store import close_store, open_store
+from hysterical_ticket.component.synthetic import synthetic_rows
+
+RED, BLUE = SOURCES["ssq"][0].name, SOURCES["ssq"][1].name
+
+
+def accuracy(terms: int, killed_per_term: int, false_kills: int, baseline: float, source=RED):
+    return SourceAccuracy(
+        source=source,
+        color="red",
+        terms=terms,
+        killed=terms * killed_per_term,
+        false_kills=false_kills,
+        baseline=baseline,
+    )
+
+
+def record_predictions(store, rows, red_kill, seed=0):
+    """每期写入一条杀号记录，red_kill(row, rng) 给出红球来源的杀号"""
+    rng = np.random.default_rng(seed)
+    for row in rows:
+        blue = [f"{n:02d}" for n in range(1, 17) if f"{n:02d}" != row[7]][:2]
+        sources = {RED: red_kill(row, rng), BLUE: blue}
+        store.put_fns("ssq", row[0], {"term": row[0], "red": [], "blue": [], "sources": sources})
+
+
+def random_kill(row, rng):
+    return [f"{n:02d}" for n in sorted(rng.choice(33, size=3, replace=False) + 1)]
+
+
+def test_significance_against_random_baseline():
+    baseline = 1 - 6 / 33
+    # 与随机杀号的期望完全一致
+    assert significance(accuracy(330, 3, int(990 * 6 / 33), baseline)) == pytest.approx(0, abs=0.1)
+    assert significance(accuracy(330, 3, 0, baseline)) > 10
+    assert significance(accuracy(330, 3, 600, baseline)) < -10
+    assert significance(accuracy(0, 3, 0, baseline)) == 0
+
+
+def test_noise_and_small_samples_keep_full_weight():
+    baseline = 1 - 6 / 33
+    results = [
+        # 样本不足
+        accuracy(20, 3, 30, baseline, source="few"),
+        # 略差于随机，但不显著
+        accuracy(300, 3, 175, baseline, source="noise"),
+        accuracy(300, 3, 20, baseline, source=VOTE),
+    ]
+    assert suggest_weights(results) == {"few": 1.0, "noise": 1.0}
+
+
+def test_significant_results_adjust_weight_with_floor():
+    baseline = 1 - 6 / 33
+    weights = suggest_weights(
+        [
+            accuracy(300, 3, 900, baseline, source="bad"),
+            accuracy(300, 3, 20, baseline, source="good"),
+        ]
+    )
+    assert weights["bad"] == MIN_WEIGHT
+    assert weights["good"] > 1
+
+
+def test_random_source_is_never_dropped(tmp_path):
+    rows = synthetic_rows("ssq", 300, seed=4)
+    store = open_store(tmp_path)
+    record_predictions(store, rows, random_kill)
+    HistoryTable.write(tmp_path.joinpath("ssq.bin"), "ssq", rows)
+
+    weights = tune_weights(store, open_table(tmp_path.joinpath("ssq.bin")))
+    assert weights[RED] == 1.0
+    assert store.weights("ssq") == weights
+
+
+def test_bad_source_is_floored_and_still_fetched(tmp_path):
+    rows = synthetic_rows("ssq", 300, seed=5)
+    store = open_store(tmp_path)
+    # 红球来源总是杀掉开出的号码
+    record_predictions(store, rows, lambda row, rng: row[1:4])
+    table_path = tmp_path.joinpath("ssq.bin")
+    HistoryTable.write(table_path, "ssq", rows)
+
+    results = {r.source: r for r in backtest_fns(store, open_table(table_path))}
+    assert results[RED].accuracy == 0 and results[RED].lift < 0
+    weights = tune_weights(store, open_table(table_path))
+    assert weights[RED] == MIN_WEIGHT
+
+    # 重新打开数据库后，FilterNums 仍然抓取该来源，只是权重降低
+    close_store(tmp_path)
+    fns = FilterNums(next_term="1", cache_dir=tmp_path, branch_ext="ssq", fnc=FnsContainer())
+    assert {s.name: s.weight for s in fns.sources} == {RED: MIN_WEIGHT, BLUE: weights[BLUE]}
+
+    # 表现回升后权重随之恢复
+    store = fns.store
+    record_predictions(store, rows, random_kill, seed=1)
+    assert tune_weights(store, open_table(table_path))[RED] == 1.0
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 06:20
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 加权选号的分布与号码合法性
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from hysterical_ticket.component.generator import (
+    AliasTable,
+    TicketGenerator,
+    ball_weights,
+    weighted_top_k,
+)
+from hysterical_ticket.component.history import HistoryTable, open_table
+from hysterical_ticket.component.synthetic import synthetic_rows
+from hysterical_ticket.component.ticket import SPECS
+
+N = 200_000
+
+
+def assert_frequencies(counts: np.ndarray, expected: np.ndarray, n: int):
+    """各号码的出现次数与期望之差不超过 5 倍标准差"""
+    sigma = np.sqrt(n * expected * (1 - expected))
+    assert np.all(np.abs(counts - n * expected) < 5 * sigma + 1), counts / n - expected
+
+
+def test_rows_are_valid(branch):
+    spec = SPECS[branch]
+    reds, blues = TicketGenerator.uniform(branch, seed=1).sample(5000)
+    assert reds.shape == (5000, spec.red_size) and blues.shape == (5000, spec.blue_size)
+    for nums, width in [(reds, spec.red_width), (blues, spec.blue_width)]:
+        assert nums.min() >= 1 and nums.max() <= width
+        assert np.all(np.diff(nums.astype(int), axis=1) > 0)
+
+
+def test_uniform_marginals(branch):
+    spec = SPECS[branch]
+    reds, blues = TicketGenerator.uniform(branch, seed=2).sample(N)
+    for nums, width, size in [
+        (reds, spec.red_width, spec.red_size),
+        (blues, spec.blue_width, spec.blue_size),
+    ]:
+        counts = np.bincount(nums.ravel(), minlength=width + 1)[1:]
+        assert_frequencies(counts, np.full(width, size / width), N)
+
+
+def test_alias_table_follows_weights():
+    weights = np.array([0.5, 0.25, 0.125, 0.0625, 0.0625, 0])
+    idx = AliasTable(weights).sample(np.random.default_rng(3), N)
+    assert_frequencies(np.bincount(idx, minlength=len(weights)), weights, N)
+    assert not np.any(idx == 5)
+
+
+def test_weighted_top_k_first_pick_follows_weights():
+    weights = np.array([4, 3, 2, 1, 0], dtype=np.float64) / 10
+    with np.errstate(divide="ignore"):
+        log_weights = np.log(weights).astype(np.float32)
+    idx = weighted_top_k(np.random.default_rng(4), log_weights, N, 1).ravel()
+    assert_frequencies(np.bincount(idx, minlength=len(weights)), weights, N)
+
+    rows = weighted_top_k(np.random.default_rng(5), log_weights, 1000, 3)
+    assert all(len(set(row)) == 3 and 4 not in row for row in rows.tolist())
+
+
+def test_ball_weights_decay_and_window():
+    columns = np.array([[1], [2], [3]])
+    terms = np.array([1, 2, 3])
+    assert ball_weights(columns, terms, 3, smoothing=0) == pytest.approx([1 / 3] * 3)
+    assert ball_weights(columns, terms, 3, window=1, smoothing=0) == pytest.approx([0, 0, 1])
+    decayed = ball_weights(columns, terms, 3, decay=0.5, smoothing=0)
+    assert decayed == pytest.approx(np.array([0.25, 0.5, 1]) / 1.75)
+    assert ball_weights(columns, terms, 4).sum() == pytest.approx(1)
+
+
+def test_from_history_and_restrict(tmp_path):
+    path = tmp_path.joinpath("ssq.bin")
+    HistoryTable.write(path, "ssq", synthetic_rows("ssq", 300, seed=6))
+    gen = TicketGenerator.from_history(open_table(path), decay=0.99, seed=7)
+    assert gen.red_weights.sum() == pytest.approx(1) and np.all(gen.red_weights > 0)
+
+    reds, blues = gen.restrict(red=["01", "02"], blue=["16"]).sample(5000)
+    assert not np.isin(reds, [1, 2]).any() and not np.any(blues == 16)
+    with pytest.raises(ValueError):
+        gen.restrict(red=[f"{n:02d}" for n in range(1, 30)])
+
+
+def test_seed_is_reproducible(branch):
+    a = TicketGenerator.uniform(branch, seed=8).nums(100)
+    assert a == TicketGenerator.uniform(branch, seed=8).nums(100)
+    assert a != TicketGenerator.uniform(branch, seed=9).nums(100)
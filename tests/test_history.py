@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 04:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 二进制列式开奖历史的读写与映射释放
+from __future__ import annotations
+
+import os
+import shutil
+
+import pytest
+
+from hysterical_ticket.component.history import (
+    HistoryTable,
+    load_table,
+    open_table,
+    release_tables,
+    table_path,
+)
+from hysterical_ticket.component.synthetic import synthetic_rows
+
+
+def test_round_trip(tmp_path, branch, history_rows):
+    path = tmp_path.joinpath("history.bin")
+    HistoryTable.write(path, branch, history_rows)
+    table = open_table(path)
+    assert table.branch == branch and len(table) == len(history_rows)
+    assert table.rows() == history_rows
+    assert [d.term for d in table.draws()] == [row[0] for row in history_rows]
+
+
+def test_rewrite_releases_mapping(tmp_path, windows_mapping):
+    path = tmp_path.joinpath("history.bin")
+    rows = synthetic_rows("ssq", 300)
+    HistoryTable.write(path, "ssq", rows[:200])
+
+    table = open_table(path)
+    assert len(table) == 200
+
+    HistoryTable.write(path, "ssq", rows)
+    assert table.columns == {}
+    reloaded = open_table(path)
+    assert reloaded is not table and reloaded.rows() == rows
+
+
+def test_release_tables_before_removing_directory(tmp_path, windows_mapping):
+    root = tmp_path.joinpath("cache")
+    root.mkdir()
+    csv_path = root.joinpath("双色球.csv")
+    csv_path.write_text("term\n", encoding="utf8")
+    HistoryTable.write(table_path(csv_path), "ssq", synthetic_rows("ssq", 50))
+    assert load_table(csv_path) is not None
+
+    with pytest.raises(PermissionError):
+        shutil.rmtree(root)
+    release_tables(root)
+    shutil.rmtree(root)
+    assert not root.exists()
+
+
+def test_stale_table_is_ignored(tmp_path):
+    csv_path = tmp_path.joinpath("双色球.csv")
+    HistoryTable.write(table_path(csv_path), "ssq", synthetic_rows("ssq", 20))
+    assert load_table(csv_path) is not None
+
+    # csv 比 .bin 新时 .bin 已过期
+    csv_path.write_text("term\n", encoding="utf8")
+    stat = table_path(csv_path).stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_table(csv_path) is None
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 08:40
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 历史开奖索引的精确查找与近邻查找对照暴力实现
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from hysterical_ticket.component.generator import TicketGenerator, to_masks
+from hysterical_ticket.component.history import HistoryTable, open_table
+from hysterical_ticket.component.index import HistoryIndex, MaskSet
+from hysterical_ticket.component.store import open_store
+from hysterical_ticket.component.ticket import Ticket
+
+
+@pytest.fixture
+def index(tmp_path, branch, history_rows):
+    path = tmp_path.joinpath("history.bin")
+    HistoryTable.write(path, branch, history_rows)
+    return HistoryIndex.from_table(open_table(path))
+
+
+def test_mask_set_matches_dict():
+    rng = np.random.default_rng(0)
+    keys = rng.integers(0, 1 << 40, size=5000, dtype=np.uint64)
+    keys = np.concatenate([keys, keys[:100]])
+    expected = {}
+    for i, key in enumerate(keys.tolist()):
+        expected.setdefault(key, i)
+    table = MaskSet(keys)
+    assert len(table) == len(expected)
+
+    queries = np.concatenate([keys[:2000], rng.integers(0, 1 << 40, size=2000, dtype=np.uint64)])
+    found = table.find(queries)
+    assert found.tolist() == [expected.get(key, -1) for key in queries.tolist()]
+    assert int(keys[0]) in table
+
+
+def test_find_exact_draw(index, branch, history_rows):
+    for row in history_rows[::17]:
+        assert index.find(row[1:]) == row[0]
+    reds, blues = TicketGenerator.uniform(branch, seed=1).sample(2000)
+    drawn = {tuple(row[1:]) for row in history_rows}
+    nums = [[f"{n:02d}" for n in r + b] for r, b in zip(reds.tolist(), blues.tolist())]
+    expected = [tuple(n) in drawn for n in nums]
+    assert index.contains(to_masks(reds), to_masks(blues)).tolist() == expected
+
+
+def test_nearest_matches_brute_force(index, branch, history_rows):
+    reds, blues = TicketGenerator.uniform(branch, seed=2).sample(50)
+    neighbors = index.nearest(to_masks(reds), to_masks(blues), k=3)
+    size = index.spec.red_size
+    for i, (red, blue) in enumerate(zip(reds.tolist(), blues.tolist())):
+        scored = []
+        for row in history_rows:
+            r = len(set(red) & {int(n) for n in row[1 : 1 + size]})
+            b = len(set(blue) & {int(n) for n in row[1 + size :]})
+            scored.append((r * (index.spec.blue_size + 1) + b, int(row[0]), r, b))
+        top = sorted(scored, reverse=True)[:3]
+        assert [int(t) for t in neighbors.terms[i]] == [t for _, t, _, _ in top]
+        assert neighbors.red_hits[i].tolist() == [r for _, _, r, _ in top]
+        assert neighbors.blue_hits[i].tolist() == [b for _, _, _, b in top]
+
+
+def test_similar_puts_exact_draw_first(index, history_rows):
+    row = history_rows[100]
+    ticket = Ticket.from_nums(row[1:], branch=index.spec.branch)
+    term, red, blue = index.similar(ticket, k=2)[0]
+    assert term == row[0]
+    assert (red, blue) == (index.spec.red_size, index.spec.blue_size)
+
+
+def test_from_store_matches_from_table(tmp_path, branch, history_rows, index):
+    open_store(tmp_path).put_history(branch, history_rows, history_rows[-1][0])
+    other = HistoryIndex.from_store(open_store(tmp_path), branch)
+    assert other.terms.tolist() == index.terms.tolist()
+    assert np.array_equal(other.red_mask, index.red_mask)
+    assert (
+        len(HistoryIndex.from_store(open_store(tmp_path), "dlt" if branch == "ssq" else "ssq")) == 0
+    )
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 06:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 多进程分片回测的进程池复用与单进程回退
+from __future__ import annotations
+
+from conftest import assert_summary_equal, make_tickets
+from hysterical_ticket.component import parallel
+from hysterical_ticket.component.checker import read_draws
+from hysterical_ticket.component.parallel import SharedGrid, effective_workers, get_pool
+from hysterical_ticket.component.verifier import CHECKERS
+
+
+def test_effective_workers(monkeypatch):
+    monkeypatch.setattr(parallel.os, "cpu_count", lambda: 4)
+    grid = parallel.MIN_PARALLEL_GRID
+    assert effective_workers(8, grid, 1) == 4
+    assert effective_workers(2, grid, 1) == 2
+    assert effective_workers(1, grid, 1) == 1
+    assert effective_workers(4, 100, 100) == 1
+    monkeypatch.setattr(parallel.os, "cpu_count", lambda: None)
+    assert effective_workers(4, grid, 1) == 1
+
+
+def test_small_grid_stays_in_process(monkeypatch, branch, history_rows, history_path):
+    def forbidden(*args, **kwargs):
+        raise AssertionError("small grid must not start a process pool")
+
+    monkeypatch.setattr(parallel, "get_pool", forbidden)
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    single = checker.summarize(history_path, top_k=2)
+    assert_summary_equal(single, checker.summarize(history_path, top_k=2, workers=64))
+    assert list(checker.trace_results(history_path, engine="numpy")) == list(
+        checker.trace_results(history_path, workers=64)
+    )
+
+
+def test_pool_is_reused_across_calls(branch, history_rows, history_path):
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    draws = read_draws(history_path, branch=branch)
+    single = checker._summarize_draws(draws, top_k=3, workers=1)
+
+    with SharedGrid(checker.engine, draws, workers=2) as grid:
+        first = grid.summarize(top_k=3)
+        pool = grid._pool
+    assert pool is get_pool(2)
+    # 同一进程池上的第二次调用挂载新的共享内存
+    with SharedGrid(checker.engine, draws[-100:], workers=2) as grid:
+        second = grid.summarize(top_k=3)
+        assert grid._pool is pool
+    with SharedGrid(checker.engine, draws, workers=2) as grid:
+        rows = list(grid.iter_grid())
+
+    assert_summary_equal(single, first)
+    assert_summary_equal(checker._summarize_draws(draws[-100:], top_k=3, workers=1), second)
+    expected = list(checker.engine.iter_grid(draws))
+    assert [offset for offset, *_ in rows] == [offset for offset, *_ in expected]
+    for (_, *a), (_, *b) in zip(rows, expected):
+        assert all((x == y).all() for x, y in zip(a, b))
+
+
+def test_stop_iteration_early(monkeypatch, branch, history_rows, history_path):
+    checker = CHECKERS[branch](make_tickets(branch, history_rows))
+    draws = read_draws(history_path, branch=branch)
+    with SharedGrid(checker.engine, draws, workers=2) as grid:
+        monkeypatch.setattr(grid.engine, "chunk_size", lambda: 10)
+        first = next(grid.iter_grid())
+    assert first[0] == 0
+    # 进程池在提前结束后仍然可用
+    with SharedGrid(checker.engine, draws, workers=2) as grid:
+        assert_summary_equal(checker._summarize_draws(draws, 0, 1), grid.summarize())
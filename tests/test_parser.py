@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 07:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 各解析后端在同一页面上的结果一致
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from hysterical_ticket.component.parser import (
+    BACKENDS,
+    DEFAULT_BACKEND,
+    parse_latest_date,
+    parse_tdata,
+)
+from hysterical_ticket.component.synthetic import history_page, synthetic_rows
+
+FIXTURE = Path(__file__).parent.parent.joinpath("examples", "fixtures", "ssq_history.html")
+
+# 实体、空白、注释、多余的列，以及 tbody#tdata 之外的表格
+LOOSE_PAGE = """
+<table><tbody><tr><td>ignored</td></tr></tbody></table>
+<table><tbody id="tdata">
+<tr>
+<!--<td>2</td>-->
+<td> 23001 </td><td>01</td><td>02</td><td>03</td><td>04</td><td>05</td><td>06</td><td>07</td>
+<td>extra</td></tr>
+<tr><td>23002</td><td>&#48;8</td><td>09</td><td>10</td><td>11</td><td>12</td><td>13</td>
+<td>\n14&nbsp;</td></tr>
+</tbody></table>
+<table><tbody><tr><td>after</td></tr></tbody></table>
+"""
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request) -> str:
+    return request.param
+
+
+def test_default_backend():
+    assert DEFAULT_BACKEND in BACKENDS
+
+
+def test_backends_agree_on_fixture(backend):
+    text = FIXTURE.read_text(encoding="utf8")
+    rows = parse_tdata(text, backend=backend)
+    assert rows == parse_tdata(text, backend="bs4")
+    assert len(rows) == 300 and rows[0][0] == "04150"
+    assert all(len(row) == 8 for row in rows)
+
+
+def test_backends_agree_on_synthetic_pages(backend, branch):
+    rows = synthetic_rows(branch, 120, seed=2)
+    parsed = parse_tdata(history_page(rows, branch), backend=backend)
+    assert sorted(parsed, key=lambda row: int(row[0])) == rows
+    assert parse_tdata(history_page(rows, branch), n_cols=3, backend=backend) == [
+        row[:3] for row in parsed
+    ]
+
+
+def test_backends_agree_on_loose_markup(backend):
+    assert parse_tdata(LOOSE_PAGE, backend=backend) == parse_tdata(LOOSE_PAGE, backend="bs4")
+    assert parse_tdata(LOOSE_PAGE, backend=backend) == [
+        ["23001", "01", "02", "03", "04", "05", "06", "07"],
+        ["23002", "08", "09", "10", "11", "12", "13", "14"],
+    ]
+
+
+def test_parse_latest_date():
+    rows = synthetic_rows("ssq", 30)
+    dates = {row[0]: f"2023-{i // 28 + 1:02d}-{i % 28 + 1:02d}" for i, row in enumerate(rows)}
+    dates[rows[-1][0]] = "2023-04-20"
+    assert parse_latest_date(history_page(rows, dates=dates)) == "2023-04-20"
+    assert parse_latest_date("<tbody id='tdata'></tbody>") is None
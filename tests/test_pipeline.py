@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 10:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 共享 HTTP 层的重试与限流，以及并发刷新流水线
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from hysterical_ticket.component.checker import read_history
+from hysterical_ticket.component.pipeline import refresh_all
+from hysterical_ticket.component.session import HostLimiter, Session
+from hysterical_ticket.component.store import open_store
+from hysterical_ticket.component.synthetic import SyntheticTransport, synthetic_rows
+
+
+def test_retry_then_give_up():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(503 if len(calls) < 3 else 200, text="ok")
+
+    async def run(retries: int):
+        calls.clear()
+        transport = httpx.MockTransport(handler)
+        async with Session(transport=transport, retries=retries, backoff=0, host_rate=0) as s:
+            return await s.get("https://example.com/page")
+
+    assert asyncio.run(run(retries=3)).status_code == 200 and len(calls) == 3
+    assert asyncio.run(run(retries=1)).status_code == 503 and len(calls) == 2
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(run(retries=0))
+
+
+def test_host_concurrency_is_capped():
+    in_flight, peak = 0, 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200)
+
+    async def run():
+        transport = httpx.MockTransport(handler)
+        async with Session(transport=transport, host_concurrency=2, host_rate=0) as session:
+            urls = [f"https://example.com/{i}" for i in range(8)]
+            await asyncio.gather(*[session.get(url) for url in urls])
+
+    asyncio.run(run())
+    assert peak == 2
+
+
+def test_host_rate_is_limited():
+    async def run():
+        limiter = HostLimiter(concurrency=4, rate=50)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        async def acquire():
+            async with limiter:
+                return loop.time() - start
+
+        return sorted(await asyncio.gather(*[acquire() for _ in range(5)]))
+
+    times = asyncio.run(run())
+    # 第 n 个请求不早于 n / rate 秒
+    assert times[-1] >= 4 / 50 * 0.9
+
+
+class FailingDLT(SyntheticTransport):
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith("/dlt"):
+            return httpx.Response(404)
+        return super().handle(request)
+
+
+def test_refresh_all(tmp_path):
+    histories = {"ssq": synthetic_rows("ssq", 80), "dlt": synthetic_rows("dlt", 80)}
+    transport = FailingDLT(histories, fns={"red": ["09", "01"], "blue": ["04"]})
+
+    async def run():
+        async with Session(transport=transport, backoff=0, host_rate=0) as session:
+            return await refresh_all(tmp_path.joinpath("history"), tmp_path, session=session)
+
+    report = asyncio.run(run())
+    store = open_store(tmp_path.joinpath("history"))
+    assert report.stages["ssq"].ok and report.stages["fns_ssq"].ok
+    assert sorted(
+        read_history(tmp_path.joinpath("history", "双色球.csv")), key=lambda r: int(r[0])
+    ) == (histories["ssq"])
+    next_term = str(int(histories["ssq"][-1][0]) + 1)
+    assert report.fns["ssq"].red == ["01", "09"]
+    assert store.get_fns("ssq", next_term)["red"] == ["01", "09"]
+
+    # 大乐透的历史抓取失败时不保存杀号
+    assert not report.ok and not report.stages["dlt"].ok
+    assert not report.stages["fns_dlt"].ok and "dlt" not in report.fns
+    assert set(report.timings()) == {"ssq", "dlt", "fns_ssq", "fns_dlt"}
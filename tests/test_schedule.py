@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 07:20
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 开奖日历推算与本地历史的新鲜度
+from __future__ import annotations
+
+from datetime import datetime
+
+from hysterical_ticket.component.schedule import (
+    CN_TZ,
+    count_draws,
+    expected_term,
+    is_stale,
+    last_draw_at,
+    next_draw_at,
+)
+from hysterical_ticket.component.store import open_store
+
+
+def at(day: str, clock: str) -> datetime:
+    return datetime.fromisoformat(f"{day}T{clock}").replace(tzinfo=CN_TZ)
+
+
+def test_draw_calendar():
+    # 2023-10-12 为周四，双色球开奖日
+    assert last_draw_at("ssq", at("2023-10-12", "20:00")) == at("2023-10-10", "21:15")
+    assert last_draw_at("ssq", at("2023-10-12", "21:15")) == at("2023-10-12", "21:15")
+    assert next_draw_at("ssq", at("2023-10-12", "21:15")) == at("2023-10-15", "21:15")
+    assert next_draw_at("dlt", at("2023-10-12", "08:00")) == at("2023-10-14", "21:25")
+    assert count_draws("ssq", at("2023-10-10", "21:15"), at("2023-10-15", "22:00")) == 2
+    assert count_draws("ssq", at("2023-10-10", "21:15"), at("2023-10-10", "23:00")) == 0
+
+
+def test_missing_metadata_is_stale(tmp_path):
+    assert is_stale("ssq", tmp_path)
+    assert expected_term("ssq", tmp_path) is None
+
+
+def test_staleness_follows_expected_term(tmp_path):
+    store = open_store(tmp_path)
+    store.set_meta("ssq", "2023117", at("2023-10-12", "22:00").isoformat(), "2023-10-12")
+
+    now = at("2023-10-13", "10:00")
+    assert expected_term("ssq", store, now) == 2023117
+    assert not is_stale("ssq", store, now)
+
+    # 周日开奖后本地落后一期
+    now = at("2023-10-15", "21:30")
+    assert expected_term("ssq", store, now) == 2023118
+    assert is_stale("ssq", store, now)
+
+    # 数据源迟迟没有更新：每隔 RECHECK 重试，不因延迟过久而放弃
+    store.set_meta("ssq", "2023117", at("2023-10-16", "11:55").isoformat(), "2023-10-12")
+    assert not is_stale("ssq", store, at("2023-10-16", "12:00"))
+    assert is_stale("ssq", store, at("2023-10-16", "12:10"))
+
+    # 追上后不再抓取
+    store.set_meta("ssq", "2023118", at("2023-10-16", "12:10").isoformat(), "2023-10-15")
+    assert not is_stale("ssq", store, at("2023-10-17", "12:00"))
+
+
+def test_new_year_falls_back_to_fetch_time(tmp_path):
+    store = open_store(tmp_path)
+    store.set_meta("ssq", "2023151", at("2023-12-31", "23:30").isoformat(), "2023-12-31")
+    now = at("2024-01-02", "22:00")
+    assert expected_term("ssq", store, now) is None
+    assert is_stale("ssq", store, now)
+    assert not is_stale("ssq", store, at("2024-01-01", "12:00"))
+
+
+def test_legacy_metadata_uses_settle_window(tmp_path):
+    store = open_store(tmp_path)
+    # 开奖后不久抓取，数据源可能尚未更新
+    store.set_meta("ssq", "2023117", at("2023-10-12", "21:30").isoformat())
+    assert expected_term("ssq", store, at("2023-10-12", "21:35")) is None
+    assert not is_stale("ssq", store, at("2023-10-12", "21:35"))
+    assert is_stale("ssq", store, at("2023-10-12", "21:45"))
+
+    store.set_meta("ssq", "2023117", at("2023-10-12", "23:30").isoformat())
+    assert not is_stale("ssq", store, at("2023-10-13", "12:00"))
+    assert is_stale("ssq", store, at("2023-10-15", "21:20"))
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 09:40
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 蒙特卡洛模拟对照理论中奖概率
+from __future__ import annotations
+
+from math import comb
+
+import pytest
+
+from hysterical_ticket.component.generator import TicketGenerator
+from hysterical_ticket.component.simulator import Strategy, simulate
+
+TICKET = ["01", "02", "03", "04", "05", "06", "07"]
+
+
+def red_hits_probability(k: int) -> float:
+    """双色球一注红球恰好命中 k 个的概率"""
+    return comb(6, k) * comb(27, 6 - k) / comb(33, 6)
+
+
+def test_rates_match_theory():
+    result = simulate([Strategy.from_nums("single", [TICKET])], draws=200_000, seed=1)
+    report = result.reports[0]
+    expected = {
+        "六等奖": sum(red_hits_probability(k) for k in range(3)) / 16,
+        "五等奖": red_hits_probability(3) / 16 + red_hits_probability(4) * 15 / 16,
+    }
+    for tier, p in expected.items():
+        estimate = report.tiers[tier]
+        # 与理论值之差不超过 4 倍标准误
+        assert abs(estimate.mean - p) < 4 * estimate.std / result.draws**0.5, tier
+        assert estimate.low < estimate.mean < estimate.high
+    # 一等奖概率约 1/1700 万，20 万期内几乎不会出现，用 rule of three 给出上界
+    first = report.tiers["一等奖"]
+    assert first.mean == 0 and first.high == pytest.approx(3 / result.draws)
+    assert report.loss.mean == pytest.approx(report.cost - report.bonus.mean)
+    assert -1 < report.expected_roi < 0
+
+
+def test_strategies_share_draws():
+    nums = TicketGenerator.uniform(seed=5).nums(20)
+    result = simulate(
+        [Strategy.from_nums("a", nums), Strategy.from_nums("b", nums)], draws=20_000, seed=2
+    )
+    a, b = result.as_records()
+    assert a["bonus"] == b["bonus"] and a["tiers"] == b["tiers"]
+
+
+def test_seed_and_workers_make_results_reproducible():
+    strategies = [Strategy.from_generator("gen", TicketGenerator.uniform(seed=6), 10)]
+    one = simulate(strategies, draws=10_000, seed=3, workers=2).as_records()
+    assert one == simulate(strategies, draws=10_000, seed=3, workers=2).as_records()
+    assert one != simulate(strategies, draws=10_000, seed=4, workers=2).as_records()
+
+
+def test_floating_prize_and_dlt():
+    strategy = Strategy.from_nums("dlt", [["01", "02", "03", "04", "05", "01", "02"]], branch="dlt")
+    result = simulate([strategy], draws=5000, branch="dlt", floating={1: 5_000_000})
+    assert result.branch == "dlt" and set(result.reports[0].tiers) >= {"一等奖", "九等奖"}
+
+
+@pytest.mark.parametrize("kwargs", [dict(draws=0), dict(workers=0)])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        simulate([Strategy.from_nums("single", [TICKET])], **kwargs)
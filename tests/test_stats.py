@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 09:20
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 增量号码统计对照全量重建与暴力计算
+from __future__ import annotations
+
+import dataclasses
+
+import numpy as np
+
+from hysterical_ticket.component.stats import HistoryStats, ZoneStats, stats_path, update_stats
+from hysterical_ticket.component.ticket import SPECS
+
+
+def assert_stats_equal(a: HistoryStats, b: HistoryStats):
+    assert (a.branch, a.terms, a.last_term, a.windows) == (
+        b.branch,
+        b.terms,
+        b.last_term,
+        b.windows,
+    )
+    for color in ("red", "blue"):
+        for f in dataclasses.fields(ZoneStats):
+            if f.name != "recent":
+                name = f"{color}.{f.name}"
+                assert np.array_equal(
+                    getattr(a.zone(color), f.name), getattr(b.zone(color), f.name)
+                ), name
+
+
+def test_incremental_matches_full(branch, history_rows):
+    incremental = HistoryStats(branch=branch)
+    assert incremental.extend(history_rows[::-1]) == len(history_rows)
+    assert_stats_equal(incremental, HistoryStats.from_rows(branch, history_rows))
+    # 旧期号与重复期号被忽略
+    assert not incremental.append(history_rows[0])
+
+
+def test_counts_and_omission_match_brute_force(branch, history_rows):
+    spec = SPECS[branch]
+    stats = HistoryStats.from_rows(branch, history_rows)
+    reds = [[int(n) for n in row[1 : 1 + spec.red_size]] for row in history_rows]
+    for num in range(1, spec.red_width + 1):
+        hits = [t for t, row in enumerate(reds) if num in row]
+        assert stats.red.counts[num - 1] == len(hits)
+        expected = len(reds) - 1 - hits[-1] if hits else len(reds)
+        assert stats.red.omission[num - 1] == expected
+        recent = sum(num in row for row in reds[-30:])
+        assert stats.frequency("red", window=30)[num - 1] * 30 == recent
+    pair = sum(1 in row and 2 in row for row in reds)
+    assert stats.red.pairs[0, 1] == stats.red.pairs[1, 0] == pair
+
+
+def test_hot_and_cold(branch):
+    spec = SPECS[branch]
+    rows = []
+    for t in range(40):
+        reds = [f"{n:02d}" for n in range(1, spec.red_size + 1)]
+        blues = [f"{n:02d}" for n in range(1, spec.blue_size + 1)]
+        rows.append([f"{t + 1:05d}"] + reds + blues)
+    stats = HistoryStats.from_rows(branch, rows)
+    assert stats.hot("red", k=spec.red_size) == [f"{n:02d}" for n in range(1, spec.red_size + 1)]
+    assert stats.hot("red", window=10, k=1) == ["01"]
+    assert f"{spec.red_width:02d}" in stats.cold("red", k=spec.red_width - spec.red_size)
+    assert stats.top_pairs("red", k=1)[0][2] == 40
+
+
+def test_update_stats_persists_and_appends(tmp_path, branch, history_rows):
+    csv_path = tmp_path.joinpath("history.csv")
+    first = update_stats(csv_path, branch, history_rows[:200])
+    assert stats_path(csv_path).exists() and first.terms == 200
+
+    second = update_stats(csv_path, branch, history_rows)
+    assert_stats_equal(second, HistoryStats.from_rows(branch, history_rows))
+    assert_stats_equal(HistoryStats.load(stats_path(csv_path)), second)
+
+    # 历史被改写后重建
+    rewritten = history_rows[:100] + history_rows[150:]
+    assert_stats_equal(
+        update_stats(csv_path, branch, rewritten), HistoryStats.from_rows(branch, rewritten)
+    )
+
+
+def test_broken_file_is_dropped(tmp_path):
+    path = tmp_path.joinpath("history.stats.npz")
+    path.write_bytes(b"broken")
+    assert HistoryStats.load(path) is None and not path.exists()
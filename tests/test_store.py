@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 08:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: SQLite 存储的读写、元数据与旧版文件迁移
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from hysterical_ticket.component.store import STORE_FN, close_store, open_store
+from hysterical_ticket.component.synthetic import synthetic_rows
+
+
+def test_history_is_replaced_as_a_whole(tmp_path):
+    store = open_store(tmp_path)
+    rows = synthetic_rows("ssq", 50)
+    store.put_history("ssq", rows[::-1], rows[-1][0], drawn_at="2023-10-12")
+    assert store.history("ssq") == rows
+    assert store.latest_term("ssq") == rows[-1][0]
+    assert str(store.drawn_at("ssq")) == "2023-10-12"
+
+    # 同一期号重新保存时沿用已记录的开奖日期
+    store.put_history("ssq", rows[:10], rows[-1][0])
+    assert store.history("ssq") == rows[:10]
+    assert str(store.drawn_at("ssq")) == "2023-10-12"
+    assert store.history("dlt") == [] and store.metadata("dlt") is None
+
+
+def test_open_store_shares_connection(tmp_path):
+    store = open_store(tmp_path)
+    assert open_store(tmp_path.joinpath(STORE_FN)) is store
+    close_store(tmp_path)
+    assert open_store(tmp_path) is not store
+
+
+def test_fns_and_weights(tmp_path):
+    store = open_store(tmp_path)
+    store.put_fns("ssq", "2023002", {"red": ["01"]})
+    store.put_fns("ssq", 2023001, {"red": ["02"]})
+    store.put_fns("ssq", "2023002", {"red": ["03"]})
+    assert store.get_fns("ssq", 2023002) == {"red": ["03"]}
+    assert [term for term, _ in store.iter_fns("ssq")] == [2023001, 2023002]
+    assert store.get_fns("dlt", 2023001) is None
+
+    store.put_weights("ssq", {"a": 1.0, "b": 0.5})
+    store.put_weights("ssq", {"a": 0.2})
+    assert store.weights("ssq") == {"a": 0.2} and store.weights("dlt") == {}
+
+
+def test_disk_usage_tracks_files(tmp_path):
+    store = open_store(tmp_path)
+    base = store.disk_usage()
+    path = tmp_path.joinpath("history.csv")
+    path.write_bytes(b"x" * (1 << 20))
+    store.track(path)
+    # WAL 会随写入增长，只比较量级
+    assert store.disk_usage() >= base + (1 << 20)
+    path.unlink()
+    store.track(path)
+    assert store.disk_usage() < base + (1 << 20)
+
+
+def test_import_sidecars(tmp_path):
+    tmp_path.joinpath("2023100.ssq").write_text(json.dumps({"version": "2023100"}), "utf8")
+    tmp_path.joinpath("2023101.ssq").write_text(json.dumps({"fns": {"red": ["05"]}}), "utf8")
+    tmp_path.joinpath("broken.ssq").write_text("{", "utf8")
+    store = open_store(tmp_path)
+    assert store.import_sidecars(tmp_path) == 2
+    assert store.latest_term("ssq") == "2023100"
+    assert store.get_fns("ssq", 2023101) == {"red": ["05"]}
+    assert [p.name for p in tmp_path.glob("*.ssq")] == ["broken.ssq"]
+
+
+def test_old_meta_table_is_migrated(tmp_path):
+    conn = sqlite3.connect(tmp_path.joinpath(STORE_FN))
+    conn.execute("CREATE TABLE meta (branch TEXT PRIMARY KEY, latest_term TEXT, fetched_at TEXT)")
+    conn.execute("INSERT INTO meta VALUES ('ssq', '2023100', '2023-10-12T22:00:00+08:00')")
+    conn.commit()
+    conn.close()
+
+    store = open_store(tmp_path)
+    assert store.latest_term("ssq") == "2023100" and store.drawn_at("ssq") is None
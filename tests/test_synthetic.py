@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 05:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 模拟开奖历史与模拟网页
+from __future__ import annotations
+
+import pytest
+
+from hysterical_ticket.component.parser import parse_tdata
+from hysterical_ticket.component.store import open_store
+from hysterical_ticket.component.synthetic import history_page, synthetic_rows
+from hysterical_ticket.component.ticket import SPECS
+
+
+@pytest.mark.parametrize("n", [1, 3000, 14841, 14842, 20000])
+def test_terms_are_unique_and_increasing(n):
+    terms = [row[0] for row in synthetic_rows("ssq", n)]
+    assert len(terms) == n
+    assert len({len(term) for term in terms}) == 1
+    assert all(int(a) < int(b) for a, b in zip(terms, terms[1:]))
+
+
+def test_short_histories_keep_two_digit_years():
+    terms = [row[0] for row in synthetic_rows("ssq", 3000)]
+    assert terms[0] == "03001" and terms[153] == "04001"
+
+
+def test_long_history_fits_store(tmp_path):
+    rows = synthetic_rows("ssq", 20000)
+    open_store(tmp_path).put_history("ssq", rows, rows[-1][0])
+    assert open_store(tmp_path).history("ssq") == rows
+
+
+def test_numbers_follow_spec(branch):
+    spec = SPECS[branch]
+    for row in synthetic_rows(branch, 500, seed=3):
+        reds = [int(n) for n in row[1 : 1 + spec.red_size]]
+        blues = [int(n) for n in row[1 + spec.red_size :]]
+        assert reds == sorted(set(reds)) and 1 <= reds[0] and reds[-1] <= spec.red_width
+        assert blues == sorted(set(blues)) and 1 <= blues[0] and blues[-1] <= spec.blue_width
+
+
+def test_history_page_round_trip(branch):
+    rows = synthetic_rows(branch, 50)
+    parsed = parse_tdata(history_page(rows, branch), n_cols=8)
+    assert sorted(parsed, key=lambda row: int(row[0])) == rows
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 07:40
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 位掩码号码的构造、校验与比对
+from __future__ import annotations
+
+import pytest
+
+from hysterical_ticket.component import bingo_dlt, bingo_ssq
+from hysterical_ticket.component.ticket import SPECS, Draw, Ticket, as_ticket, from_mask, to_mask
+
+
+def test_mask_round_trip():
+    assert to_mask(["01", "07"], 33) == 0b1000001
+    assert from_mask(0b1000001) == ["01", "07"]
+    nums = ["01", "07", "12", "18", "23", "33", "16"]
+    assert Ticket.from_nums(nums).to_nums() == nums
+    assert Ticket.from_nums(["05", "01", "33", "02", "03", "12", "01"], branch="dlt").to_nums() == [
+        "01",
+        "02",
+        "03",
+        "05",
+        "33",
+        "01",
+        "12",
+    ]
+
+
+@pytest.mark.parametrize(
+    "nums, branch",
+    [
+        (["01", "02", "03", "04", "05", "06"], "ssq"),
+        (["01", "02", "03", "04", "05", "06", "07", "08"], "ssq"),
+        (["01", "01", "03", "04", "05", "06", "07"], "ssq"),
+        (["01", "02", "03", "04", "05", "34", "07"], "ssq"),
+        (["01", "02", "03", "04", "05", "06", "17"], "ssq"),
+        (["01", "02", "03", "04", "05", "06", "06"], "dlt"),
+        (["01", "02", "03", "04", "36", "06", "07"], "dlt"),
+    ],
+)
+def test_invalid_nums(nums, branch):
+    with pytest.raises(ValueError):
+        Ticket.from_nums(nums, branch=branch)
+
+
+def test_compare_and_equality():
+    ticket = Ticket.from_nums(["01", "02", "03", "04", "05", "06", "07"])
+    draw = Draw.from_row(["23001", "01", "02", "03", "10", "11", "12", "07"])
+    assert ticket.compare(draw) == (3, 1)
+    assert draw.term == "23001" and draw.to_row()[0] == "23001"
+    assert as_ticket(ticket) is ticket
+    assert ticket == as_ticket(["01", "02", "03", "04", "05", "06", "07"])
+    assert len({ticket, Ticket.from_nums(ticket.to_nums())}) == 1
+    # 掩码相同但彩种不同
+    assert ticket != Ticket(ticket.red, ticket.blue, spec=SPECS["dlt"])
+
+
+def test_ssq_prize_rules():
+    draw = ["01", "02", "03", "04", "05", "06", "07"]
+    cases = {
+        ("01", "02", "03", "04", "05", "06", "07"): 1,
+        ("01", "02", "03", "04", "05", "06", "08"): 2,
+        ("01", "02", "03", "04", "05", "20", "07"): 3,
+        ("01", "02", "03", "04", "20", "21", "07"): 4,
+        ("01", "02", "03", "04", "05", "20", "08"): 4,
+        ("01", "02", "03", "20", "21", "22", "07"): 5,
+        ("01", "02", "03", "04", "20", "21", "08"): 5,
+        ("20", "21", "22", "23", "24", "25", "07"): 6,
+        ("01", "02", "03", "20", "21", "22", "08"): 0,
+    }
+    for nums, level in cases.items():
+        assert bingo_ssq.is_bingo(*bingo_ssq.compare_nums(list(nums), draw)) == level, nums
+
+
+def test_dlt_prize_rules():
+    draw = ["01", "02", "03", "04", "05", "01", "02"]
+    cases = {
+        ("01", "02", "03", "04", "05", "01", "02"): 1,
+        ("01", "02", "03", "04", "05", "01", "12"): 2,
+        ("01", "02", "03", "04", "05", "11", "12"): 3,
+        ("01", "02", "03", "04", "20", "01", "02"): 4,
+        ("01", "02", "03", "20", "21", "01", "02"): 6,
+        ("20", "21", "22", "23", "24", "01", "02"): 9,
+        ("01", "20", "21", "22", "23", "01", "12"): 0,
+    }
+    for nums, level in cases.items():
+        assert bingo_dlt.is_bingo(*bingo_dlt.compare_nums(list(nums), draw)) == level, nums
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 09:00
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 答案块的流式切分与逐行校验
+from __future__ import annotations
+
+from hysterical_ticket.component.constraints import ConstraintFilter, Constraints
+from hysterical_ticket.component.verifier import Verifier, parse_nums
+
+ANSWER = """分析如下：
+[01, 02, 03, 04, 05, 06, 07] 不在答案块内
+🐞
+```
+["01", "02", "03", "04", "05", "06", "07"]
+['06', '05', '04', '03', '02', '01', '07'],
+[1, 2, 3, 4, 5, 6]
+["01", "01", "03", "04", "05", "06", "07"]
+["01", "02", "03", "04", "05", "34", "07"]
+[01, 02, 03, 04, 05, 07, 08]；
+["a", "02", "03", "04", "05", "06", "07"]
+```
+🐞
+"""
+
+
+def test_parse_nums():
+    assert parse_nums('["01", "2", 33]') == ["01", "02", "33"]
+    assert parse_nums("[1，2，3]，") == ["01", "02", "03"]
+    assert parse_nums("01, 02") is None
+    assert parse_nums("[1, 100]") is None
+
+
+def test_verify_answer_block():
+    verifier = Verifier.from_str(ANSWER, branch="ssq")
+    results = verifier.verify()
+    assert verifier.blocks == 1
+    assert [r.lineno for r in results] == list(range(5, 12))
+    assert [r.errors for r in results] == [
+        [],
+        ["repeated"],
+        ["size"],
+        ["duplicate"],
+        ["range"],
+        [],
+        ["format"],
+    ]
+    assert results[1].warnings == ["unsorted"]
+    assert verifier.valid == [
+        ["01", "02", "03", "04", "05", "06", "07"],
+        ["01", "02", "03", "04", "05", "07", "08"],
+    ]
+    assert "与前面的答案重复" in results[1].describe()
+    assert len(verifier.checker().tickets) == 2
+
+
+def test_streaming_matches_whole_text():
+    whole = Verifier.from_str(ANSWER).verify()
+    verifier = Verifier()
+    streamed = []
+    # 单个字符地输入，🐞 与换行都可能落在任意位置
+    for char in ANSWER:
+        streamed.extend(verifier.feed(char))
+    streamed.extend(verifier.close())
+    assert [(r.lineno, r.nums, r.errors) for r in streamed] == [
+        (r.lineno, r.nums, r.errors) for r in whole
+    ]
+
+
+def test_constraints_and_list_input():
+    cf = ConstraintFilter(Verifier().spec, Constraints(exclude_red=["05"], exclude_blue=["12"]))
+    verifier = Verifier.from_list(
+        [
+            ["01", "02", "03", "04", "05", "06", "07"],
+            [1, 2, 3, 4, 6, 7, 12],
+            ["01", "02", "03", "04", "06", "08", "09"],
+        ],
+        constraint_filter=cf,
+    )
+    assert [r.errors for r in verifier.verify()] == [["exclude_red"], ["exclude_blue"], []]
+    assert verifier.invalid[0].lineno == 1
+
+
+def test_dlt_sizes():
+    verifier = Verifier.from_str("🐞\n[1, 2, 3, 4, 5, 6, 7]\n[1, 2, 3, 4, 5, 6]\n🐞", branch="dlt")
+    assert [r.errors for r in verifier.verify()] == [[], ["size"]]
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Time       : 2026/10/19 06:40
+# Author     : QIN2DIM
+# GitHub     : https://github.com/QIN2DIM
+# Description: 旋转矩阵的覆盖保证
+from __future__ import annotations
+
+from itertools import combinations
+
+import pytest
+
+from conftest import FILENAMES, write_history
+from hysterical_ticket.component.synthetic import synthetic_rows
+from hysterical_ticket.component.wheel import build_wheel, coverage
+
+POOL = [f"{n:02d}" for n in range(1, 11)]
+
+
+def covered_sets(wheel, t):
+    """暴力枚举：选号池中被至少一注完整包含的 t 个号码组合"""
+    reds = [set(ticket.to_nums()[: wheel.spec.red_size]) for ticket in wheel.tickets]
+    return {c for c in combinations(wheel.pool, t) if any(set(c) <= r for r in reds)}
+
+
+@pytest.mark.parametrize("t", [2, 3, 4])
+def test_full_budget_covers_every_combination(t):
+    wheel = build_wheel(POOL, budget=210, t=t, blues=["03", "11"])
+    # 开出的红球中只要有 t 个落在选号池内，至少一注命中这 t 个红球
+    assert len(covered_sets(wheel, t)) == wheel.total == len(list(combinations(POOL, t)))
+    assert wheel.coverage == 1.0
+    # 全部覆盖后提前结束，不会用满预算
+    assert len(wheel.tickets) < 210
+
+
+@pytest.mark.parametrize("budget", [1, 4, 8])
+def test_reported_coverage_matches_brute_force(budget):
+    wheel = build_wheel(POOL, budget=budget, t=3, seed=1)
+    assert len(wheel.tickets) == budget and wheel.coverage < 1
+    assert wheel.covered == len(covered_sets(wheel, 3))
+    assert coverage(wheel.pool_masks, len(POOL), 3) == pytest.approx(wheel.coverage)
+    assert wheel.coverage_by_t((3,))[3] == pytest.approx(wheel.coverage)
+
+
+def test_refine_never_loses_coverage():
+    greedy = build_wheel(POOL, budget=8, t=4, refine=0)
+    refined = build_wheel(POOL, budget=8, t=4, refine=3)
+    assert refined.covered >= greedy.covered
+
+
+def test_tickets_use_pool_and_rotate_blues(branch):
+    wheel = build_wheel(POOL, budget=6, t=3, blues=["01", "02", "03"], branch=branch)
+    size = wheel.spec.red_size
+    blues = set()
+    for nums in wheel.nums():
+        assert set(nums[:size]) <= set(POOL) and len(set(nums[:size])) == size
+        blues.add(tuple(nums[size:]))
+    assert len(blues) > 1
+
+
+def test_invalid_wheels():
+    with pytest.raises(ValueError):
+        build_wheel(POOL[:5], budget=3)
+    with pytest.raises(ValueError):
+        build_wheel(POOL, budget=3, t=7)
+    with pytest.raises(ValueError):
+        build_wheel(POOL, budget=3, blues=["01"], branch="dlt")
+
+
+def test_backtest(tmp_path):
+    rows = synthetic_rows("ssq", 60)
+    path = write_history(tmp_path.joinpath(FILENAMES["ssq"]), "ssq", rows)
+    summary = build_wheel(POOL, budget=4, t=3).backtest(path)
+    assert summary.terms == 60 and summary.levels.shape[0] == 4